@@ -0,0 +1,202 @@
+import os
+import time
+import signal
+import tempfile
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from XSimResult import *
+
+XSIM_ANALYSIS_EXECUTORS = ['serial', 'thread', 'process']
+
+# arrays at least this big [bytes] are handed
+# to process workers through a shared mapping
+XSIM_SHARED_MIN_SIZE = 1 << 20
+
+# thread pool timeouts are checked at this period [s]
+XSIM_ANALYSIS_POLL = 0.05
+
+# preferred location of shared mappings (memory backed)
+XSIM_SHARED_DIRECTORY = '/dev/shm'
+
+class XSimSharedArray:
+	"""
+	Array copied once into a memory mapped .npy file:
+	only its path is pickled, workers map it read only
+	"""
+
+	def __init__(self, array, directory=None):
+		if (directory is None) and os.path.isdir(XSIM_SHARED_DIRECTORY):
+			directory = XSIM_SHARED_DIRECTORY
+		fd, self.path = tempfile.mkstemp(suffix='.npy', prefix='xsim-', dir=directory)
+		os.close(fd)
+		mm = np.lib.format.open_memmap(self.path, mode='w+', dtype=array.dtype, shape=array.shape)
+		mm[...] = array
+		mm.flush()
+		del mm
+
+	def attach(self):
+		return np.load(self.path, mmap_mode='r')
+
+	def release(self):
+		try:
+			os.remove(self.path)
+		except OSError:
+			pass
+
+def shareArrays(obj, shared, minsize=XSIM_SHARED_MIN_SIZE):
+	"""
+	Returns obj where arrays of at least minsize bytes,
+	possibly nested in lists, tuples & dicts,
+	are replaced by XSimSharedArray handles (appended to shared)
+	"""
+	if isinstance(obj, np.ndarray) and (obj.nbytes >= minsize) and (obj.dtype != object):
+		handle = XSimSharedArray(obj)
+		shared.append(handle)
+		return handle
+	if isinstance(obj, list):
+		return [shareArrays(x, shared, minsize) for x in obj]
+	if isinstance(obj, tuple):
+		return tuple([shareArrays(x, shared, minsize) for x in obj])
+	if isinstance(obj, dict):
+		return {key: shareArrays(value, shared, minsize) for key, value in obj.items()}
+	return obj
+
+def attachArrays(obj):
+	"""
+	Reverts shareArrays in workers: handles become read only views
+	"""
+	if isinstance(obj, XSimSharedArray):
+		return obj.attach()
+	if isinstance(obj, list):
+		return [attachArrays(x) for x in obj]
+	if isinstance(obj, tuple):
+		return tuple([attachArrays(x) for x in obj])
+	if isinstance(obj, dict):
+		return {key: attachArrays(value) for key, value in obj.items()}
+	return obj
+
+def timeoutResult(index, timeout):
+	return XSimResult(title='Test {:d}'.format(index), status='FAILED', extra='analysis timed out after {:g} s'.format(timeout))
+
+class _AnalysisTimeout(Exception):
+	pass
+
+def _alarm(signum, frame):
+	raise _AnalysisTimeout()
+
+def analyze(method, bench, index, data, timeout=None):
+	"""
+	Runs method(bench, index, data), interrupted after timeout [s]
+	when called from a main thread on a platform with interval timers
+	(serial & process executors). Returns a FAILED result on timeout
+	"""
+	alarm = (timeout is not None) and hasattr(signal, 'setitimer') and (threading.current_thread() is threading.main_thread())
+	if not(alarm):
+		return method(bench, index, data)
+
+	handler = signal.signal(signal.SIGALRM, _alarm)
+	signal.setitimer(signal.ITIMER_REAL, timeout)
+	try:
+		return method(bench, index, data)
+	except _AnalysisTimeout:
+		return timeoutResult(index, timeout)
+	finally:
+		signal.setitimer(signal.ITIMER_REAL, 0)
+		signal.signal(signal.SIGALRM, handler)
+
+# process workers state, see XSimAnalysisPool.run
+_worker = {}
+
+def _initWorker(method, bench, timeout):
+	_worker['method'] = method
+	_worker['bench'] = bench
+	_worker['timeout'] = timeout
+
+def _processTask(index, data):
+	data = attachArrays(data)
+	return analyze(_worker['method'], _worker['bench'], index, data, timeout=_worker['timeout'])
+
+class XSimAnalysisPool:
+	"""
+	Runs method(bench, index, data[index]) for every data set:
+		+ 'serial': one after the other
+		+ 'thread': on a thread pool (analyses releasing the GIL, numpy FFTs..)
+		+ 'process': on a process pool, bench & method are sent once
+		per worker (both must be picklable, see XSimBench.analysisBench),
+		large arrays of the data sets are mapped by workers instead
+		of being pickled
+	Results are returned in data sets order. Analyses running longer
+	than timeout [s] yield a FAILED result: serial & process analyses
+	are interrupted, thread pools stop waiting for them but cannot
+	interrupt them
+	"""
+
+	def __init__(self, method, executor='serial', workers=None, timeout=None):
+		if not(executor in XSIM_ANALYSIS_EXECUTORS):
+			raise ValueError("{:s} analysis executor is not supported".format(executor))
+		self.method = method
+		self.executor = executor
+		self.workers = workers
+		self.timeout = timeout
+
+	def getExecutor(self):
+		return self.executor
+
+	def getWorkers(self):
+		return self.workers
+
+	def getTimeout(self):
+		return self.timeout
+
+	def run(self, bench, data):
+		if (self.executor == 'serial') or (len(data) == 0):
+			return [analyze(self.method, bench, i, data[i], timeout=self.timeout) for i in range(0, len(data))]
+		if (self.executor == 'thread'):
+			return self.runThreads(bench, data)
+		return self.runProcesses(bench, data)
+
+	def runThreads(self, bench, data):
+		started = {}
+		def task(index):
+			started[index] = time.monotonic()
+			return self.method(bench, index, data[index])
+
+		results = [None] * len(data)
+		pool = ThreadPoolExecutor(max_workers=self.workers)
+		futures = {pool.submit(task, i): i for i in range(0, len(data))}
+		pending = set(futures.keys())
+		poll = None if (self.timeout is None) else XSIM_ANALYSIS_POLL
+		while (len(pending) > 0):
+			[done, pending] = wait(pending, timeout=poll, return_when=FIRST_COMPLETED)
+			for future in done:
+				results[futures[future]] = future.result()
+			if (self.timeout is not None):
+				now = time.monotonic()
+				for future in list(pending):
+					i = futures[future]
+					if (i in started) and (now - started[i] > self.timeout):
+						results[i] = timeoutResult(i, self.timeout)
+						pending.remove(future)
+		pool.shutdown(wait=False) # timed out analyses are left running
+		return results
+
+	def runProcesses(self, bench, data):
+		# multiprocessing is only imported by process executors
+		from concurrent.futures import ProcessPoolExecutor
+		shared = []
+		try:
+			tasks = [shareArrays(data[i], shared) for i in range(0, len(data))]
+			with ProcessPoolExecutor(max_workers=self.workers, initializer=_initWorker, initargs=(self.method, bench, self.timeout)) as pool:
+				futures = [pool.submit(_processTask, i, tasks[i]) for i in range(0, len(data))]
+				results = [future.result() for future in futures]
+			# results outlive the shared mappings
+			files = set([handle.path for handle in shared])
+			for result in results:
+				if isinstance(result, XSimResult):
+					result.detach(files)
+			return results
+		finally:
+			for handle in shared:
+				handle.release()
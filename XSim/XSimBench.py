@@ -1,43 +1,397 @@
 from XSimParam import *
 from XSimStimulus import *
 from XSimResult import *
-
+from XSimEngine import *
+from XSimCache import *
+from XSimFormat import *
+from XSimHash import *
+from XSimReader import *
+from XSimAnalysis import *
+from XSimReport import *
+from XSimRegistry import *
+from XSimStore import *
+from XSimTrace import *
+
+import os
+import re
+import copy
+import json
+import time
 import datetime
 
-# Qt5
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtWidgets import QMainWindow, QWidget
-from PyQt5.QtWidgets import QAction
-from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout
-from PyQt5.QtWidgets import QLabel
+# Qt5 & pyqtgraph are only imported by the UI methods,
+# package generation & headless runs never load them
+
+XSIM_STIMULUS_MODES = ['lut', 'hex', 'binary']
+
+# stimulus data file word size [bits]
+XSIM_STIMULUS_WIDTH = 32
+
+# [package body procedure, streaming reader entity] per stimulus mode
+XSIM_STIMULUS_READERS = {
+	'hex': [
+"""	procedure read_stimulus(file f: text; value: out real) is
+		variable l: line;
+		variable w: std_logic_vector(STIM_WIDTH-1 downto 0);
+	begin
+		readline(f, l);
+		hread(l, w);
+		value := real(to_integer(signed(w))) / 2.0**STIM_FRAC_BITS;
+	end procedure;
+""",
+"""
+library ieee;
+use ieee.std_logic_1164.all;
+use std.textio.all;
+use work.package_tb.all;
+
+-- streams one stimulus word per enabled rising edge
+entity xsim_stimulus_reader is
+	generic (FILENAME: string);
+	port (
+		clk: in std_logic;
+		en: in std_logic := '1';
+		data: out real := 0.0;
+		done: out boolean := false
+	);
+end entity xsim_stimulus_reader;
+
+architecture behavior of xsim_stimulus_reader is
+begin
+	process
+		file f: text open read_mode is FILENAME;
+		variable v: real;
+	begin
+		while not(endfile(f)) loop
+			wait until rising_edge(clk) and (en = '1');
+			read_stimulus(f, v);
+			data <= v;
+		end loop;
+		done <= true;
+		wait;
+	end process;
+end architecture behavior;
+"""],
+	'binary': [
+"""	procedure read_stimulus(file f: stim_file; value: out real) is
+		variable w: integer;
+	begin
+		read(f, w);
+		value := real(w) / 2.0**STIM_FRAC_BITS;
+	end procedure;
+""",
+"""
+library ieee;
+use ieee.std_logic_1164.all;
+use work.package_tb.all;
+
+-- streams one stimulus word per enabled rising edge
+entity xsim_stimulus_reader is
+	generic (FILENAME: string);
+	port (
+		clk: in std_logic;
+		en: in std_logic := '1';
+		data: out real := 0.0;
+		done: out boolean := false
+	);
+end entity xsim_stimulus_reader;
+
+architecture behavior of xsim_stimulus_reader is
+begin
+	process
+		file f: stim_file open read_mode is FILENAME;
+		variable v: real;
+	begin
+		while not(endfile(f)) loop
+			wait until rising_edge(clk) and (en = '1');
+			read_stimulus(f, v);
+			data <= v;
+		end loop;
+		done <= true;
+		wait;
+	end process;
+end architecture behavior;
+"""],
+}
+
+def decodeOutputs(tb, d):
+	outputs = d['output']
+	if (type(outputs) == dict):
+		outputs = [outputs]
+	for output in outputs:
+		tb.addSimulationOutput(XSimOutputReader(output['file'], fmt=output.get('format', 'decimal'), columns=output.get('columns'), ncolumns=output.get('n-columns'), dtype=output.get('dtype'), width=output.get('width'), signed=output.get('signed', False), fracbits=output.get('frac-bits'), skiprows=output.get('skip-rows', 0), mmap=output.get('mmap', False)))
+
+def decodeReport(tb, d):
+	report = d['report']
+	if (type(report) == str):
+		report = {'directory': report}
+	tb.setReport(XSimReport(report['directory'], formats=report.get('formats', ['svg']), workers=report.get('workers')))
+
+def decodeStore(tb, d):
+	store = d['store']
+	if (type(store) == str):
+		store = {'directory': store}
+	tb.setStore(XSimStore(store['directory'], bench=store.get('bench')))
+
+def decodeTrace(tb, d):
+	trace = d['trace']
+	if (type(trace) == str):
+		trace = {'chrome': trace}
+	tb.setTrace(chrome=trace.get('chrome'), summary=trace.get('summary', False))
+
+# attribute descriptor field: decoder(bench, entry), in decoding order
+XSIM_ATTRIBUTE_SCHEMA = {
+	'language': lambda tb, d: tb.setLanguage(d['language']),
+	'library': lambda tb, d: tb.addSimulationLibrary(d['library']),
+	'block-size': lambda tb, d: tb.setStreaming(d['block-size']),
+	'cache': lambda tb, d: tb.setStimulusCache(XSimStimulusCache(d['cache'])),
+	'seed': lambda tb, d: tb.setSeed(d['seed']),
+	'workers': lambda tb, d: tb.setWorkers(d['workers']),
+	'stimulus-mode': lambda tb, d: tb.setStimulusMode(d['stimulus-mode']),
+	'stimulus-frac-bits': lambda tb, d: tb.setStimulusFracBits(d['stimulus-frac-bits']),
+	'output': decodeOutputs,
+	'analysis-executor': lambda tb, d: tb.setAnalysisExecutor(d['analysis-executor'], workers=d.get('analysis-workers'), timeout=d.get('analysis-timeout')),
+	'report': decodeReport,
+	'store': decodeStore,
+	'trace': decodeTrace,
+}
+
+# parameter descriptor 'ptype':
+#	+ class: built as class(key, value, **fields)
+#	+ fields: descriptor field: [constructor keyword, default]
+#	+ range: [min, max] descriptor fields, set with setBounds
+#	+ convert: descriptor value type (modify, overrides)
+#	+ libraries: simulation libraries the parameter requires
+XSIM_PARAM_SCHEMA = {
+	'fixed_point': {
+		'class': XSimFixedPointParam,
+		'fields': {'help': ['help', None], 'hidden': ['hidden', False]},
+		'range': ['Qmin', 'Qmax'],
+		'convert': str,
+		'libraries': [['ieee_proposed', 'fixed_pkg']],
+	},
+	'string': {
+		'class': XSimStringParam,
+		'fields': {'help': ['help', None], 'values': ['allowed', None], 'hidden': ['hidden', False]},
+		'range': [None, None],
+		'convert': str,
+		'libraries': [],
+	},
+	'float': {
+		'class': XSimFloatParam,
+		'fields': {'help': ['help', None], 'values': ['allowed', None], 'hidden': ['hidden', False], 'formatstr': ['formatstr', None]},
+		'range': [None, None],
+		'convert': float,
+		'libraries': [],
+	},
+	'bool': {
+		'class': XSimBoolParam,
+		'fields': {'help': ['help', None], 'hidden': ['hidden', False]},
+		'range': [None, None],
+		'convert': int,
+		'libraries': [],
+	},
+	'integer': {
+		'class': XSimIntParam,
+		'fields': {'help': ['help', None], 'hidden': ['hidden', False]},
+		'range': ['min', 'max'],
+		'convert': int,
+		'libraries': [],
+	},
+	'time': {
+		'class': XSimTimeParam,
+		'fields': {'unit': ['unit', None], 'help': ['help', None], 'hidden': ['hidden', False]},
+		'range': [None, None],
+		'convert': float,
+		'libraries': [],
+	},
+}
+
+# descriptor value converters per parameter type
+XSIM_PTYPE_CONVERTERS = {ptype: schema['convert'] for ptype, schema in XSIM_PARAM_SCHEMA.items()}
+
+# stimulus descriptor 'stype': [class, descriptor fields passed after key]
+XSIM_STIMULUS_SCHEMA = {
+	'sinewave': [XSimSineWaveStimulus, ['amplitude', 'frequency', 'n-symbols']],
+	'ramp': [XSimRampStimulus, ['amplitude', 'n-periods', 'n-symbols']],
+	'squarewave': [XSimSquareWaveStimulus, ['amplitude', 'n-periods', 'n-symbols']],
+}
+
+def descriptorIndex(descriptor):
+	"""
+	Returns {key: entry} of a dictionnary/JSON descriptor,
+	the first entry wins when a key is declared twice
+	"""
+	index = {}
+	for d in descriptor:
+		if ('key' in d):
+			index.setdefault(d['key'], d)
+	return index
+
+def checkParamValue(d, value):
+	"""
+	Returns value converted to the type of parameter entry d,
+	raises ValueError when d does not accept it
+	(allowed values, integer & fixed point ranges..)
+	"""
+	ptype = d['ptype']
+	value = XSIM_PTYPE_CONVERTERS[ptype](value)
+
+	if (d.get('values') is not None) and not(value in d['values']):
+		raise ValueError("{} is not one of {}".format(value, d['values']))
+
+	if (ptype == 'bool') and not(value in [0,1]):
+		raise ValueError("Boolean value should either be 0 or 1")
+
+	if (ptype == 'integer') and ('min' in d) and ('max' in d):
+		if (value < int(d['min'])) or (value > int(d['max'])):
+			raise ValueError("{:d} is out of [{}:{}]".format(value, d['min'], d['max']))
+
+	if (ptype == 'fixed_point'):
+		qm = re.match(r'^[su](\d+)\.(\d+)$', value)
+		if (qm is None):
+			raise ValueError("{:s} is not a sQ.M/uQ.M format".format(value))
+		if ('Qmin' in d) and ('Qmax' in d):
+			if (int(qm.group(1)) < d['Qmin']) or (int(qm.group(1)) > d['Qmax']):
+				raise ValueError("Q={:s} is out of [{}:{}]".format(qm.group(1), d['Qmin'], d['Qmax']))
+	return value
+
+def convertField(current, value):
+	"""
+	Returns value converted to the type of current field value,
+	command line strings of new or structured fields are read as JSON
+	"""
+	if (type(value) != str) or (type(current) == str):
+		return value
+
+	if (type(current) == bool):
+		if (value.lower() in ['1', 'true', 'yes', 'on']):
+			return True
+		if (value.lower() in ['0', 'false', 'no', 'off']):
+			return False
+		raise ValueError("{:s} is not a boolean".format(value))
+
+	if (type(current) == int):
+		number = float(value)
+		if (number != int(number)):
+			raise ValueError("{:s} is not an integer".format(value))
+		return int(number)
+
+	if (type(current) == float):
+		return float(value)
+
+	try:
+		return json.loads(value)
+	except ValueError:
+		return value
+
+def applyOverride(descriptor, key, value, index=None):
+	"""
+	Overrides one entry of a dictionnary/JSON descriptor (in place):
+		+ 'key': value of parameter 'key'
+		+ 'key.field': field of the entry (stimulus..) identified by 'key'
+		+ 'field': attribute field ('seed', 'stimulus-mode'..)
+	value is converted to the entry type & checked.
+	index: descriptorIndex(descriptor), when overriding many keys.
+	Returns [key, previous value, new value]
+	"""
+	if (index is None):
+		index = descriptorIndex(descriptor)
+
+	field = 'value'
+	name = key
+	if ('.' in key):
+		[name, field] = key.split('.', 1)
+
+	d = index.get(name)
+	if (d is None) and (key in XSIM_ATTRIBUTE_SCHEMA):
+		field = key
+		attributes = [e for e in descriptor if (e['type'] == 'attribute')]
+		declared = [e for e in attributes if (key in e)]
+		if (len(declared) > 0):
+			d = declared[0]
+		elif (len(attributes) > 0):
+			d = attributes[0]
+		else:
+			d = {'type': 'attribute'}
+			descriptor.append(d)
+
+	if (d is None):
+		raise KeyError("{:s} not found in descriptor".format(name))
+
+	previous = d.get(field)
+	if (field == 'value') and (d['type'] == 'parameter'):
+		d['value'] = checkParamValue(d, value)
+	else:
+		d[field] = convertField(previous, value)
+	return [key, previous, d[field]]
+
+def readOverrides(source):
+	"""
+	Returns {key: value} overrides (see applyOverride) from either
+		+ a dict
+		+ a list of 'key=value' strings (command line arguments),
+		'@file' arguments are read as override files
+		+ a .json or .yaml/.yml file (YAML requires PyYAML)
+	"""
+	if (type(source) == dict):
+		return dict(source)
 
-# pyqtgraph
-import pyqtgraph as pg
-from pyqtgraph.dockarea import *
+	if (type(source) == str):
+		with open(source, 'r') as fd:
+			if (os.path.splitext(source)[1].lower() in ['.yaml', '.yml']):
+				try:
+					import yaml
+				except ImportError:
+					raise XSimError("PyYAML is required to read {:s}".format(source))
+				overrides = yaml.safe_load(fd)
+			else:
+				overrides = json.load(fd)
+		if (overrides is None):
+			return {}
+		if (type(overrides) != dict):
+			raise ValueError("{:s} must hold key: value overrides".format(source))
+		return overrides
+
+	overrides = {}
+	for arg in source:
+		if (arg.startswith('@')):
+			overrides.update(readOverrides(arg[1:]))
+			continue
+		if not('=' in arg):
+			raise ValueError("{:s}: overrides are given as key=value".format(arg))
+		[key, value] = arg.split('=', 1)
+		overrides[key.strip()] = value.strip()
+	return overrides
 
 class XSimBench:
 	"""
 	Test bench object
 	"""
 
-	def __init__(self, dicts):
+	def __init__(self, dicts, tracer=None):
 		self.descriptor = dicts
+		self.tracer = tracer # phase spans (XSimTracer)
+		if (tracer is None):
+			self.tracer = XSimTracer() # disabled until a sink is attached
 
 		# attributes
 		self.lang = None
 		self.sample_rate = 100E6
-		self.libs = []
-		self.libs.append(["ieee","std_logic_1164.all"]) # always needed
-		
-		self.params = []
-
-		self.stimuli = []
-
-		for d in dicts:
-			self.addFromDictionnary(d)
-
-		self.checkEnvSanity()
+		self.blocksize = None # streamed stimuli when set
+		self.cache = None
+		self.seed = None
+		self.workers = None
+		self.stimulus_mode = 'lut'
+		self.stimulus_fracbits = 16
+		self.outputs = []
+		self.analysis_executor = 'serial'
+		self.analysis_workers = None
+		self.analysis_timeout = None
+		self.report = None # headless when set
+		self.store = None # results history
+
+		self.load(dicts)
 
 		# custom PRE/POST package hooks
 		self._customPrePackageHook = None
@@ -49,226 +403,97 @@ class XSimBench:
 		# custom method to analyze sim. results
 		self._customAnalysisMethod = None
 
+	def load(self, dicts):
+		"""
+		(Re)builds libraries, parameters, stimuli, attributes
+		& simulation outputs from a dictionnary/JSON descriptor
+		"""
+		start = time.perf_counter()
+		self.descriptor = dicts
+		self.libs = []
+		self.libs.append(["ieee","std_logic_1164.all"]) # always needed
+		self.outputs = []
+		
+		self.params = XSimRegistry()
+
+		self.stimuli = XSimRegistry()
+
+		self.entries = {} # descriptor entry per key
+
+		for d in dicts:
+			self.addFromDictionnary(d)
+
+		self.checkEnvSanity()
+		self.tracer.record('load', start, category='descriptor', entries=len(dicts))
+
 	def addFromDictionnary(self, d):
 		"""
 		Adds either
 			+ an attribute
 			+ a simulation parameter
 			+ a signal to be generated
-		from a dictionnary/JSON descriptor
+		from a dictionnary/JSON descriptor,
+		decoded with the XSIM_*_SCHEMA tables
 		"""
 		
 		if (d['type'] == 'attribute'):
-			try:
-				lang = d['language']
-				if (lang not in(['vhdl'])):
-					raise ValueError("{:s} language is not supported yet".format(lang.upper()))
-				else:
-					self.lang = lang 
-			except KeyError:
-				pass
+			for field, decode in XSIM_ATTRIBUTE_SCHEMA.items():
+				if (field in d):
+					decode(self, d)
 
+		elif (d['type'] == 'parameter'):
 			try:
-				lib = d['library']
-				self.addSimulationLibrary(lib)
-
+				schema = XSIM_PARAM_SCHEMA[d['ptype']]
 			except KeyError:
-				pass
+				return
 
-		elif (d['type'] == 'parameter'):
-			ptype = d['ptype']
 			key = d['key']
-			value = d['value']
-				
-			if (ptype == 'fixed_point'):
-				mhelp = None
-				try:
-					mhelp = d['help']
-				except KeyError:
-					pass
-				
-				hidden = False	
-				try:
-					hidden = d['hidden']
-				except KeyError:
-					pass
+			kwargs = {}
+			for field, [kwarg, default] in schema['fields'].items():
+				kwargs[kwarg] = d.get(field, default)
+			param = schema['class'](key, d['value'], **kwargs)
 
-				fxp = XSimFixedPointParam(key, value, help=mhelp, hidden=hidden)
-					
-				try:
-					fxp.setRange(d['Qmin'],d['Qmax'])
-				except KeyError:
-					pass
-					
-				mhelp = fxp.getHelpString()
-				try:
-					mhelp += ' [{:d}:{:d}]'.format(d['Qmin'],d['Qmax'])
-				except KeyError:
-						pass
+			[lo, hi] = schema['range']
+			if (lo in d) and (hi in d):
+				param.setBounds(d[lo], d[hi])
+				param.setHelpString('{:s} [{}:{}]'.format(param.getHelpString() or '', d[lo], d[hi]))
 
-				fxp.setHelpString(mhelp)
+			for lib in schema['libraries']:
+				self.addSimulationLibrary(lib) # will be required
 
-				self.params.append(fxp)
-				self.addSimulationLibrary(['ieee_proposed', "fixed_pkg"]) # will be required
-					
-			elif (ptype == 'string'):
-				mhelp = None
-				try:
-					mhelp = d['help']
-				except KeyError:
-						pass
-			
-				allowed = None
-				try:
-					allowed = d['values']
-				except KeyError:
-						pass
-
-				hidden = False
-				try:
-					hidden = d['hidden']
-				except KeyError:
-					pass
-
-				self.params.append(XSimStringParam(key, value, help=mhelp, allowed=allowed, hidden=hidden))
-
-			elif (ptype == 'float'):
-				allowed = None
-				try:
-					allowed = d['values']
-				except KeyError:
-					pass
-
-				mhelp = None
-				try:
-					mhelp = d['help']
-				except KeyError:
-					pass
-
-				hidden = False
-				try:
-					hidden = d['hidden']
-				except KeyError:
-					pass
-
-				formatstr = None
-				try:
-					formatstr = d['formatstr']
-				except KeyError:
-					pass
-
-				self.params.append(XSimFloatParam(key, value, help=mhelp, allowed=allowed, hidden=hidden, formatstr=formatstr))
-
-			elif (ptype == 'bool'):
-				hidden = False
-				try:
-					hidden = d['hidden']
-				except KeyError:
-					pass
-
-				self.params.append(XSimBoolParam(key, value, help=d['help'], hidden=hidden))
-
-			elif (ptype == 'integer'):
-				mhelp = None
-				try:
-					mhelp = d['help']
-				except KeyError:
-					pass
-
-				hidden = False
-				try:
-					hidden = d['hidden']
-				except KeyError:
-					pass
-
-				ipm = XSimIntParam(key, value, help=mhelp, hidden=hidden)
-					
-				try:
-					rm = d['min']
-					rM = d['max']
-					ipm.setRange([d['min'],d['max']])
-					
-					mhelp = ipm.getHelpString()
-					mhelp += ' [{:s}:{:s}]'.format(rm,rM)
-					ipm.setHelpString(mhelp)
-
-				except KeyError:
-					pass
-
-				self.params.append(ipm)
-
-			elif (ptype == 'time'):
-				unit = None
-				try:
-					unit = d['unit']
-				except KeyError:
-					pass
-
-				mhelp = None
-				try:
-					mhelp = d['help']
-				except KeyError:
-					pass
-
-				hidden = False
-				try:
-					hidden = d['hidden']
-				except KeyError:
-					pass
-
-				self.params.append(XSimTimeParam(key, value, unit=unit, help=mhelp, hidden=hidden))
+			self.params.add(param, key, type(param))
+			self.entries.setdefault(key, d)
 			
 		elif (d['type'] == 'stimulus'):
-			if (d['stype'] == 'sinewave'):
-				key = d['key']
-				a = d['amplitude']
-				f = d['frequency']
-				nsymbols = d['n-symbols']
+			try:
+				[cls, fields] = XSIM_STIMULUS_SCHEMA[d['stype']]
+			except KeyError:
+				return
 
-				options = None
-				try:
-					options = d['options']
-				except KeyError:
-					pass
-
-				stm = XSimSineWaveStimulus(key, a, f, nsymbols, sample_rate=self.getSampleRate(), options=options)
-				self.stimuli.append(stm)
-
-			elif (d['stype'] == 'ramp'):
-				key = d['key']
-				a = d['amplitude']
-				nperiods = d['n-periods']
-				nsymbols = d['n-symbols']
-					
-				options = None
-				try:
-					options = d['options']
-				except KeyError:
-					pass
-
-				self.stimuli.append(XSimRampStimulus(key, a, nperiods, nsymbols, sample_rate=self.getSampleRate(), options=options))
-
-			elif (d['stype'] == 'squarewave'):
-				key = d['key']
-				a = d['amplitude']
-				nperiods = d['n-periods']
-				nsymbols = d['n-symbols']
-					
-				options = None
-				try:
-					options = d['options']
-				except KeyError:
-					pass
+			key = d['key']
+			stim = cls(key, *[d[field] for field in fields], sample_rate=self.getSampleRate(), options=d.get('options'))
+			self.stimuli.add(stim, key, stim.getType())
+			self.entries.setdefault(key, d)
+
+			stim.setDescriptor(d)
+			if ('seed' in d):
+				stim.setSeed(d['seed'])
 
-				self.stimuli.append(XSimSquareWaveStimulus(key, a, nperiods, nsymbols, sample_rate=self.getSampleRate(), options=options))
+			if ('quantize' in d):
+				q = d['quantize']
+				stim.setQuantization(q['param'], rounding=q.get('rounding', 'nearest'), overflow=q.get('overflow', 'saturate'), emit=q.get('emit', 'integer'))
 
-	def runCLI(self):
+	def runCLI(self, overrides=None):
 		"""
 		Runs command line interface
 		CLI regroups all simulation parameters
 		and allows user to modify all of them
-		before running simulation
+		before running simulation.
+		Non interactive when overrides are given:
+		they are applied at once (see override)
 		"""
+		if (overrides is not None):
+			return self.override(overrides)
 
 		# build interface
 		cli = "\n\033[91mxsim>\033[0m\n"
@@ -311,52 +536,68 @@ class XSimBench:
 	def __str__(self):
 		return str(self.descriptor)
 
-	def modify(self, key, value):
+	def override(self, overrides, verbose=True):
 		"""
-		Modifies given parameter identified by key
+		Applies a whole set of overrides (dict, 'key=value' arguments
+		or file, see readOverrides) in a single pass: all values are
+		converted & checked first, nothing is modified unless
+		all of them are valid. Prints & returns the
+		[key, previous value, new value] changes
 		"""
-		# replace in descriptor
-		found = None 
+		overrides = readOverrides(overrides)
+		descriptor = copy.deepcopy(self.descriptor)
+		index = descriptorIndex(descriptor)
 
-		for d in self.descriptor:
-			
-			keyValue = None
+		changes = []
+		errors = []
+		for key, value in overrides.items():
 			try:
-				keyValue = d['key']
-			except KeyError:
-				pass
-
-			if keyValue == key:
-				
-				if (d['ptype'] == 'float'):
-					nValue = float(value)
-					d['value'] = nValue 
-					found = d
-
-				elif (d['ptype'] == 'bool'):
-					nValue = int(value)
-					d['value'] = nValue 
-					found = d
-
-				elif (d['ptype'] == 'integer'):
-					nValue = int(value)
-					d['value'] = nValue 
-					found = d
-
-				elif (d['ptype'] == 'string'):
-					nValue = str(value)
-					d['value'] = nValue 
-					found = d
+				change = applyOverride(descriptor, key, value, index=index)
+			except (KeyError, ValueError, TypeError) as e:
+				errors.append("{:s}: {}".format(key, e.args[0] if (len(e.args) > 0) else e))
+				continue
+			if (change[1] != change[2]):
+				changes.append(change)
+
+		if (len(errors) > 0):
+			raise ValueError("Invalid overrides:\n\t" + "\n\t".join(errors))
+
+		# rebuilt from the new descriptor, restored on failure
+		previous = self.descriptor
+		try:
+			self.load(descriptor)
+		except Exception:
+			self.load(previous)
+			raise
+		previous[:] = descriptor
+		self.descriptor = previous
+
+		if (verbose):
+			if (len(changes) == 0):
+				print("Configuration unchanged")
+			else:
+				print("Configuration changes:")
+				for [key, old, new] in changes:
+					print("\t{:s}: {} -> {}".format(key, old, new))
+		return changes
 
+	def modify(self, key, value):
+		"""
+		Modifies given parameter identified by key
+		"""
+		# replace in descriptor
+		found = self.entries.get(key)
 		if (found is None):
 			print("Parameter {:s} not found in descriptor".format(key))
 			return -1
 	
-		# replace in self 
+		# replace in self 
 		if found['type'] == 'attribute':
 			raise ValueError('not ready yet!!')
 
 		elif found['type'] == 'parameter':
+			nValue = XSIM_PTYPE_CONVERTERS[found['ptype']](value)
+			found['value'] = nValue
 			param = self.searchParamsByKey(key)	
 			param.setValue(nValue)
 
@@ -368,6 +609,11 @@ class XSimBench:
 	###################
 	# XSim attributes #
 	###################
+	def setLanguage(self, lang):
+		if (lang not in(['vhdl'])):
+			raise ValueError("{:s} language is not supported yet".format(lang.upper()))
+		self.lang = lang
+
 	def getLanguage(self):
 		"""
 		Returns simulator language
@@ -375,27 +621,285 @@ class XSimBench:
 		"""
 		return self.lang
 
+	def setStreaming(self, blocksize=XSIM_BLOCK_SIZE):
+		"""
+		Streams stimuli block by block while writing the package
+		instead of generating them all at once,
+		memory usage is then bounded by blocksize.
+		None disables streaming
+		"""
+		self.blocksize = blocksize
+
+	def getBlockSize(self):
+		return self.blocksize
+
+	def isStreaming(self):
+		return self.blocksize is not None
+
+	def setStimulusCache(self, cache):
+		"""
+		Reuses stimuli stored in given XSimStimulusCache
+		instead of generating them, None disables caching
+		"""
+		self.cache = cache
+
+	def getStimulusCache(self):
+		return self.cache
+
+	def setSeed(self, seed):
+		"""
+		Seeds all stimuli noise: stimulus #i draws from
+		child #i of SeedSequence(seed), unless it declares its own seed.
+		None: fresh entropy on every generation
+		"""
+		self.seed = seed
+
+	def getSeed(self):
+		return self.seed
+
+	def seedStimuli(self):
+		"""
+		Spawns one SeedSequence per stimulus
+		"""
+		if (self.seed is None):
+			for stim in self.stimuli:
+				stim.setSeedSequence(None)
+			return
+
+		children = np.random.SeedSequence(self.seed).spawn(self.numberOfStimuli())
+		for i in range(0, self.numberOfStimuli()):
+			self.stimuli[i].setSeedSequence(children[i])
+
+	def setWorkers(self, workers):
+		"""
+		Number of processes stimuli noise is generated with
+		"""
+		self.workers = workers
+
+	def getWorkers(self):
+		return self.workers
+
+	def setStimulusMode(self, mode):
+		"""
+		How stimuli are handed to the test bench:
+			+ 'lut': constant real arrays in package_tb
+			+ 'hex': one hexadecimal word per line, read with textio
+			+ 'binary': raw little endian 32b integers (file of integer)
+		'hex' & 'binary' files are written next to the package
+		and read at run time by xsim_stimulus_reader instances
+		"""
+		if not(mode in XSIM_STIMULUS_MODES):
+			raise ValueError("{:s} stimulus mode is not supported".format(mode))
+		self.stimulus_mode = mode
+
+	def getStimulusMode(self):
+		return self.stimulus_mode
+
+	def setStimulusFracBits(self, fracbits):
+		"""
+		Fractionnal bits of 'hex' & 'binary' stimulus words
+		"""
+		self.stimulus_fracbits = fracbits
+
+	def getStimulusFracBits(self):
+		return self.stimulus_fracbits
+
+	def addSimulationOutput(self, reader):
+		"""
+		Declares a simulation output file (XSimOutputReader),
+		read by postSimRun when no _customDataParsingHook is defined
+		"""
+		self.outputs.append(reader)
+
+	def getSimulationOutputs(self):
+		return self.outputs
+
+	def readSimulationOutputs(self):
+		"""
+		Returns one data set per declared output file:
+		list of arrays, one per selected column
+		"""
+		data = []
+		for reader in self.outputs:
+			with self.tracer.span('output:{:s}'.format(os.path.basename(reader.getFile())), category='results'):
+				data.append(reader.read())
+		return data
+
+	def setAnalysisExecutor(self, executor, workers=None, timeout=None):
+		"""
+		How _customAnalysisMethod is run over data sets
+		('serial', 'thread' or 'process', see XSimAnalysisPool),
+		analyses lasting more than timeout [s] are FAILED
+		"""
+		if not(executor in XSIM_ANALYSIS_EXECUTORS):
+			raise ValueError("{:s} analysis executor is not supported".format(executor))
+		self.analysis_executor = executor
+		self.analysis_workers = workers
+		self.analysis_timeout = timeout
+
+	def getAnalysisExecutor(self):
+		return self.analysis_executor
+
+	def getAnalysisWorkers(self):
+		return self.analysis_workers
+
+	def getAnalysisTimeout(self):
+		return self.analysis_timeout
+
+	def runAnalysis(self, data):
+		"""
+		Runs _customAnalysisMethod over all data sets,
+		returns results in data sets order
+		"""
+		pool = XSimAnalysisPool(self._customAnalysisMethod, executor=self.analysis_executor, workers=self.analysis_workers, timeout=self.analysis_timeout)
+		bench = self
+		if (self.analysis_executor == 'process'):
+			bench = self.analysisBench() # pickled once per worker
+		return pool.run(bench, data)
+
+	def analysisBench(self):
+		"""
+		Returns a shallow copy of the bench for analysis
+		process workers: attributes, parameters & descriptor,
+		stimuli without their generated symbols
+		"""
+		bench = copy.copy(self)
+		bench.stimuli = XSimRegistry()
+		for stim in self.stimuli:
+			stripped = copy.copy(stim)
+			stripped.symbols = None
+			bench.stimuli.add(stripped, stim.getKey(), stim.getType())
+		return bench
+
+	def setReport(self, report):
+		"""
+		Results are rendered to given XSimReport
+		instead of the UI (no Qt event loop)
+		"""
+		self.report = report
+
+	def getReport(self):
+		return self.report
+
+	def isHeadless(self):
+		return (self.report is not None)
+
+	def setTracer(self, tracer):
+		self.tracer = tracer
+
+	def getTracer(self):
+		return self.tracer
+
+	def setTrace(self, chrome=None, summary=False):
+		"""
+		Traces phases to Chrome trace events file chrome
+		and/or prints a summary table of their durations,
+		sinks already attached are kept (descriptor reloads)
+		"""
+		sinks = self.tracer.getSinks()
+		if (chrome is not None) and not(chrome in [sink.getFile() for sink in sinks if isinstance(sink, XSimChromeTraceSink)]):
+			self.tracer.addSink(XSimChromeTraceSink(chrome))
+		if (summary) and not(any([isinstance(sink, XSimSummarySink) for sink in sinks])):
+			self.tracer.addSink(XSimSummarySink())
+
+	def setStore(self, store):
+		"""
+		Results are recorded to given XSimStore,
+		along with the parameter set
+		"""
+		self.store = store
+
+	def getStore(self):
+		return self.store
+
+	def quantizationParam(self, stim):
+		"""
+		Returns fixed point parameter given stimulus is quantized to
+		"""
+		key = stim.getQuantization()['param']
+		param = self.searchParamsByKey(key)
+		if (type(param) != XSimFixedPointParam):
+			raise XSimError("stimulus {:s} is quantized to {:s} which is not a fixed point parameter".format(stim.getKey(), key))
+		return param
+
+	def quantizedType(self, stim):
+		"""
+		Returns VHDL LUT type of given quantized stimulus
+		"""
+		if (stim.getQuantization()['emit'] == 'integer'):
+			return 'mem_int'
+		return 'mem_slv{:d}'.format(self.quantizationParam(stim).width())
+
+	def writeQuantized(self, fd, stim, blocksize):
+		"""
+		Writes given stimulus quantized values, block by block,
+		clipped values are accounted in stim.clips
+		"""
+		q = stim.getQuantization()
+		param = self.quantizationParam(stim)
+		if (q['emit'] == 'integer') and (param.width() > 32 - int(not(param.isSigned()))):
+			raise XSimError("{:s} does not fit in a VHDL integer, emit it as 'slv'".format(str(param)))
+
+		stim.clips = 0
+		first = True
+		for block in stim.iterBlocks(blocksize):
+			for start in range(0, len(block), XSIM_FORMAT_CHUNK):
+				[words, clips] = param.quantize(block[start:start+XSIM_FORMAT_CHUNK], rounding=q['rounding'], overflow=q['overflow'])
+				stim.clips += clips
+				if not(first):
+					fd.write(',')
+				if (q['emit'] == 'integer'):
+					fd.write(formatIntegers(words))
+				else:
+					fd.write(formatVectors(words, param.width()))
+				first = False
+
+	def stimulusFile(self, fp, index):
+		"""
+		Returns data file of stimulus #index
+		for package written to fp
+		"""
+		if (self.stimulus_mode == 'hex'):
+			ext = 'hex'
+		else:
+			ext = 'bin'
+		directory = os.path.dirname(os.path.abspath(fp))
+		return os.path.join(directory, 'stim{:d}.{:s}'.format(index, ext))
+
+	def writeStimulusFile(self, fp, stim):
+		"""
+		Writes given stimulus to data file fp, block by block,
+		returns sections that changed (see XSimHashWriter.commit)
+		"""
+		blocksize = self.getBlockSize()
+		if (blocksize is None):
+			blocksize = XSIM_BLOCK_SIZE
+
+		binary = (self.stimulus_mode != 'hex')
+		with self.tracer.span('stimulus-file:{:s}'.format(stim.getKey()), category='package', symbols=stim.numberOfSymbols()):
+			with XSimHashWriter(fp, binary=binary, buffering=XSIM_WRITE_BUFFER) as fd:
+				for block in stim.iterBlocks(blocksize):
+					words = toWords(block, self.stimulus_fracbits, width=XSIM_STIMULUS_WIDTH)
+					if (binary):
+						fd.write(words.astype('<i4').tobytes())
+					else:
+						fd.write(formatHexWords(words, width=XSIM_STIMULUS_WIDTH))
+				return fd.commit()
+
 	###################
 	# XSim Parameters #
 	###################
 	def getParams(self):
-		return self.params
+		return self.params.getItems()
 
 	def getNumberOfParams(self):
 		return len(self.params)
 	
 	def searchParamsByType(self, ptype):
-		results = []
-		for param in self.params:
-			if (type(param) == ptype):
-				results.append(param)
-		return results
+		return self.params.bucket(ptype)
 
 	def searchParamsByKey(self, key):
-		for param in self.params:
-			if (param.getKey() == key):
-				return param
-		return None
+		return self.params.get(key)
 
 	def getFixedPointParams(self):
 		return self.searchParamsByType(XSimFixedPointParam)
@@ -410,36 +914,28 @@ class XSimBench:
 		return self.searchParamsByType(XSimFloatParam)
 
 	def getSampleRate(self):
-		params = self.getFloatParams()
-		for p in params:
-			if (p.getKey() == 'sample_rate'):
-				return p.getValue()
+		param = self.params.get('sample_rate')
+		if (type(param) == XSimFloatParam):
+			return param.getValue()
 		return None
 
 	################
 	# XSim stimuli #
 	################
 	def getStimuli(self):
-		return self.stimuli
+		return self.stimuli.getItems()
 
 	def searchStimuliByType(self, _type):
 		"""
 		Returns list of stimulus with matching type 
 		"""
-		results = []
-		for stim in self.stimuli:
-			if (stim.getType() == _type):
-				results.append(stim)
-		return results
+		return self.stimuli.bucket(_type)
 
 	def searchStimulusByKey(self, key):
 		"""
 		Returns stimulus for with key did match
 		"""
-		for stim in self.stimuli:
-			if (stim.getKey() == key):
-				return stim
-		return None
+		return self.stimuli.get(key)
 
 	def numberOfStimuli(self):
 		"""
@@ -454,7 +950,7 @@ class XSimBench:
 		"""
 		already_included = False
 		for _lib in self.libs:
-			if (_lib[0] == lib[0]):
+			if (_lib[0] == lib[0]) and (_lib[1] == lib[1]):
 				already_included = True
 		
 		if not(already_included):
@@ -481,83 +977,241 @@ class XSimBench:
 
 	def writePackage(self, fp):
 		if (self._customPrePackageHook is not None):
-			self._customPrePackageHook()
+			with self.tracer.span('pre-package-hook', category='hook'):
+				self._customPrePackageHook()
 
 		# generate stimuli
-		for stim in self.stimuli:
-			stim._generate()
+		with self.tracer.span('stimuli', category='stimuli', stimuli=self.numberOfStimuli()):
+			self.seedStimuli()
+			stimuli = self.stimuli
+			if (self.cache is not None):
+				with self.tracer.span('cache-load', category='cache'):
+					stimuli = [stim for stim in stimuli if not(self.cache.load(stim))]
+
+			if (self.isStreaming()):
+				for stim in stimuli:
+					stim.clearSymbols() # generated while writing
+					if (self.cache is not None):
+						self.cache.storeBlocks(stim, self.getBlockSize())
+			else:
+				XSimStimulusEngine(stimuli, workers=self.getWorkers(), tracer=self.tracer).run()
+				if (self.cache is not None):
+					with self.tracer.span('cache-store', category='cache'):
+						for stim in stimuli:
+							self.cache.store(stim)
 
 		if (self.lang == "vhdl"):
-			self.writeVHDLPackage(fp)
+			with self.tracer.span('package', category='package', mode=self.getStimulusMode()):
+				changes = self.writeVHDLPackage(fp)
 		else:
 			raise ValueError("Verilog simulation is not supported yet")
+
+		if (len(changes) == 0):
+			print("{:s} is up to date".format(fp))
+		elif (changes == ['*']):
+			print("{:s} has been written".format(fp))
+		else:
+			print("{:s} has been updated: {:s}".format(fp, ', '.join(changes)))
 			
-		if (self._customPrePackageHook is not None):
-			self._customPostPackageHook()
+		if (self._customPostPackageHook is not None):
+			with self.tracer.span('post-package-hook', category='hook'):
+				self._customPostPackageHook()
+
+		self.tracer.flush()
+		return changes
 
 	def writeVHDLPackage(self, fp):
-		fd = open(fp,"w")
+		"""
+		Writes package_tb to fp, which is only replaced
+		if its content changed. Returns changed sections:
+		'libraries', 'param:<key>', 'stimuli', 'stimulus:<key>'..,
+		['*'] if fp did not exist, [] if left untouched
+		"""
+		with XSimHashWriter(fp, buffering=XSIM_WRITE_BUFFER) as fd:
+			fd.section('libraries')
 		
-		# retrieve library headers
-		headers = []
-		for lib in self.getLibraries():
-			if not(lib[0] in headers):
-				headers.append(lib[0])
-
-		# declare & include all libraries 
-		for header in headers:
-			fd.write("library {:s};\n".format(header))
+			# retrieve library headers
+			headers = []
 			for lib in self.getLibraries():
-				if (lib[0] == header):
-					fd.write("use {:s}.{:s};\n".format(lib[0],lib[1]))
-			fd.write("\n")
-
-		fd.write("package package_tb is \n")
-
-		fd.write("\t ---- XSIM params ---- \n")
-		for param in self.getParams():
-			param.declare(fd, lang=self.getLanguage())
-		fd.write("\t ------ end XSIM params -------\n")
-
-		if (len(self.stimuli) > 0):
-			# stimuli have been declared
-			fd.write("\t ---- XSIM stimuli ---- \n")
-			lutsize = self.stimuli[0].numberOfSymbols()
-			fd.write('\tconstant N_SYMBOLS: natural := {:d};\n'.format(lutsize))
-			fd.write('\ttype mem is array(0 to N_SYMBOLS-1) of real;\n')
-			for i in range(0, self.numberOfStimuli()):
-				fd.write('\n\tconstant lut{:d}: mem := ('.format(i))
-				symbols = self.stimuli[i].getSymbols()
-				string = ''
-				for j in range(0, len(symbols)-1):
-					string += '{:.6e},'.format(symbols[j])
-				string += '{:.6e});\n'.format(symbols[-1])
-				fd.write(string)
-			fd.write("\t ---- end XSIM stimuli ---- \n")
-
-		fd.write("end package package_tb;\n\n")
+				if not(lib[0] in headers):
+					headers.append(lib[0])
+
+			# declare & include all libraries 
+			for header in headers:
+				fd.write("library {:s};\n".format(header))
+				for lib in self.getLibraries():
+					if (lib[0] == header):
+						fd.write("use {:s}.{:s};\n".format(lib[0],lib[1]))
+				fd.write("\n")
+
+			if (len(self.stimuli) > 0) and (self.getStimulusMode() != 'lut'):
+				# stimulus file readers
+				fd.write("use std.textio.all;\n")
+				if (self.getStimulusMode() == 'hex'):
+					fd.write("use ieee.numeric_std.all;\n")
+					fd.write("use ieee.std_logic_textio.all;\n")
+				fd.write("\n")
+
+			fd.write("package package_tb is \n")
+
+			fd.write("\t ---- XSIM params ---- \n")
+			for param in self.getParams():
+				fd.section('param:{:s}'.format(param.getKey()))
+				param.declare(fd, lang=self.getLanguage())
+			fd.section('package')
+			fd.write("\t ------ end XSIM params -------\n")
+
+			mode = self.getStimulusMode()
+			files_changes = []
+			if (len(self.stimuli) > 0):
+				# stimuli have been declared
+				fd.section('stimuli')
+				fd.write("\t ---- XSIM stimuli ---- \n")
+				lutsize = self.stimuli[0].numberOfSymbols()
+				fd.write('\tconstant N_SYMBOLS: natural := {:d};\n'.format(lutsize))
+
+				if (mode == 'lut'):
+					fd.write('\ttype mem is array(0 to N_SYMBOLS-1) of real;\n')
+					blocksize = self.getBlockSize()
+					if (blocksize is None):
+						blocksize = XSIM_BLOCK_SIZE
+
+					# quantized LUT types
+					types = []
+					for stim in self.stimuli:
+						if (stim.isQuantized()):
+							mtype = self.quantizedType(stim)
+							if not(mtype in types):
+								types.append(mtype)
+								if (mtype == 'mem_int'):
+									fd.write('\ttype mem_int is array(0 to N_SYMBOLS-1) of integer;\n')
+								else:
+									fd.write('\ttype {:s} is array(0 to N_SYMBOLS-1) of std_logic_vector({:d}-1 downto 0);\n'.format(mtype, self.quantizationParam(stim).width()))
+
+					for i in range(0, self.numberOfStimuli()):
+						stim = self.stimuli[i]
+						fd.section('stimulus:{:s}'.format(stim.getKey()))
+						with self.tracer.span('lut:{:s}'.format(stim.getKey()), category='package', symbols=stim.numberOfSymbols()):
+							if (stim.isQuantized()):
+								fd.write('\n\tconstant lut{:d}: {:s} := ('.format(i, self.quantizedType(stim)))
+								self.writeQuantized(fd, stim, blocksize)
+								fd.write(');\n')
+								print("lut{:d} ({:s}): {:d}/{:d} symbols clipped to {:s}".format(i, stim.getKey(), stim.getClipCount(), stim.numberOfSymbols(), str(self.quantizationParam(stim))))
+							else:
+								fd.write('\n\tconstant lut{:d}: mem := ('.format(i))
+								writeReals(fd, stim.iterBlocks(blocksize))
+								fd.write(');\n')
+				else:
+					fd.write('\tconstant STIM_WIDTH: natural := {:d};\n'.format(XSIM_STIMULUS_WIDTH))
+					fd.write('\tconstant STIM_FRAC_BITS: natural := {:d};\n'.format(self.getStimulusFracBits()))
+					for i in range(0, self.numberOfStimuli()):
+						sfp = self.stimulusFile(fp, i)
+						if (len(self.writeStimulusFile(sfp, self.stimuli[i])) > 0):
+							files_changes.append('stimulus:{:s}'.format(self.stimuli[i].getKey()))
+						fd.section('stimulus:{:s}'.format(self.stimuli[i].getKey()))
+						fd.write('\tconstant STIM{:d}_FILE: string := "{:s}";\n'.format(i, sfp))
+
+					fd.section('stimuli')
+					if (mode == 'hex'):
+						fd.write('\tprocedure read_stimulus(file f: text; value: out real);\n')
+					else:
+						fd.write('\ttype stim_file is file of integer;\n')
+						fd.write('\tprocedure read_stimulus(file f: stim_file; value: out real);\n')
+				fd.section('stimuli')
+				fd.write("\t ---- end XSIM stimuli ---- \n")
+
+			fd.section('package')
+			fd.write("end package package_tb;\n\n")
 		
-		fd.write("package body package_tb is\n")
-		fd.write("end package body package_tb;\n")
-		fd.close()
+			fd.write("package body package_tb is\n")
+			if (len(self.stimuli) > 0) and (mode != 'lut'):
+				fd.write(XSIM_STIMULUS_READERS[mode][0])
+			fd.write("end package body package_tb;\n")
+
+			if (len(self.stimuli) > 0) and (mode != 'lut'):
+				fd.write(XSIM_STIMULUS_READERS[mode][1])
+
+			changes = fd.commit()
+		if (changes != ['*']):
+			# data files are read at run time,
+			# they do not affect package_tb itself
+			for change in files_changes:
+				if not(change in changes):
+					changes.append(change)
+		return changes
 
 	def postSimRun(self):
 		
-		if (self._customDataParsingHook is None):
-			raise ValueError("_customDataParsingHook has not been defined in XSimBench object")
-
-		data = self._customDataParsingHook() # retrieve data
+		with self.tracer.span('parse', category='results'):
+			if (self._customDataParsingHook is not None):
+				data = self._customDataParsingHook() # retrieve data
+			elif (len(self.outputs) > 0):
+				data = self.readSimulationOutputs()
+			else:
+				raise ValueError("_customDataParsingHook has not been defined in XSimBench object and no simulation output was declared")
 
 		results = [] # passed to UI by user
-		for i in range(0, len(data)): # run for all data sets
-			if (self._customAnalysisMethod is not None):
-				results.append(self._customAnalysisMethod(self, i, data[i]))
+		if (self._customAnalysisMethod is not None):
+			with self.tracer.span('analysis', category='results', executor=self.analysis_executor, datasets=len(data)):
+				results = self.runAnalysis(data) # run for all data sets
+
+		if (self.store is not None) and (len(results) > 0):
+			with self.tracer.span('store', category='results'):
+				self.store.recordBench(self, results)
+
+		if (self.report is not None):
+			with self.tracer.span('report', category='results'):
+				self.report.write(results)
+			print("Report has been written to {:s}".format(self.report.getDirectory()))
+			self.tracer.flush()
+			return self.report.exitCode()
 		
+		with self.tracer.span('ui', category='ui', results=len(results)):
+			self.buildUIBase()
+			self.UIStackSimResults(results)
+		self.tracer.flush()
+		self.exec()
+		return int('FAILED' in [result.getStatus() for result in results])
+
+	def liveView(self, interval=None):
+		"""
+		Live mode, run while the simulator is running:
+		plots values of every declared simulation output
+		as they are written (XSimLivePlot), until the window is closed
+		"""
+		from pyqtgraph.dockarea import DockArea, Dock
+		from XSimPlot import XSimLivePlot, XSIM_LIVE_INTERVAL
+		if (len(self.outputs) == 0):
+			raise ValueError("no simulation output was declared")
+		if (interval is None):
+			interval = XSIM_LIVE_INTERVAL
+
 		self.buildUIBase()
-		self.UIStackSimResults(results)
+		area = DockArea()
+		self.livePlots = []
+		for i in reversed(range(0, len(self.outputs))):
+			reader = self.outputs[i]
+			labels = None
+			if (reader.getColumns() is not None):
+				labels = ['column {:d}'.format(c) for c in reader.getColumns()]
+			plot = XSimLivePlot(XSimOutputTail(reader), labels=labels, interval=interval)
+			self.livePlots.insert(0, plot)
+			d = Dock(os.path.basename(reader.getFile()), size=(1,1))
+			d.addWidget(plot)
+			if (i == len(self.outputs)-1):
+				area.addDock(d)
+			else:
+				area.addDock(d, 'above', pdock)
+			pdock = d
+
+		widget = self.getUIWidget()
+		widget.setCentralWidget(area)
+		widget.resize(500,500)
 		self.exec()
+		return 0
 
 	def buildUIBase(self):
+		from PyQt5.QtWidgets import QApplication, QMainWindow, QAction
 		self.ui = QApplication([])
 		self.ui.setStyle('plastique')
 
@@ -584,6 +1238,7 @@ class XSimBench:
 		in central widget
 		as a pyqtgraph.plot object
 		"""
+		from pyqtgraph.dockarea import DockArea, Dock
 		widget = self.getUIWidget()
 		
 		# building central widget
@@ -610,6 +1265,8 @@ class XSimBench:
 		Displays simulation result in a frame
 		Optionnal data plot
 		"""
+		from PyQt5.QtWidgets import QWidget, QVBoxLayout
+		from XSimPlot import XSimLazyWidget
 		widget = QWidget()
 		layout = QVBoxLayout()
 
@@ -626,27 +1283,36 @@ class XSimBench:
 		layout.addWidget(widget1)
 
 		for i in range(0, len(result.getDataSets())):
-			# add plot widget item
-			plot = pg.PlotWidget()
-			plot.enableAutoRange()
-			plot.showGrid(x=True, y=True)
-			
-			pItem = plot.getPlotItem()
-			settings = result.getPlotSettings(i)
-			if (settings):
-				pItem.setLabel('left', settings['left-label'], units=settings['left-unit'])
-				pItem.setLabel('bottom', settings['bottom-label'], units=settings['bottom-unit'])
-				plot.setLogMode(x=settings['logx'],y=settings['logy'])
-			
-			data = result.getDataSet(i)
-			plot.plot(data[0],data[1])
-
-			plot.resize(400,400)
-			layout.addWidget(plot)
+			# plots are only built once their dock is first shown
+			layout.addWidget(XSimLazyWidget(lambda i=i: self.makePlotWidget(result, i)))
 
 		widget.setLayout(layout)
 		return widget
 
+	def makePlotWidget(self, result, i):
+		"""
+		Builds plot widget of result data set i,
+		curve is decimated to the view range (XSimEnvelopeCurve)
+		"""
+		import pyqtgraph as pg
+		from XSimPlot import XSimEnvelopeCurve
+		plot = pg.PlotWidget()
+		plot.enableAutoRange()
+		plot.showGrid(x=True, y=True)
+		
+		pItem = plot.getPlotItem()
+		settings = result.getPlotSettings(i)
+		if (settings):
+			pItem.setLabel('left', settings['left-label'], units=settings['left-unit'])
+			pItem.setLabel('bottom', settings['bottom-label'], units=settings['bottom-unit'])
+			plot.setLogMode(x=settings['logx'],y=settings['logy'])
+		
+		data = result.getDataSet(i)
+		plot.curve = XSimEnvelopeCurve(plot, data[0], data[1])
+
+		plot.resize(400,400)
+		return plot
+
 	def save(self, clicked):
 		"""
 		Called when file->save has been clicked
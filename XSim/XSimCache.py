@@ -0,0 +1,366 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+import numpy as np
+
+from XSimHash import *
+
+# bump when generated symbols change for an identical descriptor
+XSIM_CACHE_VERSION = 1
+
+class XSimStimulusCache:
+	"""
+	Content addressed on-disk stimulus cache:
+	symbols are stored as <hash>.npy where hash covers
+	the normalized stimulus descriptor, its sample rate and seed.
+	Least recently used entries are evicted
+	once the cache exceeds maxsize [bytes]
+	"""
+
+	def __init__(self, directory, maxsize=4*1024**3):
+		self.directory = directory
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		os.makedirs(directory, exist_ok=True)
+
+	def getDirectory(self):
+		return self.directory
+
+	def getMaxSize(self):
+		return self.maxsize
+
+	def getHits(self):
+		return self.hits
+
+	def getMisses(self):
+		return self.misses
+
+	def hitRate(self):
+		total = self.hits + self.misses
+		if (total == 0):
+			return 0.0
+		return self.hits / total
+
+	def key(self, stim):
+		"""
+		Returns cache key for given stimulus,
+		None if it cannot be cached
+		"""
+		d = stim.getDescriptor()
+		if (d is None) or not(stim.isDeterministic()):
+			return None
+
+		content = {
+			'version': XSIM_CACHE_VERSION,
+			'class': type(stim).__name__,
+			'descriptor': d,
+			'sample_rate': stim.getSampleRate(),
+			'seed': None,
+		}
+		# noiseless stimuli do not depend on the seed
+		seedseq = stim.getSeedSequence()
+		if (seedseq is not None) and (stim.hasNoise()):
+			content['seed'] = [seedseq.entropy, list(seedseq.spawn_key), seedseq.pool_size]
+		string = json.dumps(content, sort_keys=True, separators=(',',':'), default=str)
+		return hashlib.sha256(string.encode('utf-8')).hexdigest()
+
+	def path(self, key):
+		return os.path.join(self.directory, '{:s}.npy'.format(key))
+
+	def load(self, stim):
+		"""
+		Assigns cached symbols (memory mapped) to given stimulus,
+		returns True on hit
+		"""
+		key = self.key(stim)
+		if (key is None):
+			return False
+
+		fp = self.path(key)
+		try:
+			stim.symbols = np.load(fp, mmap_mode='r')
+			os.utime(fp) # most recently used
+		except (IOError, OSError, ValueError):
+			self.misses += 1
+			return False
+
+		self.hits += 1
+		return True
+
+	def store(self, stim):
+		"""
+		Stores generated symbols of given stimulus
+		"""
+		key = self.key(stim)
+		if (key is None):
+			return
+
+		fd, tmp = tempfile.mkstemp(suffix='.npy', dir=self.directory)
+		with os.fdopen(fd, 'wb') as f:
+			np.save(f, np.asarray(stim.getSymbols()))
+		os.replace(tmp, self.path(key))
+		self.evict()
+
+	def storeBlocks(self, stim, blocksize):
+		"""
+		Streams given stimulus into the cache block by block
+		and assigns the stored (memory mapped) symbols to it
+		"""
+		key = self.key(stim)
+		if (key is None):
+			return
+
+		fd, tmp = tempfile.mkstemp(suffix='.npy', dir=self.directory)
+		os.close(fd)
+		mm = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float64, shape=(stim.numberOfSymbols(),))
+		start = 0
+		for block in stim.iterBlocks(blocksize):
+			mm[start:start+len(block)] = block
+			start += len(block)
+		mm.flush()
+		del mm
+
+		fp = self.path(key)
+		os.replace(tmp, fp)
+		stim.symbols = np.load(fp, mmap_mode='r')
+		self.evict()
+
+	def size(self):
+		"""
+		Returns current cache size [bytes]
+		"""
+		return sum([entry[2] for entry in self.entries()])
+
+	def entries(self):
+		"""
+		Returns [path, last access, size] for each cached entry
+		"""
+		results = []
+		for name in os.listdir(self.directory):
+			if not(name.endswith('.npy')) or name.startswith('tmp'):
+				continue
+			fp = os.path.join(self.directory, name)
+			try:
+				st = os.stat(fp)
+			except OSError:
+				continue
+			results.append([fp, st.st_mtime, st.st_size])
+		return results
+
+	def evict(self):
+		"""
+		Removes least recently used entries
+		until cache fits in maxsize
+		"""
+		entries = sorted(self.entries(), key=lambda e: e[1])
+		total = sum([e[2] for e in entries])
+		for e in entries:
+			if (total <= self.maxsize):
+				break
+			try:
+				os.remove(e[0])
+			except OSError:
+				continue
+			total -= e[2]
+
+	def clear(self):
+		for e in self.entries():
+			os.remove(e[0])
+
+	def __str__(self):
+		string = "cache: {:s} | hits: {:d} | misses: {:d} | hit rate: {:.1f}%\n".format(self.directory, self.hits, self.misses, 100*self.hitRate())
+		return string
+
+# bump when snapshot cache keys or layout change
+XSIM_SNAPSHOT_CACHE_VERSION = 1
+
+class XSimSnapshotCache:
+	"""
+	On-disk cache of elaborated snapshots (xsim.dir/ of an XSimJob):
+	entries are <key>/ directories where key covers the content of
+	all sources (DUT & generated package), compilation & elaboration
+	options, top, snapshot name and tools. A hit restores the
+	cached xsim.dir/ so that xvhdl & xelab are skipped.
+	Least recently used entries are evicted
+	once the cache exceeds maxsize [bytes]
+	"""
+
+	def __init__(self, directory, maxsize=16*1024**3):
+		self.directory = directory
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self.saved = 0.0 # elaboration time saved by hits [s]
+		self.digests = {} # (path, size, mtime): sha256
+		self.lock = threading.Lock()
+		os.makedirs(directory, exist_ok=True)
+
+	def getDirectory(self):
+		return self.directory
+
+	def getMaxSize(self):
+		return self.maxsize
+
+	def getHits(self):
+		return self.hits
+
+	def getMisses(self):
+		return self.misses
+
+	def getTimeSaved(self):
+		return self.saved
+
+	def hitRate(self):
+		total = self.hits + self.misses
+		if (total == 0):
+			return 0.0
+		return self.hits / total
+
+	def fileDigest(self, fp):
+		"""
+		Returns sha256 of fp content: taken from its XSimHashWriter
+		manifest when up to date (generated package), otherwise
+		hashed once per (size, mtime)
+		"""
+		manifest = readManifest(fp)
+		if (manifest is not None):
+			return manifest['digest']
+
+		st = os.stat(fp)
+		memo = (os.path.abspath(fp), st.st_size, st.st_mtime_ns)
+		if (memo in self.digests):
+			return self.digests[memo]
+
+		digest = hashlib.sha256()
+		with open(fp, 'rb') as fd:
+			for block in iter(lambda: fd.read(1 << 20), b''):
+				digest.update(block)
+		self.digests[memo] = digest.hexdigest()
+		return self.digests[memo]
+
+	def key(self, job, tools):
+		"""
+		Returns cache key of given XSimJob,
+		None if a source cannot be read
+		"""
+		try:
+			sources = [self.fileDigest(os.path.join(job.getWorkdir(), source)) for source in job.getSources()]
+		except (IOError, OSError):
+			return None
+
+		content = {
+			'version': XSIM_SNAPSHOT_CACHE_VERSION,
+			'sources': sources,
+			'top': job.getTop(),
+			'snapshot': job.getSnapshot(),
+			'options': [job.options.get('xvhdl', []), job.options.get('xelab', [])],
+			'tools': [tools.get('xvhdl'), tools.get('xelab')],
+		}
+		string = json.dumps(content, sort_keys=True, separators=(',',':'), default=str)
+		return hashlib.sha256(string.encode('utf-8')).hexdigest()
+
+	def path(self, key):
+		return os.path.join(self.directory, key)
+
+	def restore(self, key, workdir):
+		"""
+		Replaces workdir/xsim.dir with cached snapshot,
+		returns True on hit
+		"""
+		if (key is None):
+			return False
+
+		entry = self.path(key)
+		try:
+			with open(os.path.join(entry, 'entry.json'), 'r') as fd:
+				metadata = json.load(fd)
+			target = os.path.join(workdir, 'xsim.dir')
+			shutil.rmtree(target, ignore_errors=True)
+			shutil.copytree(os.path.join(entry, 'xsim.dir'), target, symlinks=True)
+			os.utime(entry) # most recently used
+		except (IOError, OSError, ValueError, shutil.Error):
+			with self.lock:
+				self.misses += 1
+			return False
+
+		with self.lock:
+			self.hits += 1
+			self.saved += metadata.get('elaboration', 0.0)
+		return True
+
+	def store(self, key, workdir, elaboration):
+		"""
+		Stores workdir/xsim.dir under key,
+		elaboration: time it took to compile & elaborate [s]
+		"""
+		if (key is None):
+			return
+
+		tmp = tempfile.mkdtemp(prefix='tmp', dir=self.directory)
+		try:
+			shutil.copytree(os.path.join(workdir, 'xsim.dir'), os.path.join(tmp, 'xsim.dir'), symlinks=True)
+			with open(os.path.join(tmp, 'entry.json'), 'w') as fd:
+				json.dump({'elaboration': elaboration}, fd)
+			os.rename(tmp, self.path(key))
+		except (IOError, OSError, shutil.Error):
+			shutil.rmtree(tmp, ignore_errors=True) # stored concurrently
+			return
+		self.evict()
+
+	def entrySize(self, fp):
+		size = 0
+		for root, dirs, files in os.walk(fp):
+			for name in files:
+				try:
+					size += os.lstat(os.path.join(root, name)).st_size
+				except OSError:
+					pass
+		return size
+
+	def size(self):
+		"""
+		Returns current cache size [bytes]
+		"""
+		return sum([entry[2] for entry in self.entries()])
+
+	def entries(self):
+		"""
+		Returns [path, last access, size] for each cached snapshot
+		"""
+		results = []
+		for name in os.listdir(self.directory):
+			fp = os.path.join(self.directory, name)
+			if name.startswith('tmp') or not(os.path.isdir(fp)):
+				continue
+			try:
+				st = os.stat(fp)
+			except OSError:
+				continue
+			results.append([fp, st.st_mtime, self.entrySize(fp)])
+		return results
+
+	def evict(self):
+		"""
+		Removes least recently used snapshots
+		until cache fits in maxsize
+		"""
+		with self.lock:
+			entries = sorted(self.entries(), key=lambda e: e[1])
+			total = sum([e[2] for e in entries])
+			for e in entries:
+				if (total <= self.maxsize):
+					break
+				shutil.rmtree(e[0], ignore_errors=True)
+				total -= e[2]
+
+	def clear(self):
+		for e in self.entries():
+			shutil.rmtree(e[0], ignore_errors=True)
+
+	def __str__(self):
+		string = "snapshot cache: {:s} | hits: {:d} | misses: {:d} | hit rate: {:.1f}% | saved: {:.1f} s\n".format(self.directory, self.hits, self.misses, 100*self.hitRate(), self.saved)
+		return string
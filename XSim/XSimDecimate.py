@@ -0,0 +1,94 @@
+import numpy as np
+
+# raw samples per bin of the finest envelope level
+XSIM_ENVELOPE_BIN = 16
+
+# bins of level k+1 regroup this many bins of level k
+XSIM_ENVELOPE_FACTOR = 4
+
+class XSimEnvelope:
+	"""
+	Min/max envelope pyramid of a data set (x ascending):
+	level k holds min & max of y over bins of
+	binsize*factor**k samples. Any x range is then decimated
+	to about npoints bins from the coarsest level
+	that still resolves it, without touching raw samples
+	"""
+
+	def __init__(self, x, y, binsize=XSIM_ENVELOPE_BIN, factor=XSIM_ENVELOPE_FACTOR):
+		self.x = np.asarray(x).ravel()
+		self.y = np.asarray(y).ravel()
+		n = min(len(self.x), len(self.y))
+		self.x = self.x[:n]
+		self.y = self.y[:n]
+		self.factor = factor
+		self.levels = [] # [binsize, min, max]
+
+		# only ascending x can be decimated
+		self.monotonic = (n < 2) or bool(np.all(self.x[1:] >= self.x[:-1]))
+		if not(self.monotonic) or (n <= binsize):
+			return
+
+		ymin = np.minimum.reduceat(self.y, np.arange(0, n, binsize))
+		ymax = np.maximum.reduceat(self.y, np.arange(0, n, binsize))
+		size = binsize
+		while True:
+			self.levels.append([size, ymin, ymax])
+			if (len(ymin) <= factor):
+				break
+			ymin = np.minimum.reduceat(ymin, np.arange(0, len(ymin), factor))
+			ymax = np.maximum.reduceat(ymax, np.arange(0, len(ymax), factor))
+			size *= factor
+
+	def numberOfPoints(self):
+		return len(self.x)
+
+	def isMonotonic(self):
+		return self.monotonic
+
+	def getLevels(self):
+		return self.levels
+
+	def nbytes(self):
+		"""
+		Returns pyramid memory usage [bytes]
+		"""
+		return sum([level[1].nbytes + level[2].nbytes for level in self.levels])
+
+	def decimate(self, xmin=None, xmax=None, npoints=1000):
+		"""
+		Returns [x, y] to be plotted over [xmin, xmax]:
+		raw samples when the finest level would give less
+		than npoints bins (or x is not ascending), otherwise
+		(bin start, min) & (bin start, max) pairs of at least npoints bins
+		"""
+		n = len(self.x)
+		if not(self.monotonic):
+			return [self.x, self.y]
+
+		i0 = 0
+		i1 = n
+		if (xmin is not None) and (n > 0):
+			i0 = max(int(np.searchsorted(self.x, xmin, side='left')) - 1, 0)
+		if (xmax is not None) and (n > 0):
+			i1 = min(int(np.searchsorted(self.x, xmax, side='right')) + 1, n)
+		i1 = max(i1, i0)
+
+		if (len(self.levels) == 0) or ((i1 - i0) < self.levels[0][0]*npoints):
+			return [self.x[i0:i1], self.y[i0:i1]]
+
+		# coarsest level still giving npoints bins
+		level = self.levels[0]
+		for candidate in self.levels:
+			if ((i1 - i0) / candidate[0] < npoints):
+				break
+			level = candidate
+		[size, ymin, ymax] = level
+
+		b0 = i0 // size
+		b1 = (i1 + size - 1) // size
+		xs = np.repeat(self.x[np.arange(b0, b1) * size], 2)
+		ys = np.empty(2*(b1-b0), dtype=np.result_type(ymin.dtype, ymax.dtype))
+		ys[0::2] = ymin[b0:b1]
+		ys[1::2] = ymax[b0:b1]
+		return [xs, ys]
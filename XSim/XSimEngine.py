@@ -0,0 +1,92 @@
+import numpy as np
+
+from XSimTrace import *
+
+def stimulusNoise(stim):
+	"""
+	Returns noise of each process declared in given stimulus,
+	runs in pool workers
+	"""
+	return [stream.read(stim.numberOfSymbols()) for stream in stim.noiseStreams()]
+
+class XSimStimulusEngine:
+	"""
+	Batch stimulus generator:
+	stimuli sharing a sample rate and a number of symbols
+	are planned into a single 2D buffer (one row per stimulus),
+	their time bases are computed once per group
+	and each row is filled in place.
+	tracer: XSimTracer timing noise & every stimulus
+	"""
+
+	def __init__(self, stimuli, dtype=np.float64, workers=None, tracer=None):
+		self.stimuli = stimuli
+		self.dtype = dtype
+		self.workers = workers
+		self.tracer = tracer
+		if (tracer is None):
+			self.tracer = XSimTracer() # disabled
+		self.buffers = []
+
+	def plan(self):
+		"""
+		Groups stimuli by (sample rate, number of symbols),
+		returns {(sample_rate, nsymbols): [stimuli]}
+		"""
+		groups = {}
+		for stim in self.stimuli:
+			key = (stim.getSampleRate(), stim.numberOfSymbols())
+			if not(key in groups):
+				groups[key] = []
+			groups[key].append(stim)
+		return groups
+
+	def run(self):
+		"""
+		Generates all stimuli,
+		each stimulus symbols become a view on its group buffer.
+		Noise is generated over a pool of self.workers processes if > 1:
+		results are identical whatever the number of workers
+		"""
+		for stim in self.stimuli:
+			stim.clearSymbols()
+
+		noise = {}
+		if (self.workers is not None) and (self.workers > 1):
+			# multiprocessing is only imported when workers are used
+			from concurrent.futures import ProcessPoolExecutor
+			noisy = [stim for stim in self.stimuli if len(stim.processes) > 0]
+			with self.tracer.span('noise', category='stimuli', stimuli=len(noisy)), ProcessPoolExecutor(max_workers=self.workers) as pool:
+				for stim, samples in zip(noisy, pool.map(stimulusNoise, noisy)):
+					noise[id(stim)] = [XSimNoiseBuffer(x) for x in samples]
+
+		self.buffers = []
+		for (fs, N), stimuli in self.plan().items():
+			buf = np.empty((len(stimuli), N), dtype=self.dtype)
+			bases = {} # shared time bases
+			for i in range(0, len(stimuli)):
+				stim = stimuli[i]
+				if not(stim.TIMEBASE in bases):
+					bases[stim.TIMEBASE] = stim.timeBase()
+				with self.tracer.span('stimulus:{:s}'.format(stim.getKey()), category='stimuli', symbols=N):
+					stim._fill(buf[i], bases[stim.TIMEBASE], noise=noise.pop(id(stim), None))
+				stim.symbols = buf[i]
+			self.buffers.append(buf)
+		return self.buffers
+
+	def getBuffers(self):
+		return self.buffers
+
+class XSimNoiseBuffer:
+	"""
+	Noise stream reading back precomputed samples
+	"""
+
+	def __init__(self, samples):
+		self.samples = samples
+		self.position = 0
+
+	def read(self, n):
+		x = self.samples[self.position:self.position+n]
+		self.position += n
+		return x
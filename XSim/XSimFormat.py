@@ -0,0 +1,205 @@
+import numpy as np
+
+# symbols formatted per call in writeReals()
+XSIM_FORMAT_CHUNK = 1 << 18
+
+# package file write buffer [bytes]
+XSIM_WRITE_BUFFER = 1 << 20
+
+# 10.0**k for k in [-310:308]
+_POW10 = np.power(10.0, np.arange(-310, 309))
+
+# '0000' to '9999', 4 characters packed per uint32
+_DIGITS4 = np.frombuffer(''.join(['{:04d}'.format(i) for i in range(0, 10000)]).encode('ascii'), dtype=np.uint32)
+
+def formatReals(x, digits=6, sep=','):
+	"""
+	Renders array x as '{:.<digits>e}' values separated by sep,
+	identical to sep.join(['{:.6e}'.format(v) for v in x])
+	but formatted in bulk: digits are computed with vectorized
+	integer arithmetic and assembled as a character matrix
+	"""
+	x = np.asarray(x, dtype=np.float64).ravel()
+	n = len(x)
+	if (n == 0):
+		return ''
+
+	if not(np.all(np.isfinite(x))):
+		return sep.join(['{:.{:d}e}'.format(v, digits) for v in x.tolist()])
+
+	a = np.abs(x)
+	nonzero = a > 0
+	e = np.zeros(n, dtype=np.int64)
+	e[nonzero] = np.floor(np.log10(a[nonzero])).astype(np.int64)
+	e = np.clip(e, -300, 300) # keeps 10**(digits-e) finite
+
+	# mantissa scaled to [10**digits:10**(digits+1)[
+	scaled = a * _POW10[digits - e + 310]
+	# log10 may be off by one around powers of 10
+	high = scaled >= 10**(digits+1)
+	low = nonzero & (scaled < 10**digits)
+	if np.any(high) or np.any(low):
+		e[high] += 1
+		e[low] -= 1
+		scaled = a * _POW10[digits - e + 310]
+
+	m = np.rint(scaled).astype(np.int64)
+	# rounding carry: 9.9999996 -> 1.000000e+01
+	carry = m >= 10**(digits+1)
+	m[carry] //= 10
+	e[carry] += 1
+
+	# near ties and out of range values cannot be trusted to
+	# the scaling above: rendered by the interpreter instead
+	frac = scaled - np.floor(scaled)
+	exact = nonzero & ((np.abs(frac - 0.5) < 1e-6) | (e <= -300) | (e >= 300))
+	for i in np.flatnonzero(exact).tolist():
+		string = '{:.{:d}e}'.format(a[i], digits)
+		mantissa, exponent = string.split('e')
+		m[i] = int(mantissa.replace('.', ''))
+		e[i] = int(exponent)
+
+	# [-]d.dddddde+XXX, separator
+	# unused character slots are left to 0 and dropped at the end
+	width = digits + 8 + len(sep)
+	chars = np.zeros((n, width), dtype=np.uint8)
+
+	chars[:,0] = np.where(np.signbit(x), ord('-'), 0)
+
+	# mantissa digits, 4 at a time
+	ngroups = (digits+4)//4
+	mdigits = np.empty((n, ngroups), dtype=np.uint32)
+	for g in range(ngroups-1, -1, -1):
+		mdigits[:,g] = _DIGITS4[m % 10000]
+		m //= 10000
+	mdigits = mdigits.view(np.uint8)[:,-(digits+1):]
+	chars[:,1] = mdigits[:,0]
+	chars[:,2] = ord('.')
+	chars[:,3:3+digits] = mdigits[:,1:]
+
+	col = 3+digits
+	chars[:,col] = ord('e')
+	chars[:,col+1] = np.where(e < 0, ord('-'), ord('+'))
+	ae = np.abs(e)
+	chars[:,col+2:col+5] = _DIGITS4[ae][:,None].view(np.uint8)[:,1:]
+	chars[:,col+2] = np.where(ae >= 100, chars[:,col+2], 0)
+
+	sepbytes = np.frombuffer(sep.encode('ascii'), dtype=np.uint8)
+	chars[:,col+5:] = sepbytes
+
+	string = chars.tobytes().translate(None, b'\0').decode('ascii')
+	if (len(sep) > 0):
+		string = string[:-len(sep)] # no trailing separator
+	return string
+
+def writeReals(fd, blocks, digits=6, sep=',', chunksize=XSIM_FORMAT_CHUNK):
+	"""
+	Writes all values of given blocks (iterable of arrays)
+	to fd, separated by sep. Values are formatted
+	chunksize at a time so memory usage remains bounded
+	"""
+	first = True
+	for block in blocks:
+		for start in range(0, len(block), chunksize):
+			if not(first):
+				fd.write(sep)
+			fd.write(formatReals(block[start:start+chunksize], digits=digits, sep=sep))
+			first = False
+
+def toWords(x, fracbits, width=32):
+	"""
+	Converts x to width bits two's complement words
+	with fracbits fractionnal bits,
+	rounded to nearest and saturated
+	"""
+	wmax = 2**(width-1)-1
+	words = np.rint(np.asarray(x, dtype=np.float64) * 2.0**fracbits)
+	np.clip(words, -wmax, wmax, out=words)
+	return words.astype(np.int64)
+
+def formatHexWords(words, width=32):
+	"""
+	Renders words as one hexadecimal word per line
+	"""
+	words = np.asarray(words, dtype=np.int64)
+	n = len(words)
+	if (n == 0):
+		return ''
+
+	ndigits = (width+3)//4
+	nbytes = (ndigits+1)//2
+	# two's complement, big endian bytes
+	unsigned = (words & ((1 << (4*ndigits))-1)).astype('>u8')
+	raw = unsigned.view(np.uint8).reshape(n, 8)[:,8-nbytes:]
+	chars = np.frombuffer(raw.tobytes().hex().encode('ascii'), dtype=np.uint8).reshape(n, 2*nbytes)
+	lines = np.empty((n, ndigits+1), dtype=np.uint8)
+	lines[:,:ndigits] = chars[:,2*nbytes-ndigits:]
+	lines[:,ndigits] = ord('\n')
+	return lines.tobytes().decode('ascii')
+
+def formatIntegers(x, sep=','):
+	"""
+	Renders integer array x as decimal values separated by sep,
+	identical to sep.join([str(v) for v in x])
+	"""
+	x = np.asarray(x, dtype=np.int64).ravel()
+	n = len(x)
+	if (n == 0):
+		return ''
+
+	# [-]dddddddddddddddddddd, separator
+	a = np.abs(x).astype(np.uint64)
+	ngroups = (len(str(int(a.max())))+3)//4
+	if (ngroups <= 3):
+		a = a.astype(np.int64) # faster arithmetic
+	digits = np.empty((n, ngroups), dtype=np.uint32)
+	for g in range(ngroups-1, -1, -1):
+		digits[:,g] = _DIGITS4[a % 10000]
+		a //= 10000
+	digits = digits.view(np.uint8).copy()
+
+	# leading zeros are dropped, units digit is always kept
+	significant = np.logical_or.accumulate(digits != ord('0'), axis=1)
+	significant[:,-1] = True
+	digits[~significant] = 0
+
+	width = 1 + 4*ngroups + len(sep)
+	chars = np.zeros((n, width), dtype=np.uint8)
+	chars[:,0] = np.where(x < 0, ord('-'), 0)
+	chars[:,1:1+4*ngroups] = digits
+	chars[:,1+4*ngroups:] = np.frombuffer(sep.encode('ascii'), dtype=np.uint8)
+
+	string = chars.tobytes().translate(None, b'\0').decode('ascii')
+	if (len(sep) > 0):
+		string = string[:-len(sep)] # no trailing separator
+	return string
+
+def formatVectors(words, width, sep=','):
+	"""
+	Renders words as width bits std_logic_vector literals
+	(two's complement) separated by sep:
+	x"..." when width is a multiple of 4, "0101.." otherwise
+	"""
+	words = np.asarray(words, dtype=np.int64)
+	n = len(words)
+	if (n == 0):
+		return ''
+
+	if ((width % 4) == 0):
+		digits = np.frombuffer(formatHexWords(words, width=width).encode('ascii'), dtype=np.uint8).reshape(n, width//4+1)[:,:-1]
+		prefix = b'x"'
+	else:
+		shifts = np.arange(width-1, -1, -1, dtype=np.int64)
+		digits = ((words[:,None] >> shifts) & 1).astype(np.uint8) + ord('0')
+		prefix = b'"'
+
+	tail = b'"' + sep.encode('ascii')
+	chars = np.empty((n, len(prefix) + digits.shape[1] + len(tail)), dtype=np.uint8)
+	chars[:,:len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+	chars[:,len(prefix):len(prefix)+digits.shape[1]] = digits
+	chars[:,len(prefix)+digits.shape[1]:] = np.frombuffer(tail, dtype=np.uint8)
+
+	string = chars.tobytes().decode('ascii')
+	if (len(sep) > 0):
+		string = string[:-len(sep)] # no trailing separator
+	return string
@@ -0,0 +1,169 @@
+import os
+import json
+import hashlib
+import tempfile
+
+class XSimHashWriter:
+	"""
+	Writes to a temporary file next to fp
+	while keeping a sha256 digest of the whole content
+	and one digest per named section.
+	commit() then only replaces fp if content did change,
+	so unchanged files keep their mtime.
+	As a context manager, commits on success
+	and aborts (temporary file removed) on error:
+		with XSimHashWriter(fp) as fd:
+			..
+			changes = fd.commit()
+	"""
+
+	def __init__(self, fp, binary=False, buffering=-1):
+		self.fp = fp
+		self.binary = binary
+		directory = os.path.dirname(os.path.abspath(fp))
+		fd, self.tmp = tempfile.mkstemp(dir=directory, prefix='.{:s}.'.format(os.path.basename(fp)))
+		if (binary):
+			self.fd = os.fdopen(fd, 'wb', buffering=buffering)
+		else:
+			self.fd = os.fdopen(fd, 'w', buffering=buffering)
+
+		self.digest = hashlib.sha256()
+		self.sections = {}
+		self.current = None
+		self.size = 0
+		self.changes = None # once committed
+
+	def section(self, name):
+		"""
+		Following writes are accounted to given section
+		"""
+		self.current = name
+		if not(name in self.sections):
+			self.sections[name] = hashlib.sha256()
+
+	def write(self, data):
+		self.fd.write(data)
+		if not(self.binary):
+			data = data.encode('utf-8')
+		self.size += len(data)
+		self.digest.update(data)
+		if (self.current is not None):
+			self.sections[self.current].update(data)
+
+	def getDigest(self):
+		return self.digest.hexdigest()
+
+	def getSectionDigests(self):
+		results = {}
+		for name, digest in self.sections.items():
+			results[name] = digest.hexdigest()
+		return results
+
+	def manifest(self):
+		"""
+		Returns manifest file path, recording
+		digests of the current fp content
+		"""
+		return manifestPath(self.fp)
+
+	def writeManifest(self):
+		with open(self.manifest(), 'w') as fd:
+			json.dump({'digest': self.getDigest(), 'size': self.size, 'mtime': os.stat(self.fp).st_mtime_ns, 'sections': self.getSectionDigests()}, fd, indent=1, sort_keys=True)
+
+	def commit(self):
+		"""
+		Closes temporary file and atomically moves it to fp
+		if content changed. Returns list of sections that changed,
+		['*'] when fp did not exist or differed without a manifest
+		(sections unknown), [] if fp was left untouched
+		"""
+		if (self.changes is not None):
+			return self.changes
+		self.fd.close()
+		old = readManifest(self.fp)
+
+		if (old is None) and (os.path.exists(self.fp)):
+			# manifest missing or out of date: compare with fp itself
+			if (os.path.getsize(self.fp) == self.size) and (hashFile(self.fp) == self.getDigest()):
+				os.remove(self.tmp)
+				self.writeManifest()
+				self.changes = []
+				return self.changes
+
+		if (old is not None) and (old['digest'] == self.getDigest()):
+			os.remove(self.tmp)
+			self.changes = []
+			return self.changes
+
+		# temporary files are created 0600
+		umask = os.umask(0)
+		os.umask(umask)
+		os.chmod(self.tmp, 0o666 & ~umask)
+		os.replace(self.tmp, self.fp)
+		self.writeManifest()
+		sections = self.getSectionDigests()
+
+		if (old is None):
+			self.changes = ['*']
+			return self.changes
+
+		changes = []
+		for name, digest in sections.items():
+			if (old['sections'].get(name) != digest):
+				changes.append(name)
+		for name in old['sections'].keys():
+			if not(name in sections):
+				changes.append(name)
+		if (len(changes) == 0):
+			changes.append('*') # unsectionned content
+		self.changes = changes
+		return changes
+
+	def abort(self):
+		"""
+		Discards written content, fp is left untouched
+		"""
+		self.fd.close()
+		try:
+			os.remove(self.tmp)
+		except OSError:
+			pass
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		if (exc_type is not None):
+			self.abort()
+		elif (self.changes is None):
+			self.commit()
+		return False
+
+def hashFile(fp):
+	"""
+	Returns sha256 of fp content
+	"""
+	digest = hashlib.sha256()
+	with open(fp, 'rb') as fd:
+		for block in iter(lambda: fd.read(1 << 20), b''):
+			digest.update(block)
+	return digest.hexdigest()
+
+def manifestPath(fp):
+	directory, name = os.path.split(os.path.abspath(fp))
+	return os.path.join(directory, '.{:s}.xsim.json'.format(name))
+
+def readManifest(fp):
+	"""
+	Returns recorded digests of fp content,
+	None if fp or its manifest are missing or out of date
+	"""
+	try:
+		with open(manifestPath(fp), 'r') as fd:
+			manifest = json.load(fd)
+		st = os.stat(fp)
+		if (st.st_size != manifest['size']) or (st.st_mtime_ns != manifest['mtime']):
+			return None # modified behind our back
+	except (IOError, OSError, ValueError, KeyError):
+		return None
+	return manifest
@@ -0,0 +1,166 @@
+import numpy as np
+
+# noise is drawn by chunks of this size [symbols],
+# each chunk from its own independent stream
+XSIM_NOISE_CHUNK = 65536
+
+# default shaping filter length [taps]
+XSIM_NOISE_TAPS = 4097
+
+XSIM_NOISE_TYPES = ['white', 'pink', 'brown', 'psd']
+
+# child of the stream SeedSequence the shaping filter
+# history is drawn from (chunks use 0, 1, ..)
+XSIM_NOISE_WARMUP = 2**32-1
+
+def childSeedSequence(seedseq, index):
+	"""
+	Returns child #index of given SeedSequence,
+	identical to seedseq.spawn(index+1)[index] on a fresh sequence
+	but stateless, so children can be addressed in any order
+	"""
+	return np.random.SeedSequence(seedseq.entropy, spawn_key=tuple(seedseq.spawn_key)+(index,), pool_size=seedseq.pool_size)
+
+def noiseShape(ntype, nbins, psd=None, sample_rate=None):
+	"""
+	Returns target amplitude response |H(f)| over nbins
+	frequency bins evenly spaced from 0 to sample_rate/2
+		+ 'white': flat
+		+ 'pink': -10 dB/dec
+		+ 'brown': -20 dB/dec
+		+ 'psd': interpolated from psd: [[f (Hz), level (dB)], ..]
+	"""
+	f = np.linspace(0, 0.5, nbins) # normalized frequency
+	if (ntype == 'white'):
+		return np.ones(nbins)
+
+	if (ntype in ['pink', 'brown']):
+		order = {'pink': 0.5, 'brown': 1.0}[ntype]
+		H = np.empty(nbins)
+		H[1:] = np.power(f[1:], -order)
+		H[0] = H[1] # finite DC gain
+		return H
+
+	if (psd is None):
+		raise ValueError("psd noise requires a list of [frequency, level] points")
+	if (sample_rate is None):
+		raise ValueError("psd noise requires a sample rate")
+
+	points = np.array(sorted(psd), dtype=np.float64)
+	level = np.interp(f * sample_rate, points[:,0], points[:,1])
+	return np.power(10, level/20)
+
+def shapingFilter(ntype, taps=XSIM_NOISE_TAPS, psd=None, sample_rate=None):
+	"""
+	Designs a linear phase FIR filter (frequency sampling, Hann window)
+	approaching the requested shape, normalized to unit power gain
+	so the noise density level is preserved
+	"""
+	H = noiseShape(ntype, taps//2+1, psd=psd, sample_rate=sample_rate)
+	h = np.fft.irfft(H, n=taps)
+	h = np.roll(h, taps//2) * np.hanning(taps)
+	return h / np.sqrt(np.sum(h**2))
+
+class XSimNoiseStream:
+	"""
+	Continuous noise source, read block by block.
+	Chunk #c is drawn from a Generator seeded by child #c
+	of the stream SeedSequence and shaped (if not white)
+	by FFT convolution, filter tails being overlapped-added
+	from one chunk to the next. Memory usage does not depend
+	on the stream length and samples only depend on the seed
+	and their position, never on block sizes or on which process
+	generated them
+	"""
+
+	def __init__(self, ntype, density, seedseq=None, psd=None, taps=XSIM_NOISE_TAPS, sample_rate=None):
+		if not(ntype in XSIM_NOISE_TYPES):
+			raise ValueError("{:s} noise is not supported".format(ntype))
+
+		self.ntype = ntype
+		self.sigma = np.sqrt(np.power(10,density/20))
+
+		if seedseq is None:
+			seedseq = np.random.SeedSequence() # fresh entropy
+		self.seedseq = seedseq
+		self.position = 0
+		self.chunk = None # [index, noise samples]
+
+		self.h = None
+		if (ntype != 'white'):
+			self.h = shapingFilter(ntype, taps=taps, psd=psd, sample_rate=sample_rate)
+			self.nfft = 1 << int(np.ceil(np.log2(XSIM_NOISE_CHUNK + len(self.h) - 1)))
+			self.H = np.fft.rfft(self.h, n=self.nfft)
+			self.tail = None # [next chunk index, tail samples]
+
+	def getType(self):
+		return self.ntype
+
+	def getSeedSequence(self):
+		return self.seedseq
+
+	def getFilter(self):
+		"""
+		Returns shaping filter taps, None for white noise
+		"""
+		return self.h
+
+	def chunkGenerator(self, c):
+		"""
+		Returns the Generator of chunk #c
+		"""
+		return np.random.Generator(np.random.PCG64(childSeedSequence(self.seedseq, c)))
+
+	def _convolve(self, x):
+		"""
+		Returns full linear convolution of x by the shaping filter
+		"""
+		return np.fft.irfft(np.fft.rfft(x, n=self.nfft) * self.H, n=self.nfft)[:len(x)+len(self.h)-1]
+
+	def _chunk(self, c):
+		"""
+		Returns noise samples of chunk #c (unit variance)
+		"""
+		x = self.chunkGenerator(c).standard_normal(XSIM_NOISE_CHUNK)
+		if (self.h is None):
+			return x
+
+		if (self.tail is None) or (self.tail[0] != c):
+			# (re)start: filter history drawn from a dedicated
+			# stream so output is stationary from the first sample.
+			# Chunks are consumed in order, this only happens once
+			L = len(self.h)
+			history = np.random.Generator(np.random.PCG64(childSeedSequence(self.seedseq, XSIM_NOISE_WARMUP))).standard_normal(L-1)
+			tail = self._convolve(history)[L-1:]
+			for k in range(0, c):
+				y = self._convolve(self.chunkGenerator(k).standard_normal(XSIM_NOISE_CHUNK))
+				y[:L-1] += tail
+				tail = y[XSIM_NOISE_CHUNK:]
+			self.tail = [c, tail]
+
+		y = self._convolve(x)
+		L = len(self.h)
+		y[:L-1] += self.tail[1]
+		self.tail = [c+1, y[XSIM_NOISE_CHUNK:].copy()]
+		return y[:XSIM_NOISE_CHUNK]
+
+	def read(self, n):
+		"""
+		Returns next n noise samples
+		"""
+		x = np.empty(n)
+		filled = 0
+		while (filled < n):
+			c, offset = divmod(self.position, XSIM_NOISE_CHUNK)
+			m = min(n-filled, XSIM_NOISE_CHUNK-offset)
+			if (self.h is None) and (offset == 0) and (m == XSIM_NOISE_CHUNK):
+				# whole white chunk: drawn in place
+				self.chunkGenerator(c).standard_normal(out=x[filled:filled+m])
+			else:
+				if (self.chunk is None) or (self.chunk[0] != c):
+					self.chunk = [c, self._chunk(c)]
+				x[filled:filled+m] = self.chunk[1][offset:offset+m]
+			filled += m
+			self.position += m
+		x *= self.sigma
+		return x
@@ -1,5 +1,16 @@
+import numpy as np
+
+XSIM_ROUNDING_MODES = ['nearest', 'floor', 'zero']
+XSIM_OVERFLOW_MODES = ['saturate', 'wrap']
+
+# default XSimIntParam range, shared by all instances
+XSIM_INT_UNBOUNDED = ('-inf', '+inf')
+
 class XSimParam:
 
+	# no per instance __dict__: sweeps hold many benches in memory
+	__slots__ = ['key', 'value', 'default', 'help', 'aValues', 'hidden', 'formatstr']
+
 	def __init__(self, key, value, help=None, allowed=None, hidden=False):
 		self.key = key
 		self.value = value
@@ -94,6 +105,8 @@ class XSimParam:
 				fd.write('\tconstant {:s}: time := {:.3f} {:s};\n'.format(self.getKey().upper(), value, self.getUnit()))
 				
 class XSimStringParam (XSimParam):
+	__slots__ = []
+
 	def __init__(self, key, value, help=None, allowed=None, hidden=False, formatstr=None):
 		super(XSimStringParam, self).__init__(key, value, help=help, allowed=allowed, hidden=hidden)
 
@@ -106,6 +119,8 @@ class XSimStringParam (XSimParam):
 			self.formatstr = string
 
 class XSimFloatParam (XSimParam):
+	__slots__ = []
+
 	def __init__(self, key, value, help=None, allowed=None, hidden=False, formatstr=None):
 		super(XSimFloatParam, self).__init__(key, value, help=help, allowed=allowed, hidden=hidden)
 
@@ -118,6 +133,8 @@ class XSimFloatParam (XSimParam):
 			self.formatstr = string
 	
 class XSimBoolParam (XSimParam):
+	__slots__ = []
+
 	def __init__(self, key, value, help=None, hidden=False, formatstr=None):
 		super(XSimBoolParam, self).__init__(key, value, help=help, allowed=[0,1], hidden=hidden)
 		self.setValue(value)
@@ -137,10 +154,12 @@ class XSimBoolParam (XSimParam):
 			self.formatstr = string
 	
 class XSimIntParam (XSimParam):
+	__slots__ = ['range']
+
 	def __init__(self, key, value, help=None, Range=None, hidden=False, formatstr=None):
 		super(XSimIntParam, self).__init__(key, value, help=help, hidden=hidden)
 
-		self.setRange(['-inf','+inf'])
+		self.setRange(XSIM_INT_UNBOUNDED)
 		self.setValue(value)
 
 		if (Range):
@@ -174,6 +193,9 @@ class XSimIntParam (XSimParam):
 		"""
 		self.range = R
 
+	def setBounds(self, m, M):
+		self.setRange([m, M])
+
 	def setFormatStr(self, string):
 		if (string is None): 
 			self.formatstr = '{:d}' 
@@ -181,6 +203,7 @@ class XSimIntParam (XSimParam):
 			self.formatstr = string
 	
 class XSimFixedPointParam (XSimParam):
+	__slots__ = ['signed', 'q', 'm', 'Qmin', 'Qmax']
 
 	def __init__(self, key, value, help=None, allowed=None, Range=None, hidden=False, formatstr=None):
 		"""
@@ -201,6 +224,9 @@ class XSimFixedPointParam (XSimParam):
 		self.setQmin(Qmin)
 		self.setQmax(Qmax)
 
+	def setBounds(self, Qmin, Qmax):
+		self.setRange(Qmin, Qmax)
+
 	def getRange(self):
 		return [self.Qmin,self.Qmax]
 
@@ -211,7 +237,7 @@ class XSimFixedPointParam (XSimParam):
 		if (string[0] == 's'):
 			self.signed = True
 		else:
-			self.unsigned = False
+			self.signed = False
 
 		self.q = int(string[1:].split('.')[0])
 		self.m = int(string[1:].split('.')[-1])
@@ -258,7 +284,58 @@ class XSimFixedPointParam (XSimParam):
 	def isSigned(self):
 		return self.signed
 
+	def width(self):
+		"""
+		Returns total number of bits
+		"""
+		return self.q + self.m
+
+	def integerRange(self):
+		"""
+		Returns [min,max] integer (scaled by 2^M) values
+		"""
+		if (self.isSigned()):
+			return [-2**(self.width()-1), 2**(self.width()-1)-1]
+		return [0, 2**self.width()-1]
+
+	def quantize(self, x, rounding='nearest', overflow='saturate'):
+		"""
+		Converts real values x to this Q.M format,
+		returns [integer values scaled by 2^M, number of clipped values]
+		rounding: 'nearest' (ties to even), 'floor' or 'zero'
+		overflow: 'saturate' or 'wrap'
+		"""
+		if not(rounding in XSIM_ROUNDING_MODES):
+			raise ValueError("{:s} rounding is not supported".format(rounding))
+		if not(overflow in XSIM_OVERFLOW_MODES):
+			raise ValueError("{:s} overflow is not supported".format(overflow))
+
+		y = np.multiply(x, 2.0**self.m)
+		if (rounding == 'nearest'):
+			np.rint(y, out=y)
+		elif (rounding == 'floor'):
+			np.floor(y, out=y)
+		else:
+			np.trunc(y, out=y)
+
+		[lo, hi] = self.integerRange()
+		clips = int(np.count_nonzero((y < lo) | (y > hi)))
+
+		if (overflow == 'saturate'):
+			np.clip(y, lo, hi, out=y)
+			return [y.astype(np.int64), clips]
+
+		# two's complement wrap around
+		y = y.astype(np.int64)
+		if (clips > 0):
+			y -= lo
+			y &= (1 << self.width())-1
+			y += lo
+		return [y, clips]
+
 class XSimTimeParam (XSimParam):
+	__slots__ = ['unit']
+
 	def __init__(self, key, value, help=None, hidden=False, unit='ns'):
 		super(XSimTimeParam, self).__init__(key, value, help=help, hidden=hidden)
 		self.setFormatStr('{:.3f}')
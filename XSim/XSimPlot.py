@@ -0,0 +1,159 @@
+# Qt5
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+
+# pyqtgraph
+import pyqtgraph as pg
+
+import numpy as np
+
+from XSimDecimate import *
+from XSimReader import *
+
+# XSimLivePlot default refresh period [ms]
+XSIM_LIVE_INTERVAL = 500
+
+class XSimLazyWidget(QWidget):
+	"""
+	Placeholder widget: its content is only built,
+	by calling build(), when it is first shown
+	"""
+
+	def __init__(self, build, parent=None):
+		super().__init__(parent)
+		self.build = build
+		layout = QVBoxLayout()
+		layout.setContentsMargins(0, 0, 0, 0)
+		self.setLayout(layout)
+
+	def isBuilt(self):
+		return (self.build is None)
+
+	def showEvent(self, event):
+		if (self.build is not None):
+			build = self.build
+			self.build = None
+			self.layout().addWidget(build())
+		super().showEvent(event)
+
+class XSimEnvelopeCurve:
+	"""
+	Curve of a pyqtgraph PlotWidget kept decimated
+	(XSimEnvelope) to the current view range & widget width
+	"""
+
+	def __init__(self, plot, x, y):
+		self.plot = plot
+		self.envelope = XSimEnvelope(x, y)
+		self.curve = plot.plot()
+		self.updating = False
+		plot.getPlotItem().getViewBox().sigXRangeChanged.connect(self.update)
+		self.update()
+
+	def getEnvelope(self):
+		return self.envelope
+
+	def update(self, *args):
+		if (self.updating):
+			return
+		self.updating = True
+		try:
+			xmin = None
+			xmax = None
+			if (self.curve.xData is not None):
+				[xmin, xmax] = self.plot.getPlotItem().getViewBox().viewRange()[0]
+				if (self.plot.getPlotItem().ctrl.logXCheck.isChecked()):
+					[xmin, xmax] = [np.power(10, xmin), np.power(10, xmax)]
+			[x, y] = self.envelope.decimate(xmin, xmax, npoints=max(self.plot.width(), 100))
+			self.curve.setData(x, y)
+		finally:
+			self.updating = False
+
+class XSimLivePlot(QWidget):
+	"""
+	Plots values of an XSimOutputTail (one curve per selected
+	column, against sample index) while the simulator writes them:
+	the file is polled & curves redrawn every interval [ms] at most,
+	only when new values were appended. Values accumulate in
+	growing buffers, curves are downsampled to the view (peak)
+	"""
+
+	def __init__(self, tail, labels=None, interval=XSIM_LIVE_INTERVAL, parent=None):
+		super().__init__(parent)
+		self.tail = tail
+		self.buffers = None
+		self.x = np.empty(0, dtype=np.int64) # sample index
+		self.count = 0
+		self.restarts = tail.getRestarts()
+
+		self.plot = pg.PlotWidget()
+		self.plot.showGrid(x=True, y=True)
+		self.plot.addLegend()
+		self.labels = labels
+		self.curves = []
+		layout = QVBoxLayout()
+		layout.setContentsMargins(0, 0, 0, 0)
+		layout.addWidget(self.plot)
+		self.setLayout(layout)
+
+		self.timer = QTimer(self)
+		self.timer.timeout.connect(self.pollOutput)
+		self.timer.start(interval)
+
+	def getTail(self):
+		return self.tail
+
+	def getCount(self):
+		return self.count
+
+	def getData(self):
+		"""
+		Returns one array of values per column, plotted so far
+		"""
+		if (self.buffers is None):
+			return []
+		return [b[:self.count] for b in self.buffers]
+
+	def stop(self):
+		self.timer.stop()
+
+	def append(self, values):
+		if (self.buffers is None):
+			self.buffers = [np.empty(max(1024, 2*len(v)), dtype=v.dtype) for v in values]
+			for i in range(0, len(values)):
+				name = None
+				if (self.labels is not None) and (i < len(self.labels)):
+					name = self.labels[i]
+				curve = self.plot.plot(pen=pg.intColor(i, hues=len(values)), name=name)
+				curve.setDownsampling(auto=True, method='peak')
+				curve.setClipToView(True)
+				self.curves.append(curve)
+
+		n = self.count + len(values[0])
+		if (n > len(self.buffers[0])): # amortized growth
+			for i in range(0, len(self.buffers)):
+				grown = np.empty(2*n, dtype=self.buffers[i].dtype)
+				grown[:self.count] = self.buffers[i][:self.count]
+				self.buffers[i] = grown
+		if (n > len(self.x)):
+			self.x = np.arange(len(self.buffers[0]))
+		for i in range(0, len(values)):
+			self.buffers[i][self.count:n] = values[i]
+		self.count = n
+
+	def pollOutput(self):
+		"""
+		Appends values written since the last poll, redraws curves
+		"""
+		values = self.tail.poll()
+		if (self.tail.getRestarts() != self.restarts): # file rewritten
+			self.restarts = self.tail.getRestarts()
+			self.count = 0
+		if (values is None) or (len(values) == 0) or (len(values[0]) == 0):
+			if (self.count == 0):
+				for curve in self.curves:
+					curve.setData([], [])
+			return
+		self.append(values)
+		for i in range(0, len(self.curves)):
+			self.curves[i].setData(self.x[:self.count], self.buffers[i][:self.count])
@@ -0,0 +1,532 @@
+import io
+import os
+import numpy as np
+
+from XSimResult import *
+
+XSIM_READER_FORMATS = ['decimal', 'hex', 'binary']
+
+# text files are parsed this many bytes at a time
+XSIM_READER_CHUNK = 1 << 22
+
+# XSimOutputTail: bytes parsed at most per poll
+XSIM_TAIL_MAX = 1 << 26
+
+# ',' & ';' separators, turned into blanks for np.loadtxt
+_SEPARATORS = bytes.maketrans(b',;', b'  ')
+
+# hexadecimal digit values, -1 for other characters
+_NIBBLES = np.full(256, -1, dtype=np.int64)
+for i, c in enumerate('0123456789abcdef'):
+	_NIBBLES[ord(c)] = i
+	_NIBBLES[ord(c.upper())] = i
+
+def tokenize(buf):
+	"""
+	Returns [starts, ends] offsets of the values in buf (uint8 array),
+	values are separated by blanks, ',' or ';'
+	"""
+	value = (buf > ord(' ')) & (buf != ord(',')) & (buf != ord(';'))
+	edges = np.flatnonzero(value[1:] != value[:-1]) + 1
+	if (len(buf) > 0) and (value[0]):
+		edges = np.concatenate(([0], edges))
+	if (len(buf) > 0) and (value[-1]):
+		edges = np.concatenate((edges, [len(buf)]))
+	return [edges[0::2], edges[1::2]]
+
+def tokenMatrix(buf, starts, ends):
+	"""
+	Gathers given values into a (n, longest) character matrix,
+	shorter values are padded with spaces
+	"""
+	lengths = ends - starts
+	L = max(int(lengths.max()), 1) if (len(lengths) > 0) else 1
+	if (len(starts) > 0) and (int(starts[0]) >= 0) and (int(starts[-1]) + L <= len(buf)):
+		# one row copy per value
+		M = np.lib.stride_tricks.sliding_window_view(buf, L)[starts]
+	else:
+		M = np.empty((len(starts), L), dtype=np.uint8)
+		for j in range(0, L):
+			M[:,j] = buf[np.clip(starts+j, 0, len(buf)-1)]
+	if np.any(lengths != L):
+		for j in range(0, L):
+			np.copyto(M[:,j], ord(' '), where=(lengths <= j))
+	return M
+
+def convertHex(M, lengths=None, width=None, signed=False):
+	"""
+	Converts hexadecimal values (rows of M, left aligned,
+	lengths characters long, all M columns by default) to integers,
+	interpreted as width bits two's complement values when signed
+	(width defaults to 4 bits per digit)
+	"""
+	n, L = M.shape
+	if (L > 15):
+		raise ValueError("hexadecimal values wider than 60 bits are not supported")
+
+	values = np.zeros(n, dtype=np.int64)
+	bad = np.zeros(n, dtype=bool)
+	for j in range(0, L):
+		nibbles = _NIBBLES[M[:,j]]
+		if (lengths is None):
+			bad |= (nibbles < 0)
+			values <<= 4
+			values |= nibbles
+		else:
+			active = (lengths > j)
+			bad |= active & (nibbles < 0)
+			values = np.where(active, (values << 4) | nibbles, values)
+
+	if np.any(bad):
+		i = int(np.flatnonzero(bad)[0])
+		raise ValueError("could not convert '{:s}' to an hexadecimal value".format(M[i].tobytes().decode('ascii', 'replace').strip()))
+
+	if (width is not None):
+		values &= (1 << width) - 1
+	if (signed):
+		if (width is not None):
+			w = width
+		elif (lengths is None):
+			w = 4 * L
+		else:
+			w = 4 * lengths
+		values = np.where(values >= (1 << (w-1)), values - (1 << w), values)
+	return values
+
+def parseHex(buf, starts, ends, width=None, signed=False):
+	"""
+	Converts the hexadecimal values buf[starts:ends] (textio hwrite)
+	to integers, see convertHex
+	"""
+	lengths = ends - starts
+	if (len(starts) > 0) and np.all(lengths == lengths[0]):
+		lengths = None
+	return convertHex(tokenMatrix(buf, starts, ends), lengths=lengths, width=width, signed=signed)
+
+def firstLine(buf, chunksize=XSIM_READER_CHUNK):
+	"""
+	Returns the first non blank line of buf (uint8 array),
+	None when buf only holds blanks
+	"""
+	for start in range(0, len(buf), chunksize):
+		value = (buf[start:start+chunksize] > ord(' '))
+		if np.any(value):
+			first = start + int(np.argmax(value))
+			newline = np.flatnonzero(buf[first:first+chunksize] == ord('\n'))
+			stop = len(buf) if (len(newline) == 0) else first + int(newline[0])
+			return buf[first:stop].tobytes()
+	return None
+
+def fixedWidthFields(buf, newlines):
+	"""
+	When all lines of buf (ending on a line boundary) are W characters
+	long and values stand in the same character columns on every line
+	(textio with field widths, hwrite..), returns [W, fields] where
+	fields is the list of [first, last+1, filled, right] character columns
+	of each value, filled when no value is padded with spaces,
+	right when all of them are right aligned, None otherwise
+	"""
+	if (len(newlines) == 0):
+		return None
+	W = int(newlines[0]) + 1
+	if (len(buf) != W*len(newlines)) or np.any(newlines[1:] - newlines[:-1] != W):
+		return None
+
+	R = buf.reshape(-1, W)
+	value = (R > ord(' ')) & (R != ord(',')) & (R != ord(';'))
+	count = np.count_nonzero(value, axis=0)
+	used = (count > 0)
+	edges = np.flatnonzero(used[1:] != used[:-1]) + 1
+	if (used[0]):
+		edges = np.concatenate(([0], edges))
+	if (used[-1]):
+		edges = np.concatenate((edges, [W]))
+
+	# a single value per line and field
+	flat = value.ravel()
+	nvalues = int(flat[0]) + np.count_nonzero(flat[1:] & ~flat[:-1])
+	if (nvalues != R.shape[0] * (len(edges)//2)):
+		return None
+
+	fields = []
+	for k in range(0, len(edges), 2):
+		[first, last] = [int(edges[k]), int(edges[k+1])]
+		filled = bool(np.all(count[first:last] == R.shape[0]))
+		fields.append([first, last, filled, bool(count[last-1] == R.shape[0])])
+	return [W, fields]
+
+class XSimOutputReader:
+	"""
+	Simulation output file reader:
+		+ 'decimal': integer or real values (textio write)
+		+ 'hex': hexadecimal words (textio hwrite)
+		+ 'binary': raw records of ncolumns values of given dtype
+	one line (record) per simulation step, columns separated
+	by blanks, ',' or ';'. Decimal files are converted by np.loadtxt
+	(C parser, streamed from the file, chunk by chunk when tailed):
+	they read at loadtxt speed, selecting columns does not speed
+	them up. Hexadecimal files are memory-mapped and parsed chunk
+	by chunk with vectorized conversions, binary files are mapped.
+	mmap: binary columns are returned as (strided) views onto
+	the file instead of copies
+	"""
+
+	def __init__(self, fp, fmt='decimal', columns=None, ncolumns=None, dtype=None, width=None, signed=False, fracbits=None, skiprows=0, chunksize=XSIM_READER_CHUNK, mmap=False):
+		if not(fmt in XSIM_READER_FORMATS):
+			raise ValueError("{:s} output format is not supported".format(fmt))
+
+		self.fp = fp
+		self.fmt = fmt
+		self.columns = columns
+		self.ncolumns = ncolumns
+		self.width = width
+		self.signed = signed
+		self.fracbits = fracbits
+		self.skiprows = skiprows
+		self.chunksize = chunksize
+		self.mmap = mmap # binary columns: views onto the file
+
+		if (dtype is None):
+			if (fmt == 'decimal'):
+				dtype = np.float64
+			elif (fmt == 'hex'):
+				dtype = np.int64
+			else:
+				dtype = '<i4'
+		self.dtype = np.dtype(dtype)
+
+	def getFile(self):
+		return self.fp
+
+	def getFormat(self):
+		return self.fmt
+
+	def getColumns(self):
+		return self.columns
+
+	def selectedColumns(self, ncolumns):
+		"""
+		Returns selected column indexes (all by default)
+		"""
+		if (self.columns is None):
+			return list(range(0, ncolumns))
+
+		columns = []
+		for c in self.columns:
+			if not(-ncolumns <= c < ncolumns):
+				raise ValueError("{:s} has {:d} columns, column {:d} does not exist".format(self.fp, ncolumns, c))
+			columns.append(c % ncolumns)
+		return columns
+
+	def read(self):
+		"""
+		Returns one array per selected column
+		"""
+		if (self.fmt == 'binary'):
+			values = self.readBinary()
+		else:
+			values = self.readText()
+		return self.scaled(values)
+
+	def scaled(self, values):
+		"""
+		Scales fixed point values by 2^-fracbits
+		"""
+		if (self.fracbits is not None):
+			values = [v / 2.0**self.fracbits for v in values]
+		return values
+
+	def recordSize(self):
+		"""
+		Returns [binary record size in bytes, number of columns]
+		"""
+		ncolumns = self.ncolumns
+		if (ncolumns is None):
+			ncolumns = 1
+		return [ncolumns * self.dtype.itemsize, ncolumns]
+
+	def readBinary(self):
+		[record, ncolumns] = self.recordSize()
+		offset = self.skiprows * record
+		try:
+			data = np.memmap(self.fp, dtype=np.uint8, mode='r')
+		except ValueError: # empty file
+			data = np.empty(0, dtype=np.uint8)
+		nrecords = (len(data) - offset) // record
+		if (nrecords <= 0):
+			return [np.empty(0, dtype=self.dtype) for c in self.selectedColumns(ncolumns)]
+
+		data = np.ndarray((nrecords, ncolumns), dtype=self.dtype, buffer=data, offset=offset)
+		if (self.mmap):
+			persistentFile(self.fp)
+			return [data[:,c] for c in self.selectedColumns(ncolumns)]
+		# strided copy: only selected columns are converted
+		return [np.array(data[:,c]) for c in self.selectedColumns(ncolumns)]
+
+	def readText(self):
+		try:
+			data = np.memmap(self.fp, dtype=np.uint8, mode='r').view(np.ndarray)
+		except ValueError: # empty file
+			data = np.empty(0, dtype=np.uint8)
+
+		start = self.skipLines(data, self.skiprows)
+		if (start is None):
+			start = len(data)
+		if (self.fmt == 'decimal'):
+			line = firstLine(data[start:], self.chunksize)
+			if (line is not None) and (line.translate(None, b',;') == line):
+				# blank separated: loadtxt reads the file itself
+				ncolumns = self.countColumns(line, self.ncolumns)
+				return self.loadDecimal(self.fp, ncolumns, self.selectedColumns(ncolumns), skiprows=self.skiprows)
+		[ncolumns, values] = self.parseLines(data[start:], self.ncolumns)
+		if (values is None): # no data
+			return [np.empty(0, dtype=self.dtype) for c in self.selectedColumns(ncolumns or 1)]
+		return values
+
+	def skipLines(self, data, n):
+		"""
+		Returns offset of data following its first n lines,
+		None when data has less lines
+		"""
+		start = 0
+		for i in range(0, n):
+			newline = np.flatnonzero(data[start:start+self.chunksize] == ord('\n'))
+			if (len(newline) == 0):
+				return None
+			start += int(newline[0]) + 1
+		return start
+
+	def parseLines(self, data, ncolumns=None):
+		"""
+		Parses text lines data, chunk by chunk.
+		ncolumns: None to count values on the first line.
+		Returns [ncolumns, one array per selected column],
+		arrays being None when data has no values
+		"""
+		if (self.fmt == 'hex') and not(np.issubdtype(self.dtype, np.integer)):
+			raise ValueError("hexadecimal outputs are read as integers")
+
+		start = 0
+		columns = None
+		chunks = None
+		while (start < len(data)):
+			# chunks end on a line boundary
+			stop = min(start + self.chunksize, len(data))
+			if (stop < len(data)):
+				newline = np.flatnonzero(data[start:stop] == ord('\n'))
+				if (len(newline) == 0):
+					newline = np.flatnonzero(data[stop:] == ord('\n'))
+					stop = len(data) if (len(newline) == 0) else stop + int(newline[0]) + 1
+				else:
+					stop = start + int(newline[-1]) + 1
+
+			buf = data[start:stop]
+			if (self.fmt == 'decimal'):
+				line = firstLine(buf, self.chunksize)
+				if (line is not None):
+					ncolumns = self.countColumns(line, ncolumns)
+					if (columns is None):
+						columns = self.selectedColumns(ncolumns)
+						chunks = [[] for c in columns]
+					values = self.loadDecimal(io.BytesIO(buf.tobytes().translate(_SEPARATORS)), ncolumns, columns)
+					for i in range(0, len(columns)):
+						chunks[i].append(values[i])
+				start = stop
+				continue
+
+			newlines = np.flatnonzero(buf == ord('\n'))
+			fixed = fixedWidthFields(buf, newlines)
+			if (fixed is not None) and (ncolumns in [None, len(fixed[1])]):
+				[W, fields] = fixed
+				ncolumns = len(fields)
+				R = buf.reshape(-1, W)
+				if (columns is None):
+					columns = self.selectedColumns(ncolumns)
+					chunks = [[] for c in columns]
+				for i in range(0, len(columns)):
+					chunks[i].append(self.parseField(buf, R, fields[columns[i]]))
+				start = stop
+				continue
+
+			[starts, ends] = tokenize(buf)
+			if (len(starts) > 0):
+				if (ncolumns is None): # values on first line
+					first = np.searchsorted(newlines, starts[0])
+					ncolumns = len(starts) if (first == len(newlines)) else int(np.searchsorted(starts, newlines[first]))
+
+				# lines are rectangular when the first & last value
+				# of each group of ncolumns values share a line
+				# and groups are on distinct lines
+				first = np.searchsorted(newlines, starts[0::ncolumns])
+				last = np.searchsorted(newlines, starts[ncolumns-1::ncolumns])
+				if ((len(starts) % ncolumns) != 0) or np.any(first != last) or np.any(first[1:] == first[:-1]):
+					raise ValueError("{:s}: all lines must have {:d} columns".format(self.fp, ncolumns))
+
+				if (columns is None):
+					columns = self.selectedColumns(ncolumns)
+					chunks = [[] for c in columns]
+
+				for i in range(0, len(columns)):
+					values = self.parseValues(buf, starts[columns[i]::ncolumns], ends[columns[i]::ncolumns])
+					chunks[i].append(values)
+			start = stop
+
+		if (columns is None):
+			return [ncolumns, None]
+		return [ncolumns, [np.concatenate(c) for c in chunks]]
+
+	def countColumns(self, line, ncolumns=None):
+		"""
+		Returns the number of values on line,
+		which must be ncolumns when given
+		"""
+		n = len(line.translate(_SEPARATORS).split())
+		if (ncolumns is not None) and (n != ncolumns):
+			raise ValueError("{:s}: all lines must have {:d} columns".format(self.fp, ncolumns))
+		return n
+
+	def loadDecimal(self, fd, ncolumns, columns, skiprows=0):
+		"""
+		Converts selected columns of decimal lines fd
+		(file name or object) with np.loadtxt. All columns are
+		parsed: loadtxt checks every line has the same number
+		of values, which it does not do for a usecols subset
+		"""
+		try:
+			values = np.loadtxt(fd, dtype=self.dtype, comments=None, skiprows=skiprows, ndmin=2)
+		except ValueError as e:
+			if ('number of columns changed' in str(e)):
+				raise ValueError("{:s}: all lines must have {:d} columns".format(self.fp, ncolumns))
+			raise ValueError("{:s}: {:s}".format(self.fp, str(e)))
+		if (values.shape[0] > 0) and (values.shape[1] != ncolumns):
+			raise ValueError("{:s}: all lines must have {:d} columns".format(self.fp, ncolumns))
+		return [np.ascontiguousarray(values[:,c]) for c in columns]
+
+	def parseValues(self, buf, starts, ends):
+		"""
+		Converts hexadecimal values buf[starts:ends]
+		"""
+		values = parseHex(buf, starts, ends, width=self.width, signed=self.signed)
+		return values.astype(self.dtype, copy=False)
+
+	def parseField(self, buf, R, field):
+		"""
+		Converts hexadecimal values of given fixed width field,
+		R being buf viewed as a (lines, W) matrix
+		"""
+		[first, last, filled, right] = field
+		F = R[:,first:last]
+		if (filled):
+			return convertHex(F, width=self.width, signed=self.signed).astype(self.dtype, copy=False)
+
+		value = (F > ord(' '))
+		offsets = np.argmax(value, axis=1)
+		if (right):
+			M = np.where(value, F, ord('0')).astype(np.uint8)
+			width = 4*(F.shape[1] - offsets) if (self.width is None) else self.width
+			return convertHex(M, width=width, signed=self.signed).astype(self.dtype, copy=False)
+
+		starts = np.arange(0, R.shape[0]) * R.shape[1] + first + offsets
+		return self.parseValues(buf, starts, starts + np.count_nonzero(value, axis=1))
+
+	def __str__(self):
+		return "{:s} ({:s})".format(self.fp, self.fmt)
+
+class XSimOutputTail:
+	"""
+	Follows output file of an XSimOutputReader while the simulator
+	appends to it: every poll() only parses the complete lines
+	(records) written since the previous one, at most maxbytes
+	of them. The file being truncated or replaced (simulation
+	restarted) starts over from its beginning
+	"""
+
+	def __init__(self, reader, maxbytes=XSIM_TAIL_MAX):
+		self.reader = reader
+		self.maxbytes = maxbytes
+		self.offset = None # parsed bytes, None until header lines are skipped
+		self.ncolumns = reader.ncolumns
+		self.count = 0 # values per column so far
+		self.restarts = 0
+		self.inode = None
+
+	def getReader(self):
+		return self.reader
+
+	def getOffset(self):
+		return self.offset or 0
+
+	def getCount(self):
+		return self.count
+
+	def getRestarts(self):
+		return self.restarts
+
+	def poll(self):
+		"""
+		Returns one array of new values per selected column,
+		None when no complete line (record) was appended
+		"""
+		try:
+			stat = os.stat(self.reader.getFile())
+		except OSError: # not created yet
+			return None
+		size = stat.st_size
+		if (size < self.getOffset()) or ((self.inode is not None) and (stat.st_ino != self.inode)):
+			self.offset = None
+			self.ncolumns = self.reader.ncolumns
+			self.count = 0
+			self.restarts += 1
+		self.inode = stat.st_ino
+		if (size == 0) or (size == self.offset):
+			return None
+
+		data = np.memmap(self.reader.getFile(), dtype=np.uint8, mode='r', shape=(size,)).view(np.ndarray)
+		if (self.reader.getFormat() == 'binary'):
+			values = self.pollBinary(data)
+		else:
+			values = self.pollText(data)
+		if (values is None):
+			return None
+		self.count += len(values[0])
+		return self.reader.scaled(values)
+
+	def pollBinary(self, data):
+		[record, ncolumns] = self.reader.recordSize()
+		if (self.offset is None):
+			if (len(data) < self.reader.skiprows * record):
+				return None
+			self.offset = self.reader.skiprows * record
+		nrecords = min(len(data) - self.offset, self.maxbytes) // record
+		if (nrecords <= 0):
+			return None
+		values = np.ndarray((nrecords, ncolumns), dtype=self.reader.dtype, buffer=data, offset=self.offset)
+		self.offset += nrecords * record
+		return [np.array(values[:,c]) for c in self.reader.selectedColumns(ncolumns)]
+
+	def pollText(self, data):
+		if (self.offset is None):
+			start = self.reader.skipLines(data, self.reader.skiprows)
+			if (start is None): # header not written yet
+				return None
+			self.offset = start
+
+		# complete lines only: the last one may be half written
+		buf = data[self.offset:self.offset+self.maxbytes]
+		newline = np.flatnonzero(buf == ord('\n'))
+		if (len(newline) == 0):
+			return None
+		buf = buf[:int(newline[-1])+1]
+		[self.ncolumns, values] = self.reader.parseLines(buf, self.ncolumns)
+		self.offset += len(buf)
+		return values
+
+	def __str__(self):
+		return "{:s} | {:d} bytes, {:d} values".format(str(self.reader), self.getOffset(), self.count)
+
+def readOutput(fp, fmt='decimal', columns=None, **kwargs):
+	"""
+	Reads simulation output file fp,
+	returns one array per selected column
+	"""
+	return XSimOutputReader(fp, fmt=fmt, columns=columns, **kwargs).read()
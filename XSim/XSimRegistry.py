@@ -0,0 +1,45 @@
+class XSimRegistry:
+	"""
+	Ordered collection of keyed objects (parameters, stimuli..):
+	O(1) lookup by key and per type buckets.
+	Behaves like the list of its items otherwise
+	"""
+
+	def __init__(self):
+		self.items = []
+		self.keys = {}
+		self.buckets = {}
+
+	def add(self, item, key, bucket):
+		"""
+		Appends item, registered under key & bucket.
+		When a key is declared twice, lookups keep
+		returning the first item
+		"""
+		self.items.append(item)
+		self.keys.setdefault(key, item)
+		self.buckets.setdefault(bucket, []).append(item)
+
+	def get(self, key, default=None):
+		return self.keys.get(key, default)
+
+	def bucket(self, bucket):
+		"""
+		Returns items registered under given bucket, in order
+		"""
+		return list(self.buckets.get(bucket, []))
+
+	def getItems(self):
+		return self.items
+
+	def __len__(self):
+		return len(self.items)
+
+	def __iter__(self):
+		return iter(self.items)
+
+	def __getitem__(self, index):
+		return self.items[index]
+
+	def __contains__(self, key):
+		return key in self.keys
@@ -0,0 +1,316 @@
+import os
+import json
+import zlib
+import struct
+import datetime
+import numpy as np
+
+from XSimResult import *
+from XSimDecimate import *
+
+XSIM_REPORT_FORMATS = ['svg', 'png', 'html']
+
+# plots size [pixels]
+XSIM_PLOT_WIDTH = 640
+XSIM_PLOT_HEIGHT = 360
+
+# plot area margins [pixels]: left, right, top, bottom
+XSIM_PLOT_MARGINS = [70, 20, 30, 45]
+
+XSIM_PLOT_TICKS = 5
+
+XSIM_PLOT_COLOR = "#0487FF"
+
+def plotData(xy, settings=None):
+	"""
+	Returns plotted [x, y] as finite float arrays,
+	log10 applied to log axes (non positive values dropped)
+	"""
+	x = np.asarray(xy[0], dtype=np.float64).ravel()
+	y = np.asarray(xy[1], dtype=np.float64).ravel()
+	n = min(len(x), len(y))
+	x = x[:n]
+	y = y[:n]
+
+	keep = np.isfinite(x) & np.isfinite(y)
+	if (settings) and (settings.get('logx')):
+		keep &= (x > 0)
+	if (settings) and (settings.get('logy')):
+		keep &= (y > 0)
+	x = x[keep]
+	y = y[keep]
+
+	if (settings) and (settings.get('logx')):
+		x = np.log10(x)
+	if (settings) and (settings.get('logy')):
+		y = np.log10(y)
+	return [x, y]
+
+def axisRange(v):
+	"""
+	Returns [min, max] of v, widened when flat
+	"""
+	if (len(v) == 0):
+		return [0.0, 1.0]
+	vmin = float(v.min())
+	vmax = float(v.max())
+	if (vmin == vmax):
+		pad = abs(vmin)*0.5 if (vmin != 0) else 0.5
+		return [vmin-pad, vmax+pad]
+	return [vmin, vmax]
+
+def axisLabel(settings, axis):
+	"""
+	Returns 'label [unit]' of given axis ('left' or 'bottom')
+	"""
+	if not(settings):
+		return ''
+	label = settings.get('{:s}-label'.format(axis)) or ''
+	unit = settings.get('{:s}-unit'.format(axis))
+	if (unit):
+		label += ' [{:s}]'.format(unit)
+	return label
+
+def tickLabel(v, log=False):
+	if (log):
+		return '1e{:.3g}'.format(v)
+	return '{:.3g}'.format(v)
+
+def plotGeometry(xy, settings, width, height):
+	"""
+	Returns [px, py, xrange, yrange] pixel coordinates
+	of the data points and axes ranges
+	"""
+	[x, y] = plotData(xy, settings)
+	xrange = axisRange(x)
+	yrange = axisRange(y)
+	[left, right, top, bottom] = XSIM_PLOT_MARGINS
+	# min/max envelope: about one bin per pixel column
+	[x, y] = XSimEnvelope(x, y).decimate(npoints=width-left-right)
+	px = left + (x - xrange[0]) / (xrange[1] - xrange[0]) * (width - left - right)
+	py = height - bottom - (y - yrange[0]) / (yrange[1] - yrange[0]) * (height - top - bottom)
+	return [px, py, xrange, yrange]
+
+def escape(string):
+	return str(string).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+def svgPlot(xy, settings=None, title='', width=XSIM_PLOT_WIDTH, height=XSIM_PLOT_HEIGHT):
+	"""
+	Renders data set xy as a SVG line plot
+	"""
+	[px, py, xrange, yrange] = plotGeometry(xy, settings, width, height)
+	[left, right, top, bottom] = XSIM_PLOT_MARGINS
+	logx = bool(settings) and bool(settings.get('logx'))
+	logy = bool(settings) and bool(settings.get('logy'))
+
+	svg = '<svg xmlns="http://www.w3.org/2000/svg" width="{:d}" height="{:d}" font-family="sans-serif" font-size="11">\n'.format(width, height)
+	svg += '<rect width="100%" height="100%" fill="white"/>\n'
+	svg += '<text x="{:d}" y="18" text-anchor="middle" font-size="13">{:s}</text>\n'.format(width//2, escape(title))
+
+	# grid & ticks
+	for k in range(0, XSIM_PLOT_TICKS):
+		a = k / (XSIM_PLOT_TICKS-1)
+		gx = left + a * (width - left - right)
+		gy = height - bottom - a * (height - top - bottom)
+		svg += '<line x1="{:.1f}" y1="{:d}" x2="{:.1f}" y2="{:d}" stroke="#dddddd"/>\n'.format(gx, top, gx, height-bottom)
+		svg += '<line x1="{:d}" y1="{:.1f}" x2="{:d}" y2="{:.1f}" stroke="#dddddd"/>\n'.format(left, gy, width-right, gy)
+		svg += '<text x="{:.1f}" y="{:d}" text-anchor="middle">{:s}</text>\n'.format(gx, height-bottom+15, tickLabel(xrange[0] + a*(xrange[1]-xrange[0]), logx))
+		svg += '<text x="{:d}" y="{:.1f}" text-anchor="end">{:s}</text>\n'.format(left-5, gy+4, tickLabel(yrange[0] + a*(yrange[1]-yrange[0]), logy))
+	svg += '<rect x="{:d}" y="{:d}" width="{:d}" height="{:d}" fill="none" stroke="black"/>\n'.format(left, top, width-left-right, height-top-bottom)
+
+	# axes labels
+	svg += '<text x="{:d}" y="{:d}" text-anchor="middle">{:s}</text>\n'.format((left+width-right)//2, height-8, escape(axisLabel(settings, 'bottom')))
+	svg += '<text x="14" y="{:d}" text-anchor="middle" transform="rotate(-90 14 {:d})">{:s}</text>\n'.format((top+height-bottom)//2, (top+height-bottom)//2, escape(axisLabel(settings, 'left')))
+
+	if (len(px) > 0):
+		points = ' '.join(['{:.1f},{:.1f}'.format(a, b) for a, b in zip(px.tolist(), py.tolist())])
+		svg += '<polyline fill="none" stroke="{:s}" stroke-width="1" points="{:s}"/>\n'.format(XSIM_PLOT_COLOR, points)
+	svg += '</svg>\n'
+	return svg
+
+def pngChunk(tag, data):
+	chunk = tag + data
+	return struct.pack('>I', len(data)) + chunk + struct.pack('>I', zlib.crc32(chunk) & 0xffffffff)
+
+def pngImage(image):
+	"""
+	Encodes (height, width, 3) uint8 image as PNG
+	"""
+	height, width = image.shape[:2]
+	raw = np.zeros((height, 1 + 3*width), dtype=np.uint8) # filter type 0 per line
+	raw[:,1:] = image.reshape(height, 3*width)
+	png = b'\x89PNG\r\n\x1a\n'
+	png += pngChunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+	png += pngChunk(b'IDAT', zlib.compress(raw.tobytes(), 6))
+	png += pngChunk(b'IEND', b'')
+	return png
+
+def pngPlot(xy, settings=None, width=XSIM_PLOT_WIDTH, height=XSIM_PLOT_HEIGHT):
+	"""
+	Renders data set xy as a PNG line plot
+	(frame, grid & curve only: labels are left to SVG/HTML reports)
+	"""
+	[px, py, xrange, yrange] = plotGeometry(xy, settings, width, height)
+	[left, right, top, bottom] = XSIM_PLOT_MARGINS
+	image = np.full((height, width, 3), 255, dtype=np.uint8)
+
+	for k in range(0, XSIM_PLOT_TICKS):
+		a = k / (XSIM_PLOT_TICKS-1)
+		gx = int(round(left + a * (width - left - right)))
+		gy = int(round(height - bottom - a * (height - top - bottom)))
+		image[top:height-bottom, min(gx, width-right-1)] = 221
+		image[min(gy, height-bottom-1), left:width-right] = 221
+	image[[top, height-bottom-1], left:width-right] = 0
+	image[top:height-bottom, [left, width-right-1]] = 0
+
+	if (len(px) > 0):
+		# segments sampled every pixel
+		if (len(px) == 1):
+			sx = px
+			sy = py
+		else:
+			steps = np.ceil(np.maximum(np.abs(np.diff(px)), np.abs(np.diff(py)))).astype(np.int64) + 1
+			segment = np.repeat(np.arange(0, len(px)-1), steps)
+			t = (np.arange(0, len(segment)) - np.repeat(np.cumsum(steps) - steps, steps)) / np.repeat(steps, steps)
+			sx = px[segment] + t * (px[segment+1] - px[segment])
+			sy = py[segment] + t * (py[segment+1] - py[segment])
+		sx = np.clip(np.rint(sx).astype(np.int64), left, width-right-1)
+		sy = np.clip(np.rint(sy).astype(np.int64), top, height-bottom-1)
+		color = np.frombuffer(bytes.fromhex(XSIM_PLOT_COLOR[1:]), dtype=np.uint8)
+		image[sy, sx] = color
+	return pngImage(image)
+
+def resultSummary(index, result):
+	datasets = result.getDataSets()
+	return {
+		'index': index,
+		'title': result.getTitle(),
+		'method': result.getMethod(),
+		'extra': result.getExtraString(),
+		'status': result.getStatus(),
+		'metrics': result.getMetrics(),
+		'datasets': 0 if (datasets is None) else len(datasets),
+		'plots': [],
+	}
+
+def renderResult(args):
+	"""
+	Renders plots of one result, runs in pool workers.
+	Returns its summary
+	"""
+	[index, result, directory, formats] = args
+	summary = resultSummary(index, result)
+	title = result.getTitle() or 'Test {:d}'.format(index)
+	svgs = []
+	for i in range(0, summary['datasets']):
+		xy = result.getDataSet(i)
+		settings = result.getPlotSettings(i)
+		name = 'result{:d}_{:d}'.format(index, i)
+		if ('svg' in formats) or ('html' in formats):
+			svg = svgPlot(xy, settings, title='{:s} #{:d}'.format(title, i))
+			if ('html' in formats):
+				svgs.append(svg)
+			if ('svg' in formats):
+				with open(os.path.join(directory, name + '.svg'), 'w') as fd:
+					fd.write(svg)
+				summary['plots'].append(name + '.svg')
+		if ('png' in formats):
+			with open(os.path.join(directory, name + '.png'), 'wb') as fd:
+				fd.write(pngPlot(xy, settings))
+			summary['plots'].append(name + '.png')
+	return [summary, svgs]
+
+class XSimReport:
+	"""
+	Headless report of simulation results:
+	summary.json plus SVG/PNG plots of every data set
+	and/or a self-contained index.html, written to directory.
+	Results are rendered in parallel (pool of workers processes)
+	"""
+
+	def __init__(self, directory, formats=['svg'], workers=None):
+		for fmt in formats:
+			if not(fmt in XSIM_REPORT_FORMATS):
+				raise ValueError("{:s} report format is not supported".format(fmt))
+		self.directory = directory
+		self.formats = formats
+		self.workers = workers
+		self.summary = None
+
+	def getDirectory(self):
+		return self.directory
+
+	def getFormats(self):
+		return self.formats
+
+	def getSummary(self):
+		return self.summary
+
+	def status(self, results):
+		"""
+		Returns overall status: FAILED if any result failed,
+		PASSED if all of them passed
+		"""
+		statuses = [result.getStatus() for result in results]
+		if ('FAILED' in statuses):
+			return 'FAILED'
+		if (len(statuses) > 0) and all([s == 'PASSED' for s in statuses]):
+			return 'PASSED'
+		return 'NOT VERIFIED'
+
+	def write(self, results):
+		"""
+		Renders all results, returns summary
+		"""
+		os.makedirs(self.directory, exist_ok=True)
+		tasks = [[i, results[i], self.directory, self.formats] for i in range(0, len(results))]
+		if (self.workers == 1) or (len(tasks) <= 1):
+			rendered = [renderResult(task) for task in tasks]
+		else:
+			from concurrent.futures import ProcessPoolExecutor
+			with ProcessPoolExecutor(max_workers=self.workers) as pool:
+				rendered = list(pool.map(renderResult, tasks))
+
+		date = datetime.datetime.now()
+		self.summary = {
+			'date': date.strftime('%Y/%m/%d %H:%M:%S'),
+			'status': self.status(results),
+			'results': [r[0] for r in rendered],
+		}
+		with open(os.path.join(self.directory, 'summary.json'), 'w') as fd:
+			json.dump(self.summary, fd, indent=1)
+
+		if ('html' in self.formats):
+			self.writeHTML(rendered)
+		return self.summary
+
+	def writeHTML(self, rendered):
+		html = '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+		html += '<title>{:s} run</title>\n</head>\n<body style="font-family: sans-serif">\n'.format(self.summary['date'])
+		html += '<h1>{:s} run: {:s}</h1>\n'.format(self.summary['date'], self.summary['status'])
+		for [summary, svgs] in rendered:
+			color = STATUS_COLORS[SUPPORTED_STATUS.index(summary['status'])]
+			html += '<h2>Test {:d}</h2>\n<table border="1" cellspacing="0" cellpadding="4">\n<tr>'.format(summary['index'])
+			items = [['Test', summary['title']]]
+			if (summary['method']):
+				items.append(['Method', summary['method']])
+			if (summary['extra']):
+				items.append(['Infos', summary['extra']])
+			for name, value in summary['metrics'].items():
+				items.append([name, '{:g}'.format(value)])
+			html += ''.join(['<th>{:s}</th>'.format(escape(item[0])) for item in items]) + '<th>Status</th></tr>\n<tr>'
+			html += ''.join(['<td>{:s}</td>'.format(escape(item[1])) for item in items])
+			html += '<td style="background-color: {:s}">{:s}</td></tr>\n</table>\n'.format(color, summary['status'])
+			for svg in svgs:
+				html += svg
+		html += '</body>\n</html>\n'
+		with open(os.path.join(self.directory, 'index.html'), 'w') as fd:
+			fd.write(html)
+
+	def exitCode(self):
+		"""
+		Returns process exit code: 1 when a result FAILED
+		"""
+		if (self.summary is not None) and (self.summary['status'] == 'FAILED'):
+			return 1
+		return 0
@@ -1,9 +1,130 @@
-# Qt5
-from PyQt5.QtWidgets import QTreeWidget, QTreeWidgetItem 
+import os
+import json
+import struct
+import numpy as np
 
 SUPPORTED_STATUS = ['PASSED', 'FAILED', 'NOT VERIFIED']
 STATUS_COLORS = ["#04FF9D", "red", "#0487FF"]
 
+# .npz member holding title, status, settings.. (JSON)
+XSIM_RESULT_HEADER = 'header'
+
+# memory mapped files outliving the objects mapping them
+# (saved results, simulation outputs, stores): only views
+# onto those are pickled by file region, see persistentFile
+_PERSISTENT_FILES = set()
+
+def persistentFile(fp):
+	"""
+	Declares memory mapped file fp persistent: arrays mapped
+	from it are pickled as a file region instead of their data.
+	Temporary files (shared mappings..) must not be declared
+	"""
+	_PERSISTENT_FILES.add(os.path.abspath(fp))
+
+def mappedRoot(a):
+	"""
+	Returns the read only memory mapped file (np.memmap)
+	array a is a view onto, None otherwise
+	"""
+	if not(isinstance(a, np.ndarray)):
+		return None
+	root = a
+	while isinstance(root.base, np.ndarray):
+		root = root.base
+	if not(isinstance(root, np.memmap)) or (root.filename is None) or (root.mode != 'r'):
+		return None
+	return root
+
+def mappedRegion(a):
+	"""
+	Returns [file name, offset] of the first element of array a
+	when a is a view onto a read only memory mapped file
+	(np.memmap) declared persistent, None otherwise
+	"""
+	if not(isinstance(a, np.ndarray)) or (a.size == 0) or any([s < 0 for s in a.strides]):
+		return None
+	root = mappedRoot(a)
+	if (root is None) or not(root.filename in _PERSISTENT_FILES):
+		return None
+	return [root.filename, root.offset + a.ctypes.data - root.ctypes.data]
+
+def packArray(a):
+	"""
+	Pickling form of array a: memory mapped views
+	are passed as a file region rather than their data
+	"""
+	region = mappedRegion(a)
+	if (region is None):
+		return a
+	return ['mapped', region[0], region[1], a.dtype.str, a.shape, a.strides]
+
+def unpackArray(packed, maps):
+	"""
+	Rebuilds packArray() array, maps: {file name: np.memmap}
+	shared by all arrays of one result
+	"""
+	if (isinstance(packed, np.ndarray)):
+		return packed
+	[tag, filename, offset, dtype, shape, strides] = packed
+	if not(filename in maps):
+		persistentFile(filename)
+		maps[filename] = np.memmap(filename, dtype=np.uint8, mode='r')
+	return np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=maps[filename], offset=offset, strides=tuple(strides))
+
+def npzMembers(fp):
+	"""
+	Returns {name: [offset, dtype, shape, fortran order]} of the
+	arrays of uncompressed .npz file fp (np.savez)
+	"""
+	import zipfile # only needed to load results
+	members = {}
+	with zipfile.ZipFile(fp) as archive, open(fp, 'rb') as fd:
+		for info in archive.infolist():
+			if not(info.filename.endswith('.npy')):
+				continue
+			if (info.compress_type != zipfile.ZIP_STORED):
+				raise ValueError("{:s}: compressed archives can't be memory mapped".format(fp))
+			# local file header: data follows name & extra field
+			fd.seek(info.header_offset)
+			header = fd.read(30)
+			[namelength, extralength] = struct.unpack('<HH', header[26:30])
+			fd.seek(info.header_offset + 30 + namelength + extralength)
+			version = np.lib.format.read_magic(fd)
+			if (version == (1, 0)):
+				[shape, fortran, dtype] = np.lib.format.read_array_header_1_0(fd)
+			else:
+				[shape, fortran, dtype] = np.lib.format.read_array_header_2_0(fd)
+			members[info.filename[:-4]] = [fd.tell(), dtype, shape, fortran]
+	return members
+
+def readResult(fp, mmap=True):
+	"""
+	Loads XSimResult saved by XSimResult.save(fp).
+	Data sets are views onto the memory mapped file
+	unless mmap is False
+	"""
+	if not(mmap):
+		with np.load(fp, allow_pickle=False) as npz:
+			header = json.loads(str(npz[XSIM_RESULT_HEADER]))
+			arrays = {name: npz[name] for name in npz.files}
+	else:
+		members = npzMembers(fp)
+		persistentFile(fp)
+		data = np.memmap(fp, dtype=np.uint8, mode='r')
+		arrays = {}
+		for name, [offset, dtype, shape, fortran] in members.items():
+			order = 'F' if (fortran) else 'C'
+			arrays[name] = np.ndarray(shape, dtype=dtype, buffer=data, offset=offset, order=order)
+		header = json.loads(str(arrays[XSIM_RESULT_HEADER]))
+
+	result = XSimResult(title=header['title'], method=header['method'], status=header['status'], extra=header['extra'], metrics=header['metrics'])
+	axes = [arrays['x{:d}'.format(i)] for i in range(0, header['axes'])]
+	for i in range(0, len(header['datasets'])):
+		result.addDataSet([axes[header['datasets'][i]], arrays['y{:d}'.format(i)]])
+	result.plotSettings = header['settings']
+	return result
+
 class XSimResult:
 
 	def __init__(self, *args, **kwargs):
@@ -11,9 +132,11 @@ class XSimResult:
 		self.setMethod(None)
 		self.setStatus('NOT VERIFIED')
 		self.setExtraString(None)
+		self.metrics = {} # summary metrics (SNR, error counts..)
 
 		# plot
-		self._xy = None
+		self._xy = None # [[x, y], ..] arrays
+		self.xaxis = None # shared x axis
 		self.plotSettings = None
 
 		for key, value in kwargs.items():
@@ -25,8 +148,13 @@ class XSimResult:
 				self.setExtraString(value)
 			elif key == 'status':
 				self.setStatus(value)
+			elif key == 'metrics':
+				for name, metric in value.items():
+					self.setMetric(name, metric)
 
 	def header(self):
+		# Qt5: only needed by the UI
+		from PyQt5.QtWidgets import QTreeWidget, QTreeWidgetItem
 		tree = QTreeWidget()
 		items = ['Test']
 		data = [self.getTitle()]
@@ -76,11 +204,47 @@ class XSimResult:
 	def getExtraString(self):
 		return self.extra
 
-	def addDataSet(self, xy):
+	def setXAxis(self, x):
+		"""
+		Declares x axis shared by data sets added without one
+		"""
+		self.xaxis = np.asanyarray(x)
+
+	def getXAxis(self):
+		return self.xaxis
+
+	def addDataSet(self, xy, dtype=None):
+		"""
+		Adds [x, y] data set, stored as arrays (y converted to dtype),
+		views are kept as is: no copy of contiguous arrays or
+		memory mapped data. x: None for the shared x axis (setXAxis)
+		"""
+		[x, y] = xy
+		y = np.asanyarray(y, dtype=dtype)
+		if (y.ndim == 1) and not(y.flags.c_contiguous) and (mappedRegion(y) is None):
+			y = np.ascontiguousarray(y)
+		if (x is None):
+			if (self.xaxis is None) or (len(self.xaxis) != len(y)):
+				self.setXAxis(np.arange(len(y)))
+			x = self.xaxis
+		else:
+			x = np.asanyarray(x)
+
 		if (self._xy is None):
-			self._xy = [xy]
+			self._xy = [[x, y]]
 		else:
-			self._xy.append(xy)
+			self._xy.append([x, y])
+
+	def addDataSets(self, x, Y, dtype=None):
+		"""
+		Adds one data set per row of 2D array Y (channels),
+		all sharing x axis (None: sample index)
+		"""
+		Y = np.asanyarray(Y, dtype=dtype)
+		if (x is not None):
+			self.setXAxis(x)
+		for y in Y:
+			self.addDataSet([None, y])
 	
 	def getDataSets(self):
 		return self._xy 
@@ -88,6 +252,98 @@ class XSimResult:
 	def getDataSet(self, index):
 		return self._xy[index]
 
+	def axes(self):
+		"""
+		Returns [distinct x axes, x axis index of every data set]
+		"""
+		axes = []
+		index = {}
+		refs = []
+		for [x, y] in (self._xy or []):
+			if not(id(x) in index):
+				index[id(x)] = len(axes)
+				axes.append(x)
+			refs.append(index[id(x)])
+		return [axes, refs]
+
+	def detach(self, files):
+		"""
+		Replaces x axes & data sets mapped from given files
+		(about to be removed) by in memory copies
+		"""
+		copies = {} # shared axes stay shared
+		def detached(a):
+			root = mappedRoot(a)
+			if (root is None) or not(root.filename in files):
+				return a
+			if not(id(a) in copies):
+				copies[id(a)] = np.array(a)
+			return copies[id(a)]
+
+		if (self.xaxis is not None):
+			self.xaxis = detached(self.xaxis)
+		for xy in (self._xy or []):
+			xy[0] = detached(xy[0])
+			xy[1] = detached(xy[1])
+
+	def nbytes(self):
+		"""
+		Returns size of data sets [bytes], shared axes counted once
+		"""
+		[axes, refs] = self.axes()
+		return sum([x.nbytes for x in axes]) + sum([xy[1].nbytes for xy in (self._xy or [])])
+
+	def metadata(self):
+		return {
+			'title': self.getTitle(),
+			'method': self.getMethod(),
+			'status': self.getStatus(),
+			'extra': self.getExtraString(),
+			'metrics': self.getMetrics(),
+			'settings': self.plotSettings,
+		}
+
+	def save(self, fp):
+		"""
+		Saves result to uncompressed .npz file fp,
+		arrays are streamed as is, shared x axes are written once
+		"""
+		[axes, refs] = self.axes()
+		header = self.metadata()
+		header['axes'] = len(axes)
+		header['datasets'] = refs
+		arrays = {XSIM_RESULT_HEADER: np.array(json.dumps(header))}
+		for i in range(0, len(axes)):
+			arrays['x{:d}'.format(i)] = axes[i]
+		for i in range(0, len(refs)):
+			arrays['y{:d}'.format(i)] = self._xy[i][1]
+		np.savez(fp, **arrays)
+
+	def __getstate__(self):
+		# memory mapped data sets are passed by file region
+		state = dict(self.__dict__)
+		[axes, refs] = self.axes()
+		state['_xy'] = None
+		if (self.xaxis is not None):
+			state['xaxis'] = packArray(self.xaxis)
+		state['datasets'] = [[packArray(x) for x in axes], refs, [packArray(xy[1]) for xy in (self._xy or [])]]
+		if (self._xy is None):
+			state['datasets'] = None
+		return state
+
+	def __setstate__(self, state):
+		datasets = state.pop('datasets')
+		self.__dict__.update(state)
+		if (datasets is None):
+			return
+		maps = {}
+		if (self.xaxis is not None):
+			self.xaxis = unpackArray(self.xaxis, maps)
+		[axes, refs, ys] = datasets
+		axes = [unpackArray(x, maps) for x in axes]
+		for i in range(0, len(refs)):
+			self.addDataSet([axes[refs[i]], unpackArray(ys[i], maps)])
+
 	def addPlotSettings(self, Dict):
 		if (self.plotSettings is None):
 			self.plotSettings = [Dict]
@@ -105,3 +361,12 @@ class XSimResult:
 
 	def getMethod(self):
 		return self.method
+
+	def setMetric(self, name, value):
+		self.metrics[name] = float(value)
+
+	def getMetric(self, name):
+		return self.metrics.get(name)
+
+	def getMetrics(self):
+		return self.metrics
@@ -0,0 +1,338 @@
+#! /usr/bin/env python3
+import os
+import sys
+import time
+import signal
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from XSimCache import *
+
+XSIM_STEPS = ['xvhdl', 'xelab', 'xsim']
+
+XSIM_JOB_STATUS = ['PENDING', 'RUNNING', 'PASSED', 'FAILED', 'TIMEOUT', 'CANCELLED']
+
+# default command line options per step
+XSIM_STEP_OPTIONS = {
+	'xvhdl': [],
+	'xelab': [],
+	'xsim': ['-R'], # run all & quit
+}
+
+# running steps check their deadline & cancellation at this period [s]
+XSIM_RUNNER_POLL = 0.05
+
+def fakeTools():
+	"""
+	Returns XSimRunner tools running tools/fakesim.py
+	instead of the Vivado simulator
+	"""
+	script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tools', 'fakesim.py')
+	return {step: [sys.executable, script, step] for step in XSIM_STEPS}
+
+class XSimJob:
+	"""
+	One test bench run: sources are compiled (xvhdl),
+	top is elaborated into snapshot (xelab) which is then simulated (xsim),
+	all from workdir. Step outputs are captured in workdir/<step>.out
+	"""
+
+	def __init__(self, name, workdir, sources, top, snapshot=None, options=None, timeout=None, env=None):
+		self.name = name
+		self.workdir = workdir
+		self.sources = sources
+		self.top = top
+		self.snapshot = snapshot
+		if (snapshot is None):
+			self.snapshot = '{:s}_snapshot'.format(top)
+		self.options = dict(XSIM_STEP_OPTIONS)
+		if (options is not None):
+			self.options.update(options)
+		self.timeout = timeout
+		self.env = env
+
+		self.status = 'PENDING'
+		self.step = None # running or last step
+		self.returncodes = {}
+		self.durations = {}
+		self.process = None
+		self.cancelled = False
+		self.cached = False # snapshot restored from cache
+
+	def getName(self):
+		return self.name
+
+	def getWorkdir(self):
+		return self.workdir
+
+	def getSources(self):
+		return self.sources
+
+	def getTop(self):
+		return self.top
+
+	def getSnapshot(self):
+		return self.snapshot
+
+	def getTimeout(self):
+		return self.timeout
+
+	def getStatus(self):
+		return self.status
+
+	def getStep(self):
+		return self.step
+
+	def getReturnCodes(self):
+		return self.returncodes
+
+	def getDurations(self):
+		return self.durations
+
+	def isCached(self):
+		return self.cached
+
+	def duration(self):
+		return sum(self.durations.values())
+
+	def command(self, step, tools):
+		"""
+		Returns command line of given step,
+		tools: command prefix per step
+		"""
+		prefix = list(tools[step])
+		options = list(self.options.get(step, []))
+		if (step == 'xvhdl'):
+			return prefix + options + list(self.sources)
+		if (step == 'xelab'):
+			return prefix + options + [self.top, '-s', self.snapshot]
+		return prefix + [self.snapshot] + options
+
+	def logFile(self, step):
+		return os.path.join(self.workdir, '{:s}.out'.format(step))
+
+	def log(self, step):
+		"""
+		Returns captured output of given step
+		"""
+		try:
+			with open(self.logFile(step), 'r', errors='replace') as fd:
+				return fd.read()
+		except OSError:
+			return ''
+
+	def __str__(self):
+		string = "{:s}: {:s}".format(self.name, self.status)
+		if (self.status in ['FAILED', 'TIMEOUT', 'CANCELLED']) and (self.step is not None):
+			string += " ({:s})".format(self.step)
+		if (self.cached):
+			string += " (cached snapshot)"
+		return string
+
+class XSimRunner:
+	"""
+	Runs XSimJobs, at most workers of them at once:
+	each job runs its steps one after the other as subprocesses.
+	Jobs exceeding their timeout (or the runner default) [s]
+	are killed and marked TIMEOUT, cancel() kills running jobs
+	and skips pending ones (CANCELLED).
+	tools: command prefix per step (fake simulator, wrappers..)
+	cache: XSimSnapshotCache, jobs whose snapshot is cached only run xsim
+	"""
+
+	def __init__(self, workers=None, timeout=None, tools=None, cache=None):
+		self.workers = workers
+		if (workers is None):
+			self.workers = os.cpu_count()
+		self.timeout = timeout
+		self.tools = {step: [step] for step in XSIM_STEPS}
+		if (tools is not None):
+			self.tools.update(tools)
+		self.cache = cache
+		self.cancelled = threading.Event()
+		self.jobs = []
+
+	def getWorkers(self):
+		return self.workers
+
+	def getTimeout(self):
+		return self.timeout
+
+	def getTools(self):
+		return self.tools
+
+	def getSnapshotCache(self):
+		return self.cache
+
+	def getJobs(self):
+		return self.jobs
+
+	def run(self, jobs):
+		"""
+		Runs all jobs, returns them once they all completed
+		"""
+		self.jobs = jobs
+		self.cancelled.clear()
+		with ThreadPoolExecutor(max_workers=self.workers) as pool:
+			futures = [pool.submit(self.runJob, job) for job in jobs]
+			try:
+				for future in futures:
+					future.result()
+			except KeyboardInterrupt:
+				self.cancel()
+				raise
+		return jobs
+
+	def cancel(self, job=None):
+		"""
+		Cancels given job, all jobs when None
+		"""
+		jobs = self.jobs
+		if (job is None):
+			self.cancelled.set()
+		else:
+			job.cancelled = True
+			jobs = [job]
+		for job in jobs:
+			self.kill(job)
+
+	def kill(self, job):
+		"""
+		Kills running step of job (whole process group)
+		"""
+		process = job.process
+		if (process is None) or (process.poll() is not None):
+			return
+		try:
+			os.killpg(process.pid, signal.SIGKILL)
+		except OSError:
+			pass
+
+	def isCancelled(self, job):
+		return job.cancelled or self.cancelled.is_set()
+
+	def runJob(self, job):
+		if (self.isCancelled(job)):
+			job.status = 'CANCELLED'
+			return job
+
+		timeout = job.getTimeout()
+		if (timeout is None):
+			timeout = self.timeout
+		deadline = None
+		if (timeout is not None):
+			deadline = time.monotonic() + timeout
+
+		env = None
+		if (job.env is not None):
+			env = dict(os.environ)
+			env.update(job.env)
+
+		job.status = 'RUNNING'
+		os.makedirs(job.getWorkdir(), exist_ok=True)
+		steps = XSIM_STEPS
+		key = None
+		if (self.cache is not None):
+			key = self.cache.key(job, self.tools)
+			job.cached = self.cache.restore(key, job.getWorkdir())
+			if (job.cached):
+				steps = ['xsim']
+
+		for step in steps:
+			job.step = step
+			start = time.monotonic()
+			status = self.runStep(job, step, env, deadline)
+			job.durations[step] = time.monotonic() - start
+			if (status is not None):
+				job.status = status
+				return job
+			if (step == 'xelab') and (key is not None):
+				self.cache.store(key, job.getWorkdir(), job.durations['xvhdl'] + job.durations['xelab'])
+
+		job.status = 'PASSED'
+		return job
+
+	def runStep(self, job, step, env, deadline):
+		"""
+		Runs one step of job, returns None on success,
+		job status otherwise
+		"""
+		with open(job.logFile(step), 'w') as fd:
+			try:
+				job.process = subprocess.Popen(job.command(step, self.tools), cwd=job.getWorkdir(), env=env, stdout=fd, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, start_new_session=True)
+			except OSError as e:
+				fd.write("{:s}\n".format(str(e)))
+				job.returncodes[step] = None
+				return 'FAILED'
+
+			status = None
+			while True:
+				try:
+					job.process.wait(timeout=XSIM_RUNNER_POLL)
+					break
+				except subprocess.TimeoutExpired:
+					pass
+				if (self.isCancelled(job)):
+					status = 'CANCELLED'
+				elif (deadline is not None) and (time.monotonic() > deadline):
+					status = 'TIMEOUT'
+				if (status is not None):
+					self.kill(job)
+					job.process.wait()
+					break
+
+		job.returncodes[step] = job.process.returncode
+		job.process = None
+		if (status is not None):
+			return status
+		if (self.isCancelled(job)):
+			return 'CANCELLED' # killed while completing
+		if (job.returncodes[step] != 0):
+			return 'FAILED'
+		return None
+
+	def exitCode(self):
+		return int(any([job.getStatus() != 'PASSED' for job in self.jobs]))
+
+	def __str__(self):
+		string = ''
+		for job in self.jobs:
+			string += "{:s} [{:.1f} s]\n".format(str(job), job.duration())
+		if (self.cache is not None):
+			string += str(self.cache)
+		return string
+
+def main(argv):
+	parser = argparse.ArgumentParser(description='XSim compile/elaborate/simulate runner')
+	parser.add_argument('workdirs', nargs='+', help='one test bench per work directory')
+	parser.add_argument('--top', required=True, help='top level entity')
+	parser.add_argument('-s', '--source', action='append', default=[], help='VHDL source in compilation order, relative to work directories, may be repeated')
+	parser.add_argument('-j', '--workers', type=int, default=None, help='number of concurrent jobs')
+	parser.add_argument('--timeout', type=float, default=None, help='per job timeout [s]')
+	parser.add_argument('--fake', action='store_true', help='run tools/fakesim.py instead of the Vivado simulator')
+	parser.add_argument('--cache', default=None, help='elaborated snapshots cache directory')
+	parser.add_argument('--cache-size', type=float, default=16*1024**3, help='snapshots cache budget [bytes]')
+	args = parser.parse_args(argv[1:])
+
+	jobs = []
+	for workdir in args.workdirs:
+		sources = [os.path.join(os.path.abspath(workdir), source) for source in args.source]
+		jobs.append(XSimJob(workdir, workdir, sources, args.top))
+
+	tools = None
+	if (args.fake):
+		tools = fakeTools()
+
+	cache = None
+	if (args.cache is not None):
+		cache = XSimSnapshotCache(args.cache, maxsize=args.cache_size)
+
+	runner = XSimRunner(workers=args.workers, timeout=args.timeout, tools=tools, cache=cache)
+	runner.run(jobs)
+	print(runner)
+	return runner.exitCode()
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv))
@@ -1,13 +1,29 @@
 import random
 import numpy as np
-import scipy.signal as signal
+
+from XSimNoise import *
+
+# default block size for streamed generation [symbols]
+XSIM_BLOCK_SIZE = 65536
 
 class XSimStimulus:
+
+	# time base used by _fill()
+	#  'time': n/sample_rate
+	#  'unit': [0:1] over the whole stimulus
+	TIMEBASE = 'time'
 	
 	def __init__(self, key, nsymbols, sample_rate=100E6):	
 		self.setKey(key)
 		self.setNSymbols(nsymbols)
 		self.sample_rate = sample_rate
+		self.processes = []
+		self.symbols = None
+		self.descriptor = None
+		self.seed = None
+		self.seedseq = None
+		self.quantization = None
+		self.clips = 0
 
 	def numberOfSymbols(self):
 		"""
@@ -24,17 +40,199 @@ class XSimStimulus:
 	def setKey(self, key):
 		self.key = key
 	
+	def setDescriptor(self, d):
+		"""
+		Keeps the dictionnary/JSON entry this stimulus was built from
+		"""
+		self.descriptor = d
+
+	def getDescriptor(self):
+		return self.descriptor
+
+	def setSeed(self, seed):
+		"""
+		Seeds this stimulus noise,
+		takes precedence over the test bench seed
+		"""
+		self.seed = seed
+
+	def getSeed(self):
+		return self.seed
+
+	def setSeedSequence(self, seedseq):
+		"""
+		Assigns the SeedSequence spawned for this stimulus
+		by the test bench
+		"""
+		self.seedseq = seedseq
+
+	def getSeedSequence(self):
+		"""
+		Returns SeedSequence noise is drawn from,
+		None if noise is not seeded
+		"""
+		if (self.seed is not None):
+			return np.random.SeedSequence(self.seed)
+		return self.seedseq
+
+	def hasNoise(self):
+		"""
+		Returns True if noise processes are declared
+		"""
+		return (len(self.processes) > 0)
+
+	def isDeterministic(self):
+		"""
+		Returns True if generating twice gives the same symbols
+		"""
+		return not(self.hasNoise()) or (self.getSeedSequence() is not None)
+
+	def setQuantization(self, param, rounding='nearest', overflow='saturate', emit='integer'):
+		"""
+		Emits this stimulus as integers quantized
+		to the format of fixed point parameter param (key)
+		emit: 'integer' or 'slv' (std_logic_vector)
+		"""
+		if not(emit in ['integer', 'slv']):
+			raise ValueError("{:s} quantized LUT type is not supported".format(emit))
+		self.quantization = {'param': param, 'rounding': rounding, 'overflow': overflow, 'emit': emit}
+
+	def getQuantization(self):
+		return self.quantization
+
+	def isQuantized(self):
+		return self.quantization is not None
+
+	def getClipCount(self):
+		"""
+		Returns number of symbols clipped by last quantization
+		"""
+		return self.clips
+
 	def getSymbols(self):
 		"""
 		Returns symbols that were generated
 		"""
 		return self.symbols
 
+	def clearSymbols(self):
+		"""
+		Releases generated symbols
+		"""
+		self.symbols = None
+
 	def getSampleRate(self):
 		return self.sample_rate
 
 	def getType(self):
 		return 'generic-stimulus'
+
+	def timeBase(self, start=0, n=None):
+		"""
+		Returns time base for symbols [start:start+n]
+		"""
+		if n is None:
+			n = self.numberOfSymbols() - start
+
+		t = np.arange(start, start+n, dtype=np.float64)
+		if (self.TIMEBASE == 'unit'):
+			N = self.numberOfSymbols()
+			if (N > 1):
+				t *= 1.0/(N-1)
+		else:
+			t /= self.getSampleRate()
+		return t
+
+	def _fill(self, out, t, noise=None):
+		"""
+		Computes symbols in place into out,
+		t is the time base returned by timeBase(),
+		noise: noise streams to read from, fresh ones if None.
+		Generic stimulus: declared noise only (zero signal)
+		"""
+		out.fill(0.0)
+		self._addNoise(out, noise=noise)
+
+	def _generate(self):
+		self.symbols = np.empty(self.numberOfSymbols())
+		self._fill(self.symbols, self.timeBase())
+
+	def iterBlocks(self, blocksize=XSIM_BLOCK_SIZE):
+		"""
+		Yields symbols by blocks of blocksize (last one may be shorter).
+		Symbols are sliced if already generated,
+		streamed otherwise: memory usage is then bounded by blocksize
+		and phase/noise are continuous across blocks
+		"""
+		N = self.numberOfSymbols()
+		if (self.symbols is not None):
+			for start in range(0, N, blocksize):
+				yield self.symbols[start:start+blocksize]
+			return
+
+		noise = self.noiseStreams()
+		for start in range(0, N, blocksize):
+			n = min(blocksize, N-start)
+			block = np.empty(n)
+			self._fill(block, self.timeBase(start, n), noise=noise)
+			yield block
+
+	def parseNoiseOptions(self, options):
+		"""
+		Registers noise processes declared in 'addnoise' option,
+		either one or a list of:
+			{'type': 'white'|'pink'|'brown'|'psd', 'density': dB,
+			'psd': [[f (Hz), dB], ..] ('psd' type only),
+			'taps': shaping filter length (optionnal)}
+		"""
+		try:
+			processes = options['addnoise']
+		except KeyError:
+			return
+
+		if (type(processes) == dict):
+			processes = [processes]
+
+		for p in processes:
+			try:
+				noise_type = p['type']
+				noise_density = p['density']
+			except KeyError:
+				continue
+			if not(noise_type in XSIM_NOISE_TYPES):
+				raise ValueError("{:s} noise is not supported".format(noise_type))
+			self.processes.append([noise_type, noise_density, p])
+
+	def noiseStream(self, ntype, density, seedseq, options=None):
+		"""
+		Returns noise stream drawing from seedseq
+		"""
+		if options is None:
+			options = {}
+		return XSimNoiseStream(ntype, density, seedseq=seedseq, psd=options.get('psd'), taps=options.get('taps', XSIM_NOISE_TAPS), sample_rate=self.getSampleRate())
+
+	def noiseStreams(self):
+		"""
+		Returns one fresh noise stream per declared noise process
+		"""
+		seedseq = self.getSeedSequence()
+		if (seedseq is None):
+			seedseq = np.random.SeedSequence() # fresh entropy
+
+		streams = []
+		for i in range(0, len(self.processes)):
+			p = self.processes[i]
+			streams.append(self.noiseStream(p[0], p[1], childSeedSequence(seedseq, i), options=p[2]))
+		return streams
+
+	def _addNoise(self, out, noise=None):
+		"""
+		Adds declared noise processes to out, in place
+		"""
+		if noise is None:
+			noise = self.noiseStreams()
+		for stream in noise:
+			out += stream.read(len(out))
 	
 	def whiteNoise(self, psd, mean=None):
 		"""
@@ -45,21 +243,19 @@ class XSimStimulus:
 		if mean is None:
 			mean = 0.0
 
-		sigma = np.sqrt(np.power(10,psd/20))
-		return np.random.normal(loc=mean, scale=sigma, size=self.numberOfSymbols())
+		return mean + self.noiseStream('white', psd, self.getSeedSequence()).read(self.numberOfSymbols())
 
-	def pinNoise(self):
+	def pinkNoise(self, psd=0.0):
 		"""
 		Generates pink noise (-10 dB/dec) shape
 		"""
-		uneven = self.numberOfSymbols()%2
-		state = np.random.RandomState()
-		x = state.randn(self.numberOfSymbols()//2+1+uneven)
-		s = np.sqrt(np.arange(len(x))+1.)
-		y = (np.fft.irfft(x/s)).real
-		if uneven:
-			y = y[:-1]
-		return y
+		return self.noiseStream('pink', psd, self.getSeedSequence()).read(self.numberOfSymbols())
+
+	def brownNoise(self, psd=0.0):
+		"""
+		Generates brown noise (-20 dB/dec) shape
+		"""
+		return self.noiseStream('brown', psd, self.getSeedSequence()).read(self.numberOfSymbols())
 
 class XSimSineWaveStimulus (XSimStimulus):
 
@@ -69,10 +265,6 @@ class XSimSineWaveStimulus (XSimStimulus):
 		self.freq = f
 		self.ampl = a
 
-		nsymbols = self.numberOfSymbols()
-
-		self.processes = []
-
 		use_mod = False
 		tone_type = None
 		tone_power = None
@@ -80,12 +272,7 @@ class XSimSineWaveStimulus (XSimStimulus):
 		self.alpha = 0 
 		
 		if (options is not None):
-			try:
-				noise_type = options['addnoise']['type']
-				noise_density = options['addnoise']['density']
-				self.processes.append([noise_type, noise_density])
-			except KeyError:
-				pass
+			self.parseNoiseOptions(options)
 
 			try:
 				use_mod = True
@@ -110,18 +297,16 @@ class XSimSineWaveStimulus (XSimStimulus):
 		string = "freq: {:.3e} Hz | ampl: {:.3e} \n".format(self.getFrequency(), self.getAmplitude())
 		return string
 	
-	def _generate(self):
-		t = np.arange(self.nsymbols)/self.getSampleRate()
-		self.gamma = np.zeros(self.nsymbols)
-		for p in self.processes:
-			if (p[0] == 'white'):
-				self.gamma += self.whiteNoise(p[1], mean=None) 
-			elif (p[0] == 'pink'):
-				self.gamma += self.pinkNoise() 
-
-		self.symbols = (1+self.alpha)*self.getAmplitude()*np.sin(2*np.pi*self.getFrequency()*t) + self.gamma
+	def _fill(self, out, t, noise=None):
+		np.multiply(t, 2*np.pi*self.getFrequency(), out=out)
+		np.sin(out, out=out)
+		out *= (1+self.alpha)*self.getAmplitude()
+		self._addNoise(out, noise=noise)
 
 class XSimSquareWaveStimulus (XSimStimulus):
+
+	TIMEBASE = 'unit'
+
 	def __init__(self, key, a, nperiods, nsymbols, sample_rate=100E6, options=None):
 		super(XSimSquareWaveStimulus, self).__init__(key, nsymbols, sample_rate=sample_rate)
 
@@ -129,21 +314,8 @@ class XSimSquareWaveStimulus (XSimStimulus):
 		self.a = a
 		self.nperiods = nperiods
 
-		self.alpha = np.zeros(nsymbols)
-
 		if (options is not None):
-			try:
-				noise_type = options['addnoise']['type']
-				noise_density = options['addnoise']['density']
-
-				if (noise_type == 'white'):
-					self.alpha += self.whiteNoise(noise_density)
-
-				if (noise_type == 'pink'):
-					self.alpha += self.pink()
-			
-			except KeyError:
-				pass
+			self.parseNoiseOptions(options)
 
 			try:
 				self.duty = options['options']['duty']
@@ -159,24 +331,29 @@ class XSimSquareWaveStimulus (XSimStimulus):
 	def getNumberOfPeriods(self):
 		return self.nperiods
 
-	def _generate(self):
-		t = np.linspace(0, 1, num=self.numberOfSymbols())
-		self.symbols = self.alpha + self.getAmplitude() * signal.square(2*np.pi*self.getNumberOfPeriods()*t, duty=self.getDutyCycle())
+	def _fill(self, out, t, noise=None):
+		# +a over [0:duty[ of each period, -a otherwise
+		a = self.getAmplitude()
+		np.multiply(t, 2*np.pi*self.getNumberOfPeriods(), out=out)
+		np.mod(out, 2*np.pi, out=out)
+		out -= 2*np.pi*self.getDutyCycle()
+		np.heaviside(out, 1.0, out=out)
+		out *= -2*a
+		out += a
+		self._addNoise(out, noise=noise)
 
 class XSimRampStimulus (XSimStimulus):
+
+	TIMEBASE = 'unit'
 	
 	def __init__(self, key, a, nperiods, nsymbols, sample_rate=100E6, options=None):
 		super(XSimRampStimulus, self).__init__(key, nsymbols, sample_rate=sample_rate)
 
+		self.a = a
 		self.sign = 1.0
 		self.poff = 0.0
 		self.nperiods = nperiods
 
-		add_noise = False
-		noise_type = None
-		noise_density = None
-		self.alpha = np.zeros(nsymbols)
-
 		if (options is not None):
 			try:
 				decreasing = options['down']
@@ -186,18 +363,7 @@ class XSimRampStimulus (XSimStimulus):
 			except KeyError:
 				pass
 
-			try:
-				noise_type = options['addnoise']['type']
-				noise_density = options['addnoise']['density']
-				
-				if (noise_type == 'white'):
-					self.alpha += self.whiteNoise(noise_density) 
-
-				elif (noise_type == 'pink'):
-					self.alpha += self.pinkNoise()
-			
-			except KeyError:
-				pass
+			self.parseNoiseOptions(options)
 
 	def getAmplitude(self):
 		return self.a
@@ -211,6 +377,13 @@ class XSimRampStimulus (XSimStimulus):
 	def getSign(self):
 		return self.sign
 
-	def _generate(self):
-		t = np.linspace(0, 1, num=self.numberOfSymbols())
-		self.symbols = self.alpha + self.getAmplitude() * signal.sawtooth(sign*2*np.pi*self.getNumberOfPeriods()*t + self.getPhaseOffset())
+	def _fill(self, out, t, noise=None):
+		# rising sawtooth, a*(phase/pi -1) with phase in [0:2pi[
+		a = self.getAmplitude()
+		np.multiply(t, self.getSign()*2*np.pi*self.getNumberOfPeriods(), out=out)
+		out += self.getPhaseOffset()
+		np.mod(out, 2*np.pi, out=out)
+		out *= a/np.pi
+		out -= a
+		self._addNoise(out, noise=noise)
+
@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import sqlite3
+import numpy as np
+
+from XSimResult import *
+
+XSIM_STORE_DATABASE = 'results.db'
+
+# data sets sidecar files subdirectory
+XSIM_STORE_DATA = 'data'
+
+XSIM_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+	id INTEGER PRIMARY KEY,
+	timestamp REAL NOT NULL,
+	bench TEXT,
+	title TEXT,
+	method TEXT,
+	status TEXT NOT NULL,
+	extra TEXT,
+	params TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_title ON runs (title, id);
+CREATE INDEX IF NOT EXISTS runs_title_status ON runs (title, status, id);
+CREATE INDEX IF NOT EXISTS runs_bench ON runs (bench, id);
+CREATE TABLE IF NOT EXISTS metrics (
+	name TEXT NOT NULL,
+	run INTEGER NOT NULL,
+	value REAL,
+	PRIMARY KEY (name, run)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS datasets (
+	run INTEGER NOT NULL,
+	idx INTEGER NOT NULL,
+	x TEXT,
+	y TEXT,
+	settings TEXT,
+	PRIMARY KEY (run, idx)
+) WITHOUT ROWID;
+"""
+
+RUN_COLUMNS = ['id', 'timestamp', 'bench', 'title', 'method', 'status', 'extra', 'params']
+
+class XSimStore:
+	"""
+	Persistent results history: every recorded XSimResult is
+	a row of an indexed SQLite database (title, method, status,
+	extra infos, parameter set & summary metrics),
+	its data sets are stored as sidecar .npy files
+	"""
+
+	def __init__(self, directory, bench=None):
+		self.directory = directory
+		self.bench = bench # recorded bench name
+		self.connection = None
+		os.makedirs(os.path.join(directory, XSIM_STORE_DATA), exist_ok=True)
+
+	def getDirectory(self):
+		return self.directory
+
+	def getBench(self):
+		return self.bench
+
+	def connect(self):
+		"""
+		Returns database connection, opened on first use
+		"""
+		if (self.connection is None):
+			self.connection = sqlite3.connect(os.path.join(self.directory, XSIM_STORE_DATABASE))
+			self.connection.execute('PRAGMA journal_mode=WAL')
+			self.connection.executescript(XSIM_STORE_SCHEMA)
+		return self.connection
+
+	def close(self):
+		if (self.connection is not None):
+			self.connection.close()
+			self.connection = None
+
+	def __getstate__(self):
+		# connections are not picklable (process pools)
+		state = dict(self.__dict__)
+		state['connection'] = None
+		return state
+
+	def dataFile(self, run, index, axis):
+		return os.path.join(XSIM_STORE_DATA, '{:d}_{:d}_{:s}.npy'.format(run, index, axis))
+
+	def record(self, results, params=None, timestamp=None):
+		"""
+		Records results (XSimResult or list of) of one run
+		with their parameter set {key: value}, returns run ids
+		"""
+		if isinstance(results, XSimResult):
+			results = [results]
+		if (timestamp is None):
+			timestamp = time.time()
+		params = json.dumps(params, sort_keys=True, default=str)
+
+		ids = []
+		connection = self.connect()
+		with connection:
+			for result in results:
+				cursor = connection.execute('INSERT INTO runs (timestamp, bench, title, method, status, extra, params) VALUES (?,?,?,?,?,?,?)', (timestamp, self.bench, result.getTitle(), result.getMethod(), result.getStatus(), result.getExtraString(), params))
+				run = cursor.lastrowid
+				ids.append(run)
+				connection.executemany('INSERT INTO metrics (name, run, value) VALUES (?,?,?)', [(name, run, value) for name, value in result.getMetrics().items()])
+
+				datasets = result.getDataSets() or []
+				rows = []
+				for i in range(0, len(datasets)):
+					files = []
+					for axis in range(0, 2):
+						fp = self.dataFile(run, i, 'xy'[axis])
+						np.save(os.path.join(self.directory, fp), np.asarray(datasets[i][axis]))
+						files.append(fp)
+					rows.append((run, i, files[0], files[1], json.dumps(result.getPlotSettings(i))))
+				connection.executemany('INSERT INTO datasets (run, idx, x, y, settings) VALUES (?,?,?,?,?)', rows)
+		return ids
+
+	def recordBench(self, tb, results):
+		"""
+		Records results of given XSimBench run
+		along with its current parameter set
+		"""
+		params = {}
+		for param in tb.getParams():
+			params[param.getKey()] = param.getValue()
+		return self.record(results, params=params)
+
+	def runRow(self, row):
+		run = dict(zip(RUN_COLUMNS, row))
+		run['params'] = json.loads(run['params']) if (run['params'] is not None) else None
+		return run
+
+	def getRun(self, run):
+		"""
+		Returns run as a dict (see RUN_COLUMNS) with its metrics,
+		None if it does not exist
+		"""
+		connection = self.connect()
+		row = connection.execute('SELECT {:s} FROM runs WHERE id = ?'.format(', '.join(RUN_COLUMNS)), (run,)).fetchone()
+		if (row is None):
+			return None
+		run = self.runRow(row)
+		run['metrics'] = dict(connection.execute('SELECT name, value FROM metrics WHERE run = ?', (run['id'],)).fetchall())
+		return run
+
+	def loadResult(self, run, mmap=True):
+		"""
+		Rebuilds recorded XSimResult, data sets are
+		memory mapped unless mmap is False
+		"""
+		d = self.getRun(run)
+		if (d is None):
+			return None
+		result = XSimResult(title=d['title'], method=d['method'], status=d['status'], extra=d['extra'], metrics=d['metrics'])
+		mode = 'r' if (mmap) else None
+		for [x, y, settings] in self.connect().execute('SELECT x, y, settings FROM datasets WHERE run = ? ORDER BY idx', (run,)):
+			[x, y] = [os.path.join(self.directory, x), os.path.join(self.directory, y)]
+			if (mmap):
+				persistentFile(x)
+				persistentFile(y)
+			result.addDataSet([np.load(x, mmap_mode=mode), np.load(y, mmap_mode=mode)])
+			result.addPlotSettings(json.loads(settings))
+		return result
+
+	def runs(self, title=None, status=None, bench=None, limit=None):
+		"""
+		Returns recorded runs (most recent last),
+		filtered by title, status & bench
+		"""
+		conditions = []
+		values = []
+		for [column, value] in [['title', title], ['status', status], ['bench', bench]]:
+			if (value is not None):
+				conditions.append('{:s} = ?'.format(column))
+				values.append(value)
+		query = 'SELECT {:s} FROM runs'.format(', '.join(RUN_COLUMNS))
+		if (len(conditions) > 0):
+			query += ' WHERE ' + ' AND '.join(conditions)
+		query += ' ORDER BY id'
+		if (limit is not None):
+			query = 'SELECT * FROM ({:s} DESC LIMIT {:d}) ORDER BY id'.format(query, int(limit))
+		return [self.runRow(row) for row in self.connect().execute(query, values)]
+
+	def count(self):
+		return self.connect().execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+	def trend(self, title, metric, limit=None):
+		"""
+		Returns [[run, timestamp, value], ..] of given metric
+		over the runs of given test (most recent last)
+		"""
+		query = 'SELECT runs.id, runs.timestamp, metrics.value FROM runs JOIN metrics ON metrics.run = runs.id AND metrics.name = ? WHERE runs.title = ? ORDER BY runs.id'
+		if (limit is not None):
+			query = 'SELECT * FROM ({:s} DESC LIMIT {:d}) ORDER BY id'.format(query, int(limit))
+		return [list(row) for row in self.connect().execute(query, (metric, title))]
+
+	def firstFailure(self, title):
+		"""
+		Returns the run where given test started failing:
+		first FAILED run since its last PASSED one,
+		None when its last verified run passed
+		"""
+		query = """SELECT {:s} FROM runs WHERE title = ?1 AND status = 'FAILED'
+			AND id > COALESCE((SELECT MAX(id) FROM runs WHERE title = ?1 AND status = 'PASSED'), 0)
+			ORDER BY id LIMIT 1""".format(', '.join(RUN_COLUMNS))
+		row = self.connect().execute(query, (title,)).fetchone()
+		if (row is None):
+			return None
+		return self.runRow(row)
+
+	def __str__(self):
+		return "store: {:s} | runs: {:d}\n".format(self.directory, self.count())
@@ -0,0 +1,192 @@
+#! /usr/bin/env python3
+import os
+import sys
+import csv
+import copy
+import json
+import argparse
+import itertools
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from XSimBench import *
+
+# results table bookkeeping columns,
+# reserved: overrides & metrics can't use these names
+XSIM_SWEEP_COLUMNS = ['point', 'workdir', 'changes', 'status', 'error']
+
+def grid(axes):
+	"""
+	Expands {key: [values]} into the list of all
+	{key: value} combinations
+	"""
+	keys = list(axes.keys())
+	points = []
+	for values in itertools.product(*[axes[k] for k in keys]):
+		points.append(dict(zip(keys, values)))
+	return points
+
+def runSweepPoint(args):
+	"""
+	Builds & writes one sweep point, runs in pool workers.
+	Returns the point results table row
+	"""
+	[index, descriptor, overrides, workdir, bench, package, run] = args
+	row = {'point': index, 'workdir': workdir}
+	row.update(overrides)
+
+	os.makedirs(workdir, exist_ok=True)
+	try:
+		descriptor = copy.deepcopy(descriptor)
+		index = descriptorIndex(descriptor)
+		for key, value in overrides.items():
+			applyOverride(descriptor, key, value, index=index)
+
+		with open(os.path.join(workdir, 'descriptor.json'), 'w') as fd:
+			json.dump(descriptor, fd, indent=1)
+
+		tb = bench(descriptor)
+		changes = tb.writePackage(os.path.join(workdir, package))
+		row['changes'] = ' '.join(changes)
+
+		if (run is not None):
+			metrics = run(tb, workdir)
+			if (metrics is not None):
+				for name in metrics:
+					if (name in XSIM_SWEEP_COLUMNS):
+						raise ValueError("metric '{:s}' is a reserved results table column".format(name))
+				row.update(metrics)
+		row['status'] = 'PASSED'
+
+	except Exception as e:
+		row['status'] = 'FAILED'
+		row['error'] = '{:s}: {:s}'.format(type(e).__name__, str(e))
+		with open(os.path.join(workdir, 'error.log'), 'w') as fd:
+			fd.write(traceback.format_exc())
+
+	return row
+
+class XSimSweep:
+	"""
+	Parameter sweep:
+	each point (dict of overrides, see applyOverride)
+	gets its own work directory where its package & stimuli are written,
+	optionnal run(bench, workdir) callable is then invoked
+	and may return a dict of metrics.
+	Points are spread over a pool of workers processes,
+	bench & run must therefore be importable (module level)
+	"""
+
+	def __init__(self, descriptor, points, workdir, bench=XSimBench, run=None, workers=None, package='package_tb.vhd'):
+		for i in range(0, len(points)):
+			for key in points[i]:
+				if (key in XSIM_SWEEP_COLUMNS):
+					raise ValueError("sweep point {:d}: '{:s}' is a reserved results table column, it can't be overridden".format(i, key))
+		self.descriptor = descriptor
+		self.points = points
+		self.workdir = workdir
+		self.bench = bench
+		self.runMethod = run
+		self.workers = workers
+		self.package = package
+		self.table = []
+
+	def getPoints(self):
+		return self.points
+
+	def numberOfPoints(self):
+		return len(self.points)
+
+	def pointDirectory(self, index):
+		return os.path.join(self.workdir, 'point{:05d}'.format(index))
+
+	def run(self):
+		"""
+		Runs all points, returns results table:
+		one row (dict) per point, in points order
+		"""
+		tasks = []
+		for i in range(0, self.numberOfPoints()):
+			tasks.append([i, self.descriptor, self.points[i], self.pointDirectory(i), self.bench, self.package, self.runMethod])
+
+		if (self.workers == 1):
+			self.table = [runSweepPoint(task) for task in tasks]
+		else:
+			with ProcessPoolExecutor(max_workers=self.workers) as pool:
+				self.table = list(pool.map(runSweepPoint, tasks))
+		return self.table
+
+	def getTable(self):
+		return self.table
+
+	def columns(self):
+		"""
+		Returns union of all table columns
+		"""
+		columns = []
+		for row in self.table:
+			for key in row.keys():
+				if not(key in columns):
+					columns.append(key)
+		return columns
+
+	def writeTable(self, fp):
+		"""
+		Writes results table to fp as CSV
+		"""
+		with open(fp, 'w', newline='') as fd:
+			writer = csv.DictWriter(fd, fieldnames=self.columns())
+			writer.writeheader()
+			for row in self.table:
+				writer.writerow(row)
+
+	def __str__(self):
+		columns = self.columns()
+		string = ' | '.join(columns) + '\n'
+		for row in self.table:
+			string += ' | '.join([str(row.get(c, '')) for c in columns]) + '\n'
+		return string
+
+def parseValues(string):
+	"""
+	'a,b,c' -> [a,b,c] (kept as strings, converted per entry type)
+	"""
+	return [v.strip() for v in string.split(',')]
+
+def main(argv):
+	parser = argparse.ArgumentParser(description='XSimBench parameter sweep')
+	parser.add_argument('descriptor', help='JSON test bench descriptor')
+	parser.add_argument('-o', '--workdir', default='sweep', help='sweep work directory')
+	parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes')
+	parser.add_argument('--grid', action='append', default=[], metavar='KEY=V1,V2..', help='sweep axis, may be repeated')
+	parser.add_argument('--points', default=None, help='JSON list of {key: value} overrides')
+	args = parser.parse_args(argv[1:])
+
+	with open(args.descriptor, 'r') as fd:
+		descriptor = json.load(fd)
+
+	points = []
+	if (args.points is not None):
+		with open(args.points, 'r') as fd:
+			points += json.load(fd)
+
+	if (len(args.grid) > 0):
+		axes = {}
+		for axis in args.grid:
+			[key, values] = axis.split('=', 1)
+			axes[key.strip()] = parseValues(values)
+		points += grid(axes)
+
+	if (len(points) == 0):
+		points = [{}]
+
+	sweep = XSimSweep(descriptor, points, args.workdir, workers=args.workers)
+	sweep.run()
+	sweep.writeTable(os.path.join(args.workdir, 'sweep.csv'))
+	print(sweep)
+
+	failed = [row for row in sweep.getTable() if row['status'] != 'PASSED']
+	return int(len(failed) > 0)
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv))
@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import threading
+
+class XSimTraceSink:
+	"""
+	Receives spans of an XSimTracer:
+	record() is called once per completed span with
+	{'name', 'category', 'start' [s], 'duration' [s], 'pid', 'tid', 'args'},
+	flush() at the end of every traced run (package written, results shown..)
+	"""
+
+	def record(self, span):
+		pass
+
+	def flush(self):
+		pass
+
+class XSimChromeTraceSink (XSimTraceSink):
+	"""
+	Writes spans to fp as Chrome trace events JSON,
+	to be opened with chrome://tracing or ui.perfetto.dev
+	"""
+
+	def __init__(self, fp):
+		self.fp = fp
+		self.events = []
+
+	def getFile(self):
+		return self.fp
+
+	def record(self, span):
+		self.events.append({
+			'name': span['name'],
+			'cat': span['category'],
+			'ph': 'X', # complete event
+			'ts': span['start'] * 1e6,
+			'dur': span['duration'] * 1e6,
+			'pid': span['pid'],
+			'tid': span['tid'],
+			'args': span['args'],
+		})
+
+	def flush(self):
+		with open(self.fp, 'w') as fd:
+			json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, fd, default=str)
+
+class XSimSummarySink (XSimTraceSink):
+	"""
+	Aggregates spans by name (count, total, mean & max duration),
+	printed as a table on flush: spans since the previous flush
+	"""
+
+	def __init__(self):
+		self.spans = {} # name: [count, total, max]
+
+	def record(self, span):
+		if not(span['name'] in self.spans):
+			self.spans[span['name']] = [0, 0.0, 0.0]
+		stats = self.spans[span['name']]
+		stats[0] += 1
+		stats[1] += span['duration']
+		stats[2] = max(stats[2], span['duration'])
+
+	def getSpans(self):
+		return self.spans
+
+	def table(self):
+		width = max([len(name) for name in self.spans] + [4])
+		string = "{:<{w}s} {:>8s} {:>12s} {:>12s} {:>12s}\n".format('span', 'count', 'total [ms]', 'mean [ms]', 'max [ms]', w=width)
+		for name, [count, total, longest] in self.spans.items():
+			string += "{:<{w}s} {:>8d} {:>12.3f} {:>12.3f} {:>12.3f}\n".format(name, count, total*1e3, total/count*1e3, longest*1e3, w=width)
+		return string
+
+	def flush(self):
+		if (len(self.spans) > 0):
+			print(self.table(), end='')
+		self.spans = {}
+
+class XSimSpan:
+	"""
+	Timed span, recorded by its tracer on exit
+	"""
+
+	__slots__ = ['tracer', 'name', 'category', 'args', 'start']
+
+	def __init__(self, tracer, name, category, args):
+		self.tracer = tracer
+		self.name = name
+		self.category = category
+		self.args = args
+		self.start = None
+
+	def __enter__(self):
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, *exc):
+		self.tracer.record(self.name, self.start, category=self.category, **self.args)
+		return False
+
+class XSimNullSpan:
+	"""
+	Span of a disabled tracer: does nothing
+	"""
+
+	__slots__ = []
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		return False
+
+XSIM_NULL_SPAN = XSimNullSpan()
+
+class XSimTracer:
+	"""
+	Emits timed spans to its sinks (XSimTraceSink):
+		with tracer.span('package'):
+			..
+	Disabled (span() returns a shared no-op span)
+	as long as no sink is attached
+	"""
+
+	def __init__(self, sinks=None):
+		self.sinks = []
+		self.origin = time.perf_counter() # spans start relative to it
+		for sink in (sinks or []):
+			self.addSink(sink)
+
+	def addSink(self, sink):
+		self.sinks.append(sink)
+
+	def removeSink(self, sink):
+		self.sinks.remove(sink)
+
+	def getSinks(self):
+		return self.sinks
+
+	def isEnabled(self):
+		return (len(self.sinks) > 0)
+
+	def span(self, name, category='xsim', **args):
+		"""
+		Returns context manager timing its block as span name
+		"""
+		if not(self.sinks):
+			return XSIM_NULL_SPAN
+		return XSimSpan(self, name, category, args)
+
+	def record(self, name, start, end=None, category='xsim', **args):
+		"""
+		Records span name from start to end (now when None),
+		time.perf_counter() values
+		"""
+		if not(self.sinks):
+			return
+		if (end is None):
+			end = time.perf_counter()
+		span = {
+			'name': name,
+			'category': category,
+			'start': start - self.origin,
+			'duration': end - start,
+			'pid': os.getpid(),
+			'tid': threading.get_ident(),
+			'args': args,
+		}
+		for sink in self.sinks:
+			sink.record(span)
+
+	def flush(self):
+		for sink in self.sinks:
+			sink.flush()
+
+	def __getstate__(self):
+		# pool workers do not trace
+		state = dict(self.__dict__)
+		state['sinks'] = []
+		return state
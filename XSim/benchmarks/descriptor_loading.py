@@ -0,0 +1,61 @@
+#! /usr/bin/env python3
+#########################################################
+# descriptor_loading.py
+# XSimBench construction, key lookups & modify() on
+# descriptors of growing numbers of parameters:
+# time per parameter should stay flat
+#########################################################
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimBench import *
+
+SIZES = [1000, 4000, 16000]
+
+PTYPES = [
+	['float', 1.0],
+	['integer', 1],
+	['bool', 1],
+	['string', 'x'],
+	['fixed_point', 's2.14'],
+	['time', 10.0],
+]
+
+def descriptor(n):
+	d = [{'type': 'attribute', 'language': 'vhdl'}]
+	d.append({'type': 'parameter', 'ptype': 'float', 'key': 'sample_rate', 'value': 100e6})
+	for i in range(0, n):
+		[ptype, value] = PTYPES[i % len(PTYPES)]
+		d.append({'type': 'parameter', 'ptype': ptype, 'key': 'p{:d}'.format(i), 'value': value, 'help': 'p', 'unit': 'ns'})
+	return d
+
+def main(argv):
+	sizes = SIZES
+	if (len(argv) > 1):
+		sizes = [int(float(argv[1]))]
+
+	print("{:>8s} {:>10s} {:>12s} {:>12s} {:>12s}".format('params', 'load [s]', 'load [us/p]', 'search [us]', 'modify [us]'))
+	for n in sizes:
+		d = descriptor(n)
+		start = time.perf_counter()
+		tb = XSimBench(d)
+		load = time.perf_counter() - start
+
+		keys = ['p{:d}'.format(i) for i in range(0, n, 6)] # float parameters
+		start = time.perf_counter()
+		for key in keys:
+			tb.searchParamsByKey(key)
+		search = (time.perf_counter() - start) / len(keys)
+
+		start = time.perf_counter()
+		for key in keys:
+			tb.modify(key, '2.0')
+		modify = (time.perf_counter() - start) / len(keys)
+		print("{:>8d} {:>10.3f} {:>12.1f} {:>12.2f} {:>12.2f}".format(n, load, load/n*1e6, search*1e6, modify*1e6))
+
+if __name__ == "__main__":
+	main(sys.argv)
@@ -0,0 +1,75 @@
+#! /usr/bin/env python3
+#########################################################
+# import_time.py
+# measures 'import XSimBench' in fresh interpreters
+# (numpy alone as reference) and fails when GUI or
+# process pool modules get loaded at import time,
+# or when the import overhead exceeds a budget:
+#	import_time.py [runs] [budget ms]
+#########################################################
+
+import os
+import sys
+import json
+import subprocess
+
+XSIM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+RUNS = 10
+
+# XSimBench import time on top of numpy [ms]
+BUDGET = 100
+
+# must only be loaded when first used
+FORBIDDEN = ['PyQt5', 'pyqtgraph', 'scipy', 'matplotlib', 'multiprocessing']
+
+CHILD = """
+import sys, time, json
+start = time.perf_counter()
+import {:s}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, sorted(set([m.split('.')[0] for m in sys.modules]))]))
+"""
+
+def importTime(module):
+	"""
+	Returns [seconds, top level modules] of importing module
+	in a fresh interpreter
+	"""
+	output = subprocess.check_output([sys.executable, '-c', CHILD.format(module)], cwd=XSIM_DIR)
+	return json.loads(output.decode('utf-8').splitlines()[-1])
+
+def median(values):
+	values = sorted(values)
+	return values[len(values)//2]
+
+def main(argv):
+	runs = RUNS
+	budget = BUDGET
+	if (len(argv) > 1):
+		runs = int(argv[1])
+	if (len(argv) > 2):
+		budget = float(argv[2])
+
+	numpy = median([importTime('numpy')[0] for i in range(0, runs)]) * 1e3
+	times = []
+	for i in range(0, runs):
+		[elapsed, modules] = importTime('XSimBench')
+		times.append(elapsed)
+	bench = median(times) * 1e3
+	loaded = [m for m in FORBIDDEN if m in modules]
+
+	print("{:>12s} {:>12s} {:>12s}".format('numpy [ms]', 'XSim [ms]', 'overhead'))
+	print("{:>12.1f} {:>12.1f} {:>12.1f}".format(numpy, bench, bench - numpy))
+
+	status = 0
+	if (len(loaded) > 0):
+		print("FAILED: {:s} loaded by 'import XSimBench'".format(', '.join(loaded)))
+		status = 1
+	if (bench - numpy > budget):
+		print("FAILED: import overhead exceeds {:g} ms budget".format(budget))
+		status = 1
+	return status
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv))
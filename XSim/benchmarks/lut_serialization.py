@@ -0,0 +1,69 @@
+#! /usr/bin/env python3
+#########################################################
+# lut_serialization.py
+# measures LUT serialization throughput [symbols/s]
+# of writeVHDLPackage formatter, from 1e4 to 1e8 symbols
+#########################################################
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimStimulus import *
+from XSimFormat import *
+
+SIZES = [10**4, 10**5, 10**6, 10**7, 10**8]
+
+# legacy formatter is only run up to this size
+LEGACY_MAX_SIZE = 10**6
+
+def legacy(fd, symbols):
+	"""
+	Former per symbol string building
+	"""
+	string = ''
+	for j in range(0, len(symbols)-1):
+		string += '{:.6e},'.format(symbols[j])
+	string += '{:.6e}'.format(symbols[-1])
+	fd.write(string)
+
+def bench(N, blocksize=XSIM_BLOCK_SIZE):
+	"""
+	Returns [legacy, bulk] throughputs [symbols/s] for N symbols,
+	legacy is None when skipped
+	"""
+	stim = XSimSineWaveStimulus('bench', 1.0, 1e6, N, sample_rate=100E6)
+	results = [None, None]
+
+	with open(os.devnull, 'w', buffering=XSIM_WRITE_BUFFER) as fd:
+		if (N <= LEGACY_MAX_SIZE):
+			stim._generate()
+			start = time.perf_counter()
+			legacy(fd, stim.getSymbols())
+			results[0] = N / (time.perf_counter() - start)
+			stim.clearSymbols()
+
+		# streamed generation + bulk formatting
+		start = time.perf_counter()
+		writeReals(fd, stim.iterBlocks(blocksize))
+		results[1] = N / (time.perf_counter() - start)
+
+	return results
+
+def main(argv):
+	sizes = SIZES
+	if (len(argv) > 1):
+		sizes = [int(float(v)) for v in argv[1:]]
+
+	print("{:>12s} {:>16s} {:>16s} {:>8s}".format('symbols', 'legacy [sym/s]', 'bulk [sym/s]', 'speedup'))
+	for N in sizes:
+		[old, new] = bench(N)
+		if old is None:
+			print("{:>12d} {:>16s} {:>16.3e} {:>8s}".format(N, '-', new, '-'))
+		else:
+			print("{:>12d} {:>16.3e} {:>16.3e} {:>8.1f}".format(N, old, new, new/old))
+
+if __name__ == "__main__":
+	main(sys.argv)
@@ -0,0 +1,67 @@
+#! /usr/bin/env python3
+#########################################################
+# output_parsing.py
+# compares np.loadtxt to XSimOutputReader on simulation
+# output files (decimal reals, integers, hwrite words),
+# all columns and a single column. Decimal files are
+# converted by np.loadtxt itself (expect ~1x), the
+# speedup comes from hwrite words
+#########################################################
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimReader import *
+
+LINES = 10**6
+COLUMNS = 4
+
+def hexWord(s):
+	return int(s, 16)
+
+# [name, savetxt format, reader format, loadtxt options]
+FILES = [
+	['real', '%.6e', 'decimal', {}],
+	['real (fixed width)', '%14.6e', 'decimal', {}],
+	['integer', '%d', 'decimal', {'dtype': np.int64}],
+	['hwrite', '%08X', 'hex', {'dtype': np.int64, 'converters': hexWord}],
+]
+
+def timed(method, *args, **kwargs):
+	start = time.perf_counter()
+	method(*args, **kwargs)
+	return time.perf_counter() - start
+
+def main(argv):
+	lines = LINES
+	if (len(argv) > 1):
+		lines = int(float(argv[1]))
+
+	x = np.random.default_rng(0).standard_normal((lines, COLUMNS))
+	words = (x * 2**20).astype(np.int64) & 0xffffffff
+
+	print("{:>20s} {:>8s} {:>12s} {:>12s} {:>8s} {:>12s} {:>8s}".format('file', 'MB', 'loadtxt [s]', 'reader [s]', 'speedup', '1 col. [s]', 'speedup'))
+	with tempfile.TemporaryDirectory() as directory:
+		for [name, fmt, rfmt, options] in FILES:
+			fp = os.path.join(directory, 'output.txt')
+			if (rfmt == 'hex'):
+				np.savetxt(fp, words, fmt=fmt)
+			elif ('dtype' in options):
+				np.savetxt(fp, (x * 1000).astype(np.int64), fmt=fmt)
+			else:
+				np.savetxt(fp, x, fmt=fmt)
+
+			dtype = options.get('dtype')
+			ref = timed(np.loadtxt, fp, **options)
+			full = timed(readOutput, fp, fmt=rfmt, dtype=dtype)
+			col = timed(readOutput, fp, fmt=rfmt, dtype=dtype, columns=[1])
+			size = os.path.getsize(fp) / 1e6
+			print("{:>20s} {:>8.1f} {:>12.3f} {:>12.3f} {:>8.1f} {:>12.3f} {:>8.1f}".format(name, size, ref, full, ref/full, col, ref/col))
+
+if __name__ == "__main__":
+	main(sys.argv)
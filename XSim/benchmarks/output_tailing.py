@@ -0,0 +1,61 @@
+#! /usr/bin/env python3
+#########################################################
+# output_tailing.py
+# cost of following a growing simulation output file:
+# XSimOutputTail parsing appended lines only versus
+# re-reading the whole file at every refresh:
+#	output_tailing.py [refreshes] [lines per refresh]
+#########################################################
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimReader import *
+
+REFRESHES = 100
+LINES = 20000
+
+def main(argv):
+	refreshes = REFRESHES
+	lines = LINES
+	if (len(argv) > 1):
+		refreshes = int(argv[1])
+	if (len(argv) > 2):
+		lines = int(float(argv[2]))
+
+	rng = np.random.default_rng(0)
+	with tempfile.TemporaryDirectory() as directory:
+		fp = os.path.join(directory, 'output.txt')
+		open(fp, 'w').close()
+		reader = XSimOutputReader(fp, columns=[0, 2])
+		tail = XSimOutputTail(reader)
+
+		tailing = 0.0
+		rereading = 0.0
+		for k in range(0, refreshes):
+			block = rng.integers(-2**15, 2**15, size=(lines, 3))
+			with open(fp, 'a') as fd:
+				np.savetxt(fd, block, fmt='%d')
+
+			start = time.perf_counter()
+			tail.poll()
+			last = [time.perf_counter() - start]
+			tailing += last[0]
+
+			start = time.perf_counter()
+			reader.read()
+			last.append(time.perf_counter() - start)
+			rereading += last[1]
+
+		print("{:d} refreshes, {:d} lines each: {:.1f} MB".format(refreshes, lines, os.path.getsize(fp)/1e6))
+		print("{:>12s} {:>12s} {:>18s}".format('', 'total [s]', 'last refresh [ms]'))
+		print("{:>12s} {:>12.2f} {:>18.2f}".format('re-read', rereading, last[1]*1e3))
+		print("{:>12s} {:>12.2f} {:>18.2f}".format('tail', tailing, last[0]*1e3))
+
+if __name__ == "__main__":
+	main(sys.argv)
@@ -0,0 +1,67 @@
+#! /usr/bin/env python3
+#########################################################
+# param_memory.py
+# memory per XSimParam instance (tracemalloc), slotted
+# classes against the same classes with a __dict__,
+# and per parameter set of a sweep expanded in memory
+#########################################################
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimParam import *
+
+INSTANCES = 100000
+
+# [class, constructor arguments]
+PARAMS = [
+	[XSimFloatParam, ['gain', 1.5]],
+	[XSimIntParam, ['width', 16]],
+	[XSimBoolParam, ['enable', 1]],
+	[XSimStringParam, ['name', 'x']],
+	[XSimFixedPointParam, ['data_fmt', 's2.14']],
+	[XSimTimeParam, ['tclk', 10.0]],
+]
+
+def unslotted(cls):
+	"""
+	Returns a subclass of cls with a per instance __dict__
+	(parameters as they were before __slots__)
+	"""
+	return type(cls.__name__ + 'Dict', (cls,), {})
+
+def perInstance(cls, args, n):
+	"""
+	Returns allocated bytes per instance of cls(*args)
+	"""
+	tracemalloc.start()
+	before = tracemalloc.get_traced_memory()[0]
+	instances = [cls(*args) for i in range(0, n)]
+	after = tracemalloc.get_traced_memory()[0]
+	tracemalloc.stop()
+	return (after - before) / n
+
+def main(argv):
+	n = INSTANCES
+	if (len(argv) > 1):
+		n = int(float(argv[1]))
+
+	slotted = 0
+	plain = 0
+	print("{:>22s} {:>12s} {:>12s} {:>8s}".format('class', '__dict__ [B]', 'slots [B]', 'ratio'))
+	for [cls, args] in PARAMS:
+		a = perInstance(unslotted(cls), args, n)
+		b = perInstance(cls, args, n)
+		plain += a
+		slotted += b
+		print("{:>22s} {:>12.0f} {:>12.0f} {:>8.2f}".format(cls.__name__, a, b, a/b))
+
+	# one of each parameter type per sweep point
+	print("{:>22s} {:>12.0f} {:>12.0f} {:>8.2f}".format('parameter set', plain, slotted, plain/slotted))
+	print("{:d} sweep points: {:.1f} MB -> {:.1f} MB".format(n, plain*n/1e6, slotted*n/1e6))
+
+if __name__ == "__main__":
+	main(sys.argv)
@@ -0,0 +1,53 @@
+#! /usr/bin/env python3
+#########################################################
+# plot_decimation.py
+# XSimEnvelope pyramid build time & memory, then
+# decimation time & plotted points for full views
+# and zooms of large data sets
+#########################################################
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimDecimate import *
+
+SIZES = [10**5, 10**6, 10**7]
+PIXELS = 1000
+REPEAT = 20
+
+def main(argv):
+	sizes = SIZES
+	if (len(argv) > 1):
+		sizes = [int(float(argv[1]))]
+
+	rng = np.random.default_rng(0)
+	print("{:>10s} {:>10s} {:>10s} {:>12s} {:>10s} {:>12s} {:>10s}".format('points', 'build [s]', 'pyr. [MB]', 'full [ms]', 'points', 'zoom [ms]', 'points'))
+	for n in sizes:
+		x = np.arange(n) * 1e-9
+		y = np.sin(np.arange(n) / 1e3) + 0.1 * rng.standard_normal(n)
+
+		start = time.perf_counter()
+		envelope = XSimEnvelope(x, y)
+		build = time.perf_counter() - start
+
+		start = time.perf_counter()
+		for k in range(0, REPEAT):
+			[xs, ys] = envelope.decimate(npoints=PIXELS)
+		full = (time.perf_counter() - start) / REPEAT * 1e3
+		nfull = len(xs)
+
+		# 1 % wide view in the middle
+		x0 = x[n//2]
+		x1 = x[n//2 + n//100]
+		start = time.perf_counter()
+		for k in range(0, REPEAT):
+			[xs, ys] = envelope.decimate(x0, x1, npoints=PIXELS)
+		zoom = (time.perf_counter() - start) / REPEAT * 1e3
+		print("{:>10d} {:>10.3f} {:>10.1f} {:>12.3f} {:>10d} {:>12.3f} {:>10d}".format(n, build, envelope.nbytes()/1e6, full, nfull, zoom, len(xs)))
+
+if __name__ == "__main__":
+	main(sys.argv)
@@ -0,0 +1,63 @@
+#! /usr/bin/env python3
+#########################################################
+# result_store.py
+# fills an XSimStore with many runs (a few tests with
+# metrics, a failing streak at the end) and times
+# record, trend & first failing run queries:
+#	result_store.py [runs]
+#########################################################
+
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimStore import *
+
+RUNS = 20000
+TESTS = 10
+BATCH = 100 # results recorded per transaction
+REPEAT = 100
+
+def main(argv):
+	runs = RUNS
+	if (len(argv) > 1):
+		runs = int(float(argv[1]))
+
+	rng = np.random.default_rng(0)
+	with tempfile.TemporaryDirectory() as directory:
+		store = XSimStore(directory, bench='fir')
+
+		start = time.perf_counter()
+		for i in range(0, runs, BATCH):
+			results = []
+			for k in range(i, min(i + BATCH, runs)):
+				title = 'Test {:d}'.format(k % TESTS)
+				status = 'FAILED' if (k > runs*0.9) and (k % TESTS == 3) else 'PASSED'
+				results.append(XSimResult(title=title, method='fft', status=status, metrics={'snr': 60 + rng.standard_normal(), 'errors': k % 7}))
+			store.record(results, params={'width': 16, 'gain': 1.5})
+		record = time.perf_counter() - start
+
+		queries = [
+			['trend (all)', lambda: store.trend('Test 3', 'snr')],
+			['trend (last 100)', lambda: store.trend('Test 3', 'snr', limit=100)],
+			['first failure', lambda: store.firstFailure('Test 3')],
+			['first failure (none)', lambda: store.firstFailure('Test 4')],
+			['last 10 runs', lambda: store.runs(title='Test 3', limit=10)],
+		]
+		print("{:d} runs recorded in {:.2f} s ({:.0f} us/run)".format(store.count(), record, record/runs*1e6))
+		print("{:>22s} {:>10s} {:>8s}".format('query', 'ms', 'rows'))
+		for [name, query] in queries:
+			start = time.perf_counter()
+			for k in range(0, REPEAT):
+				rows = query()
+			elapsed = (time.perf_counter() - start) / REPEAT
+			count = 0 if (rows is None) else (1 if (type(rows) == dict) else len(rows))
+			print("{:>22s} {:>10.3f} {:>8d}".format(name, elapsed*1e3, count))
+		store.close()
+
+if __name__ == "__main__":
+	main(sys.argv)
@@ -0,0 +1,75 @@
+#! /usr/bin/env python3
+#########################################################
+# result_transfer.py
+# cost of passing a many channels XSimResult to a
+# process pool worker, data sets held in memory or
+# memory mapped from a binary capture / saved .npz:
+#	result_transfer.py [channels] [samples]
+#########################################################
+
+import os
+import sys
+import time
+import pickle
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimResult import *
+from XSimReader import *
+
+CHANNELS = 256
+SAMPLES = 100000
+REPEAT = 5
+
+def checksum(result):
+	return sum([float(xy[1][-1]) for xy in (result.getDataSets() or [])])
+
+def timed(pool, result):
+	start = time.perf_counter()
+	for i in range(0, REPEAT):
+		pool.submit(checksum, result).result()
+	return (time.perf_counter() - start) / REPEAT
+
+def main(argv):
+	channels = CHANNELS
+	samples = SAMPLES
+	if (len(argv) > 1):
+		channels = int(argv[1])
+	if (len(argv) > 2):
+		samples = int(float(argv[2]))
+
+	with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(max_workers=1) as pool:
+		capture = os.path.join(directory, 'capture.bin')
+		np.random.default_rng(0).integers(-2**15, 2**15, size=(samples, channels), dtype='<i4').tofile(capture)
+		columns = list(range(0, channels))
+
+		results = {}
+		result = XSimResult(title='memory')
+		result.addDataSets(None, np.stack(readOutput(capture, fmt='binary', ncolumns=channels, columns=columns)))
+		results['in memory'] = result
+
+		result = XSimResult(title='capture')
+		for y in readOutput(capture, fmt='binary', ncolumns=channels, columns=columns, mmap=True):
+			result.addDataSet([None, y])
+		results['capture views'] = result
+
+		start = time.perf_counter()
+		results['in memory'].save(os.path.join(directory, 'result.npz'))
+		save = time.perf_counter() - start
+		start = time.perf_counter()
+		results['.npz views'] = readResult(os.path.join(directory, 'result.npz'))
+		load = time.perf_counter() - start
+		print("{:d} channels x {:d} samples: {:.1f} MB".format(channels, samples, results['in memory'].nbytes()/1e6))
+		print(".npz save {:.1f} ms, memory mapped load {:.1f} ms".format(save*1e3, load*1e3))
+
+		pool.submit(checksum, XSimResult()).result() # worker start up
+		print("{:>16s} {:>12s} {:>12s}".format('data sets', 'pickle [kB]', 'submit [ms]'))
+		for name, result in results.items():
+			size = len(pickle.dumps(result))
+			print("{:>16s} {:>12.1f} {:>12.2f}".format(name, size/1e3, timed(pool, result)*1e3))
+
+if __name__ == "__main__":
+	main(sys.argv)
@@ -0,0 +1,56 @@
+#! /usr/bin/env python3
+#########################################################
+# runner_concurrency.py
+# wall clock time of XSimRunner over many fake
+# simulator jobs (tools/fakesim.py, FAKESIM_DELAY per
+# step) for growing concurrency limits:
+#	runner_concurrency.py [jobs] [delay s]
+#########################################################
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimRunner import *
+
+JOBS = 48
+DELAY = 0.5
+WORKERS = [1, 4, 16, 48]
+
+def main(argv):
+	njobs = JOBS
+	delay = DELAY
+	if (len(argv) > 1):
+		njobs = int(argv[1])
+	if (len(argv) > 2):
+		delay = float(argv[2])
+
+	print("{:>8s} {:>10s} {:>12s} {:>10s}".format('workers', 'wall [s]', 'jobs / s', 'speedup'))
+	serial = None
+	with tempfile.TemporaryDirectory() as directory:
+		for workers in [w for w in WORKERS if (w <= njobs)]:
+			jobs = []
+			for i in range(0, njobs):
+				workdir = os.path.join(directory, 'w{:d}'.format(workers), 'tb{:03d}'.format(i))
+				os.makedirs(workdir)
+				with open(os.path.join(workdir, 'tb.vhd'), 'w') as fd:
+					fd.write('--\n')
+				jobs.append(XSimJob('tb{:03d}'.format(i), workdir, ['tb.vhd'], 'tb', env={'FAKESIM_DELAY': str(delay)}))
+
+			runner = XSimRunner(workers=workers, tools=fakeTools())
+			start = time.perf_counter()
+			runner.run(jobs)
+			elapsed = time.perf_counter() - start
+			if (runner.exitCode() != 0):
+				print(runner)
+				return 1
+			if (serial is None):
+				serial = elapsed
+			print("{:>8d} {:>10.2f} {:>12.1f} {:>10.1f}".format(workers, elapsed, njobs/elapsed, serial/elapsed))
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv))
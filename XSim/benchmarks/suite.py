@@ -0,0 +1,216 @@
+#! /usr/bin/env python3
+#########################################################
+# suite.py
+# XSim generation pipeline benchmark suite: synthetic
+# descriptors scaled in number of parameters, stimuli
+# & symbols, wall time & peak memory of every phase:
+#	build: XSimBench construction
+#	stimuli: stimuli generation (XSimStimulusEngine)
+#	declare: XSimParam.declare of all parameters
+#	package-lut: VHDL package, stimuli as LUTs
+#	package-binary: VHDL package & binary stimulus files
+# baselines are saved to / compared against JSON files:
+#	suite.py [--scale small] [--save baseline.json]
+#	suite.py --compare baseline.json [--threshold 0.25]
+# exits with 1 when a phase regressed beyond threshold
+#########################################################
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import contextlib
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimBench import *
+
+# scale: [parameters, stimuli, symbols per stimulus]
+SCALES = {
+	'small': [100, 4, 1000],
+	'medium': [1000, 16, 20000],
+	'large': [10000, 64, 100000],
+}
+
+PHASES = ['build', 'stimuli', 'declare', 'package-lut', 'package-binary']
+
+REPEAT = 5 # median time of
+
+# relative slow down / memory growth tolerated by --compare
+THRESHOLD = 0.25
+
+# absolute slow down [s] tolerated on top of threshold
+# (timer & scheduling noise of short phases)
+TIME_SLACK = 10e-3
+
+# phases allocating less [bytes] are not compared (allocator noise)
+MIN_PEAK = 1 << 20
+
+PTYPES = [
+	['float', 1.0],
+	['integer', 1],
+	['bool', 1],
+	['string', 'x'],
+	['fixed_point', 's2.14'],
+	['time', 10.0],
+]
+
+STYPES = [
+	{'stype': 'sinewave', 'amplitude': 0.9, 'frequency': 1e6},
+	{'stype': 'ramp', 'amplitude': 1.0, 'n-periods': 3},
+	{'stype': 'squarewave', 'amplitude': 0.5, 'n-periods': 4},
+	{'stype': 'sinewave', 'amplitude': 0.9, 'frequency': 3e6, 'quantize': {'param': 'data_fmt'}},
+]
+
+def descriptor(nparams, nstimuli, nsymbols):
+	d = [{'type': 'attribute', 'language': 'vhdl', 'seed': 0, 'workers': 1}]
+	d.append({'type': 'parameter', 'ptype': 'float', 'key': 'sample_rate', 'value': 100e6})
+	d.append({'type': 'parameter', 'ptype': 'fixed_point', 'key': 'data_fmt', 'value': 's2.14'})
+	for i in range(0, nparams):
+		[ptype, value] = PTYPES[i % len(PTYPES)]
+		d.append({'type': 'parameter', 'ptype': ptype, 'key': 'p{:d}'.format(i), 'value': value, 'help': 'p', 'unit': 'ns'})
+	for i in range(0, nstimuli):
+		stim = dict(STYPES[i % len(STYPES)])
+		stim.update({'type': 'stimulus', 'key': 's{:d}'.format(i), 'n-symbols': nsymbols})
+		d.append(stim)
+	return d
+
+def phases(d, directory):
+	"""
+	Yields [phase, callable] in pipeline order,
+	each phase relying on the previous ones
+	"""
+	state = {}
+	def build():
+		state['tb'] = XSimBench(d)
+	def stimuli():
+		tb = state['tb']
+		tb.seedStimuli()
+		XSimStimulusEngine(tb.getStimuli(), workers=tb.getWorkers()).run()
+	def declare():
+		fd = io.StringIO()
+		for param in state['tb'].getParams():
+			param.declare(fd)
+	def package(mode):
+		tb = state['tb']
+		tb.setStimulusMode(mode)
+		fp = os.path.join(directory, 'package_tb_{:s}.vhd'.format(mode))
+		if (os.path.exists(fp)):
+			os.remove(fp) # written from scratch every time
+		tb.writeVHDLPackage(fp)
+	return [
+		['build', build],
+		['stimuli', stimuli],
+		['declare', declare],
+		['package-lut', lambda: package('lut')],
+		['package-binary', lambda: package('binary')],
+	]
+
+def measure(d, repeat):
+	"""
+	Returns {phase: {'time': median wall time [s], 'peak': peak allocated bytes}}.
+	Times and peaks come from distinct passes (tracemalloc slows allocations down)
+	"""
+	measures = {phase: {'time': None, 'peak': None} for phase in PHASES}
+	times = {phase: [] for phase in PHASES}
+	with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+		for k in range(0, repeat):
+			for [phase, run] in phases(d, directory):
+				start = time.perf_counter()
+				run()
+				times[phase].append(time.perf_counter() - start)
+		for phase in PHASES:
+			measures[phase]['time'] = float(np.median(times[phase]))
+
+		tracemalloc.start()
+		for [phase, run] in phases(d, directory):
+			tracemalloc.reset_peak()
+			[current, peak] = tracemalloc.get_traced_memory()
+			run()
+			measures[phase]['peak'] = tracemalloc.get_traced_memory()[1] - current
+		tracemalloc.stop()
+	return measures
+
+def environment():
+	return {
+		'python': platform.python_version(),
+		'numpy': np.__version__,
+		'machine': platform.machine(),
+		'cpus': os.cpu_count(),
+	}
+
+def compare(results, baseline, threshold):
+	"""
+	Returns regressions [scale, phase, metric, baseline, measured]
+	of results against baseline
+	"""
+	regressions = []
+	for scale, measures in results.items():
+		for phase, measure in measures.items():
+			reference = baseline.get('scales', {}).get(scale, {}).get(phase)
+			if (reference is None):
+				continue
+			if (measure['time'] > reference['time'] * (1 + threshold) + TIME_SLACK):
+				regressions.append([scale, phase, 'time', reference['time'], measure['time']])
+			if (reference['peak'] >= MIN_PEAK) and (measure['peak'] > reference['peak'] * (1 + threshold)):
+				regressions.append([scale, phase, 'peak', reference['peak'], measure['peak']])
+	return regressions
+
+def main(argv):
+	parser = argparse.ArgumentParser(description='XSim generation pipeline benchmark suite')
+	parser.add_argument('--scale', action='append', choices=list(SCALES.keys()), help='descriptor scale, may be repeated (default: all)')
+	parser.add_argument('--repeat', type=int, default=REPEAT, help='timed passes, median time is kept')
+	parser.add_argument('--save', default=None, help='saves measures to this JSON baseline')
+	parser.add_argument('--compare', default=None, help='JSON baseline to compare measures against')
+	parser.add_argument('--threshold', type=float, default=THRESHOLD, help='tolerated relative regression')
+	args = parser.parse_args(argv[1:])
+
+	scales = args.scale
+	if (scales is None):
+		scales = list(SCALES.keys())
+
+	baseline = None
+	if (args.compare is not None):
+		with open(args.compare, 'r') as fd:
+			baseline = json.load(fd)
+
+	results = {}
+	print("{:>8s} {:>16s} {:>10s} {:>12s} {:>10s}".format('scale', 'phase', 'time [ms]', 'peak [MB]', 'vs base'))
+	for scale in scales:
+		[nparams, nstimuli, nsymbols] = SCALES[scale]
+		results[scale] = measure(descriptor(nparams, nstimuli, nsymbols), args.repeat)
+		for phase in PHASES:
+			values = results[scale][phase]
+			ratio = ''
+			if (baseline is not None):
+				reference = baseline.get('scales', {}).get(scale, {}).get(phase)
+				if (reference is not None) and (reference['time'] > 0):
+					ratio = "{:.2f}x".format(values['time'] / reference['time'])
+			print("{:>8s} {:>16s} {:>10.2f} {:>12.2f} {:>10s}".format(scale, phase, values['time']*1e3, values['peak']/1e6, ratio))
+
+	if (args.save is not None):
+		with open(args.save, 'w') as fd:
+			json.dump({'environment': environment(), 'threshold': args.threshold, 'scales': results}, fd, indent=2)
+		print("baseline saved to {:s}".format(args.save))
+
+	if (baseline is None):
+		return 0
+
+	if (baseline.get('environment') != environment()):
+		print("warning: baseline was measured in another environment: {}".format(baseline.get('environment')))
+
+	regressions = compare(results, baseline, args.threshold)
+	for [scale, phase, metric, reference, measured] in regressions:
+		print("REGRESSION {:s}/{:s} {:s}: {:g} -> {:g} (+{:.0f}%)".format(scale, phase, metric, reference, measured, (measured/reference - 1)*100))
+	if (len(regressions) == 0):
+		print("no regression beyond {:.0f}%".format(args.threshold*100))
+	return int(len(regressions) > 0)
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv))
@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+#########################################################
+# trace_overhead.py
+# cost of XSimTracer spans, disabled (no sink) and
+# enabled (summary & Chrome trace sinks), per span and
+# over a whole writePackage of many small stimuli
+#########################################################
+
+import os
+import io
+import sys
+import time
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimBench import *
+
+SPANS = 200000
+STIMULI = 500
+REPEAT = 5
+
+def perSpan(tracer, n):
+	start = time.perf_counter()
+	for i in range(0, n):
+		with tracer.span('span', key=i):
+			pass
+	return (time.perf_counter() - start) / n
+
+def descriptor(nstimuli):
+	d = [{'type': 'attribute', 'language': 'vhdl', 'stimulus-mode': 'binary'}]
+	d.append({'type': 'parameter', 'ptype': 'float', 'key': 'sample_rate', 'value': 100e6})
+	for i in range(0, nstimuli):
+		d.append({'type': 'stimulus', 'stype': 'sinewave', 'key': 's{:d}'.format(i), 'amplitude': 0.9, 'frequency': 1e6, 'n-symbols': 64})
+	return d
+
+def packageTime(tracer):
+	"""
+	Returns best writePackage time [s] of a bench traced by tracer
+	"""
+	best = None
+	with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+		tb = XSimBench(descriptor(STIMULI), tracer=tracer)
+		for k in range(0, REPEAT):
+			fp = os.path.join(directory, 'package_tb{:d}.vhd'.format(k))
+			start = time.perf_counter()
+			tb.writePackage(fp)
+			elapsed = time.perf_counter() - start
+			if (best is None) or (elapsed < best):
+				best = elapsed
+	return best
+
+def main(argv):
+	with tempfile.TemporaryDirectory() as directory:
+		tracers = [
+			['disabled', lambda: XSimTracer()],
+			['summary', lambda: XSimTracer([XSimSummarySink()])],
+			['chrome', lambda: XSimTracer([XSimChromeTraceSink(os.path.join(directory, 'trace.json'))])],
+		]
+		print("{:>10s} {:>12s} {:>14s}".format('tracer', 'span [us]', 'package [ms]'))
+		for [name, tracer] in tracers:
+			print("{:>10s} {:>12.3f} {:>14.2f}".format(name, perSpan(tracer(), SPANS)*1e6, packageTime(tracer())*1e3))
+
+if __name__ == "__main__":
+	main(sys.argv)
@@ -0,0 +1,71 @@
+#########################################################
+# test_process_results.py
+# results of 'process' analysis executors must outlive
+# the shared mappings of their data sets:
+#	python -m pytest XSim/tests
+#########################################################
+
+import os
+import sys
+import pickle
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from XSimBench import *
+
+DESCRIPTOR = [
+	{'type': 'attribute', 'language': 'vhdl'},
+	{'type': 'parameter', 'ptype': 'float', 'key': 'sample_rate', 'value': 100e6},
+]
+
+def analysis(tb, index, data):
+	# returns a view of its (shared) data set
+	result = XSimResult(title='Test {:d}'.format(index), status='PASSED')
+	result.addDataSet([None, data[0][::2]])
+	return result
+
+def failing(tb, index, data):
+	result = analysis(tb, index, data)
+	if (index == 1):
+		result.setStatus('FAILED')
+	return result
+
+def dataSets():
+	# large enough to be shared with workers
+	return [[np.arange(XSIM_SHARED_MIN_SIZE // 4, dtype=np.float64) + i] for i in range(0, 3)]
+
+def processBench():
+	tb = XSimBench(DESCRIPTOR)
+	tb._customAnalysisMethod = analysis
+	tb._customDataParsingHook = dataSets
+	tb.setAnalysisExecutor('process', workers=2)
+	return tb
+
+def test_results_outlive_shared_mappings():
+	results = processBench().runAnalysis(dataSets())
+	for i in range(0, len(results)):
+		result = pickle.loads(pickle.dumps(results[i]))
+		assert np.array_equal(result.getDataSet(0)[1], dataSets()[i][0][::2])
+
+def test_temporary_mappings_are_pickled_by_value(tmp_path):
+	fp = str(tmp_path / 'data.npy')
+	np.save(fp, np.arange(1000, dtype=np.float64))
+	result = XSimResult(title='mapped')
+	result.addDataSet([None, np.load(fp, mmap_mode='r')])
+	data = pickle.dumps(result)
+	os.remove(fp)
+	assert np.array_equal(pickle.loads(data).getDataSet(0)[1], np.arange(1000))
+
+def test_report_workers_after_process_analysis(tmp_path):
+	tb = processBench()
+	tb.setReport(XSimReport(str(tmp_path), workers=2))
+	assert tb.postSimRun() == 0
+	summary = tb.getReport().getSummary()
+	assert [r['status'] for r in summary['results']] == ['PASSED'] * 3
+
+def test_report_exit_code_on_failure(tmp_path):
+	tb = processBench()
+	tb._customAnalysisMethod = failing
+	tb.setReport(XSimReport(str(tmp_path), workers=2))
+	assert tb.postSimRun() == 1
@@ -0,0 +1,93 @@
+#! /usr/bin/env python3
+#########################################################
+# fakesim.py
+# stand-in for the Vivado simulator tools, to exercise
+# XSimRunner without Vivado:
+#	fakesim.py xvhdl [options] sources..
+#	fakesim.py xelab [options] top -s snapshot
+#	fakesim.py xsim snapshot [options]
+# steps mimic the xsim.dir/ layout of the real tools.
+# environment:
+#	FAKESIM_DELAY: duration of every step [s]
+#	FAKESIM_FAIL: name of the step to fail
+#########################################################
+
+import os
+import sys
+import json
+import time
+
+# options followed by a value
+VALUED = ['-s', '--snapshot', '-L', '--lib', '-log', '--log', '-debug', '--debug', '-timescale', '--timescale', '-work', '--work', '-tclbatch', '--tclbatch']
+
+def positionals(args):
+	"""
+	Returns [positional arguments, {option: value}]
+	"""
+	values = []
+	options = {}
+	i = 0
+	while (i < len(args)):
+		if (args[i] in VALUED) and (i+1 < len(args)):
+			options[args[i].lstrip('-')] = args[i+1]
+			i += 2
+		elif (args[i].startswith('-')):
+			options[args[i].lstrip('-')] = True
+			i += 1
+		else:
+			values.append(args[i])
+			i += 1
+	return [values, options]
+
+def xvhdl(args):
+	[sources, options] = positionals(args)
+	library = os.path.join('xsim.dir', options.get('work', 'work'))
+	os.makedirs(library, exist_ok=True)
+	for source in sources:
+		if not(os.path.exists(source)):
+			print("ERROR: [VRFC 10-2989] file {:s} does not exist".format(source))
+			return 1
+		print("INFO: [VRFC 10-163] Analyzing VHDL file \"{:s}\" into library work".format(source))
+		with open(os.path.join(library, os.path.basename(source) + '.sdb'), 'w') as fd:
+			fd.write(source)
+	return 0
+
+def xelab(args):
+	[values, options] = positionals(args)
+	if (len(values) == 0) or not('s' in options or 'snapshot' in options):
+		print("ERROR: top & snapshot are required")
+		return 1
+	snapshot = options.get('s', options.get('snapshot'))
+	if not(os.path.isdir(os.path.join('xsim.dir', 'work'))):
+		print("ERROR: [XSIM 43-3225] work library has not been compiled")
+		return 1
+	print("INFO: Elaborating {:s} into snapshot {:s}".format(values[0], snapshot))
+	os.makedirs(os.path.join('xsim.dir', snapshot), exist_ok=True)
+	with open(os.path.join('xsim.dir', snapshot, 'snapshot.json'), 'w') as fd:
+		json.dump({'top': values[0], 'elaborated': time.time()}, fd)
+	return 0
+
+def xsim(args):
+	[values, options] = positionals(args)
+	if (len(values) == 0) or not(os.path.isdir(os.path.join('xsim.dir', values[0]))):
+		print("ERROR: [XSIM 43-3225] snapshot has not been elaborated")
+		return 1
+	print("INFO: Simulating {:s}".format(values[0]))
+	print("$finish called at time : 1 us")
+	return 0
+
+STEPS = {'xvhdl': xvhdl, 'xelab': xelab, 'xsim': xsim}
+
+def main(argv):
+	if (len(argv) < 2) or not(argv[1] in STEPS):
+		print("usage: fakesim.py xvhdl|xelab|xsim [args..]")
+		return 2
+	step = argv[1]
+	time.sleep(float(os.environ.get('FAKESIM_DELAY', 0)))
+	if (os.environ.get('FAKESIM_FAIL') == step):
+		print("ERROR: {:s} failed (FAKESIM_FAIL)".format(step))
+		return 1
+	return STEPS[step](argv[2:])
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv))